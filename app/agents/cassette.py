@@ -0,0 +1,276 @@
+"""Record/replay model backends for offline load testing.
+
+Record mode wraps the real Gemini models and appends every call to a
+cassette: one compact JSON line per call holding a prompt hash, the model
+name, the response text (``null`` when blocked), the latency in milliseconds
+and the error, if any. A ``.gz`` suffix compresses the file.
+
+Replay mode serves a cassette back without network access. Calls are matched
+by prompt hash; prompts that were never recorded (new user IDs during a load
+test, say) get a deterministic pick among that model's recordings. Latency is
+either the recorded one or drawn from a synthetic distribution, and extra
+failures can be injected on top of the recorded ones.
+
+Select a backend with ``LLM_BACKEND`` = ``gemini`` | ``record`` | ``replay`` |
+``stub``; see ``offline_models`` and ``record_models``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from types import SimpleNamespace
+from typing import IO, Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from app.agents.llm_cache import cache_key
+from app.agents.stub_model import (
+    InjectedUpstreamError,
+    LatencyDistribution,
+    StubModel,
+    latency_distribution,
+)
+from app.config import Settings
+from app.observability.metrics import metrics
+
+DEFAULT_STUB_LATENCY = "lognormal:0.8,0.4"
+
+
+class RecordedUpstreamError(RuntimeError):
+    """Replays an upstream failure captured in a cassette."""
+
+
+def prompt_key(prompt: str, model_name: str) -> str:
+    return cache_key(prompt, model_name, {})[:24]
+
+
+def _open(path: Path, mode: str) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return path.open(mode, encoding="utf-8")
+
+
+class CassetteWriter:
+    """Thread-safe, append-only cassette file.
+
+    Each line is flushed as it is written (a sync flush for gzip), so the
+    cassette is readable while recording is still in progress.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._handle: Optional[IO[str]] = None
+
+    def write(self, entry: Dict[str, Any]) -> None:
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._handle is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._handle = _open(self.path, "a")
+            self._handle.write(line)
+            self._handle.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+
+def load_cassette(path: str | Path) -> Dict[str, List[Dict[str, Any]]]:
+    """Read a cassette into ``{model_name: [entry, ...]}`` in recording order.
+
+    A gzip cassette still being written (or left behind by a crash) has no
+    trailer yet; every line flushed before that point is still read.
+    """
+
+    entries: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    with _open(Path(path), "r") as handle:
+        try:
+            for line in handle:
+                if line.strip():
+                    entry = json.loads(line)
+                    entries[entry["m"]].append(entry)
+        except EOFError:
+            pass
+    return dict(entries)
+
+
+class RecordingModel:
+    """Pass-through wrapper that records each call made to ``model``."""
+
+    def __init__(self, model: Any, model_name: str, writer: CassetteWriter) -> None:
+        self.model = model
+        self.model_name = model_name
+        self.writer = writer
+
+    async def generate_content_async(self, prompt: str, stream: bool = False, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            response = await self.model.generate_content_async(prompt, stream=stream, **kwargs)
+        except Exception as exc:
+            self._record(prompt, None, started, exc)
+            raise
+        if stream:
+            return self._record_stream(prompt, response, started)
+        self._record(prompt, _response_text(response), started)
+        return response
+
+    def generate_content(self, prompt: str, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            response = self.model.generate_content(prompt, **kwargs)
+        except Exception as exc:
+            self._record(prompt, None, started, exc)
+            raise
+        self._record(prompt, _response_text(response), started)
+        return response
+
+    async def _record_stream(self, prompt: str, response: Any, started: float) -> AsyncIterator[Any]:
+        chunks: List[str] = []
+        try:
+            async for chunk in response:
+                text = _response_text(chunk)
+                if text:
+                    chunks.append(text)
+                yield chunk
+        except Exception as exc:
+            self._record(prompt, "".join(chunks) or None, started, exc)
+            raise
+        self._record(prompt, "".join(chunks) or None, started)
+
+    def _record(
+        self, prompt: str, text: Optional[str], started: float, error: Optional[Exception] = None
+    ) -> None:
+        entry: Dict[str, Any] = {
+            "k": prompt_key(prompt, self.model_name),
+            "m": self.model_name,
+            "t": text,
+            "ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        if error is not None:
+            entry["e"] = f"{type(error).__name__}: {error}"
+        self.writer.write(entry)
+        metrics.counters["llm_cassette_recorded"] += 1
+
+
+class ReplayModel(StubModel):
+    """Serves recorded responses with recorded or synthetic latency."""
+
+    def __init__(
+        self,
+        model_name: str,
+        entries: Sequence[Dict[str, Any]],
+        latency: Optional[LatencyDistribution] = None,
+        error_rate: float = 0.0,
+        seed: Optional[int] = 0,
+    ) -> None:
+        if not entries:
+            raise ValueError(f"Cassette has no recordings for model {model_name!r}.")
+        super().__init__(seed=seed, error_rate=error_rate)
+        # None means "use each recording's own latency"
+        self.latency = latency
+        self.model_name = model_name
+        self.entries = list(entries)
+        self._by_key: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for entry in self.entries:
+            self._by_key[entry["k"]].append(entry)
+        self._cursor: Dict[str, int] = defaultdict(int)
+
+    def _pick(self, prompt: str) -> Tuple[Dict[str, Any], float]:
+        key = prompt_key(prompt, self.model_name)
+        matches = self._by_key.get(key)
+        if matches:
+            metrics.counters["llm_replay_hit"] += 1
+            # Repeated recordings of one prompt are replayed in turn
+            entry = matches[self._cursor[key] % len(matches)]
+            self._cursor[key] += 1
+        else:
+            metrics.counters["llm_replay_miss"] += 1
+            entry = self.rng.choice(self.entries)
+        if self.latency is not None:
+            delay = self.latency(self.rng)
+        else:
+            delay = entry["ms"] / 1000
+        return entry, delay
+
+    def _replay(self, entry: Dict[str, Any]) -> Any:
+        self.calls += 1
+        if "e" in entry:
+            raise RecordedUpstreamError(entry["e"])
+        if self.error_rate and self.rng.random() < self.error_rate:
+            raise InjectedUpstreamError("Injected replay failure")
+        return SimpleNamespace(text=entry["t"], candidates=[])
+
+    async def generate_content_async(self, prompt: str, stream: bool = False, **kwargs: Any) -> Any:
+        entry, delay = self._pick(prompt)
+        await asyncio.sleep(delay)
+        response = self._replay(entry)
+        if stream:
+            return self._chunks(response)
+        return response
+
+    def generate_content(self, prompt: str, **kwargs: Any) -> Any:
+        entry, delay = self._pick(prompt)
+        time.sleep(delay)
+        return self._replay(entry)
+
+
+def _response_text(response: Any) -> Optional[str]:
+    try:
+        return response.text or None
+    except (AttributeError, ValueError):
+        # Blocked responses raise on .text in the SDK
+        return None
+
+
+def record_models(
+    models: Sequence[Tuple[str, Any]], path: str | Path
+) -> List[Tuple[str, Any]]:
+    """Wrap each ``(name, model)`` tier so its calls are appended to ``path``."""
+
+    writer = CassetteWriter(path)
+    return [(name, RecordingModel(model, name, writer)) for name, model in models]
+
+
+def offline_models(settings: Settings) -> List[Tuple[str, Any]]:
+    """Build the model tiers for the ``stub`` and ``replay`` backends."""
+
+    latency = latency_distribution(settings.llm_stub_latency) if settings.llm_stub_latency else None
+    if settings.llm_backend == "stub":
+        return [
+            (
+                name,
+                StubModel(
+                    latency=latency or latency_distribution(DEFAULT_STUB_LATENCY),
+                    seed=index,
+                    error_rate=settings.llm_stub_error_rate,
+                ),
+            )
+            for index, name in enumerate(settings.model_tiers)
+        ]
+    if settings.llm_backend == "replay":
+        if not settings.llm_cassette_path:
+            raise ValueError("LLM_CASSETTE_PATH is required for the replay backend.")
+        recordings = load_cassette(settings.llm_cassette_path)
+        # Tiers missing from the cassette replay whatever was recorded
+        fallback_entries = [entry for entries in recordings.values() for entry in entries]
+        return [
+            (
+                name,
+                ReplayModel(
+                    name,
+                    recordings.get(name, fallback_entries),
+                    latency=latency,
+                    error_rate=settings.llm_stub_error_rate,
+                    seed=index,
+                ),
+            )
+            for index, name in enumerate(settings.model_tiers)
+        ]
+    raise ValueError(f"Unknown offline LLM backend {settings.llm_backend!r}.")
@@ -0,0 +1,227 @@
+"""Local fast-path triage classifier that answers low-acuity requests in-process.
+
+Train from historical SymptomEvent rows with::
+
+    python -m app.agents.fastpath --output models/fastpath.npz
+
+Text is featurized as hashed word unigrams and bigrams (log-scaled, L2
+normalized) and classified by a multinomial logistic regression trained with
+mini-batch gradient descent in NumPy. Labels are the full
+``category|urgency|recommended_action`` triple the LLM would have produced.
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlmodel import Session, create_engine, select
+
+from app.config import get_settings
+from app.db.models import SymptomEvent
+from app.utils import configure_logging
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Reasoning prefixes of responses that did not come from the LLM; training on
+# them would teach the classifier our own fallbacks.
+NON_LLM_REASONING = (
+    "Deterministic critical red-flag",
+    "Fallback",
+    "Local fast-path",
+)
+
+
+def _hashed_features(text: str, n_features: int) -> Tuple[np.ndarray, np.ndarray]:
+    tokens = _TOKEN_RE.findall(text.lower())
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    counts: dict[int, float] = {}
+    for gram in grams:
+        index = zlib.crc32(gram.encode("utf-8")) % n_features
+        counts[index] = counts.get(index, 0.0) + 1.0
+    indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    values = np.log1p(np.fromiter(counts.values(), dtype=np.float64, count=len(counts)))
+    norm = np.linalg.norm(values)
+    if norm:
+        values /= norm
+    return indices, values
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+class FastPathClassifier:
+    """Hashed n-gram multinomial logistic regression over triage labels."""
+
+    LOW_RISK_ACTIONS = frozenset({"self_care", "primary_care"})
+
+    def __init__(
+        self, weights: np.ndarray, bias: np.ndarray, labels: Sequence[str], n_features: int
+    ) -> None:
+        self.weights = weights
+        self.bias = bias
+        self.labels = list(labels)
+        self.n_features = n_features
+
+    @classmethod
+    def train(
+        cls,
+        texts: Sequence[str],
+        labels: Sequence[str],
+        n_features: int = 2**14,
+        epochs: int = 40,
+        batch_size: int = 256,
+        learning_rate: float = 2.0,
+        l2: float = 1e-5,
+        seed: int = 0,
+    ) -> "FastPathClassifier":
+        """Fit with mini-batch gradient descent; only one dense batch is ever built."""
+
+        classes = sorted(set(labels))
+        if len(classes) < 2:
+            raise ValueError("Need at least two distinct labels to train the fast path.")
+        index = {label: i for i, label in enumerate(classes)}
+        features = [_hashed_features(text, n_features) for text in texts]
+        targets = np.array([index[label] for label in labels])
+        rng = np.random.default_rng(seed)
+
+        weights = np.zeros((n_features, len(classes)))
+        bias = np.zeros(len(classes))
+        for _ in range(epochs):
+            order = rng.permutation(len(features))
+            for start in range(0, len(order), batch_size):
+                batch = order[start : start + batch_size]
+                x = np.zeros((len(batch), n_features))
+                for row, i in enumerate(batch):
+                    indices, values = features[i]
+                    x[row, indices] = values
+                error = _softmax(x @ weights + bias)
+                error[np.arange(len(batch)), targets[batch]] -= 1.0
+                weights -= learning_rate * (x.T @ error / len(batch) + l2 * weights)
+                bias -= learning_rate * error.mean(axis=0)
+        return cls(weights, bias, classes, n_features)
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """Return the most likely label and its probability."""
+
+        indices, values = _hashed_features(text, self.n_features)
+        probs = _softmax(values @ self.weights[indices] + self.bias)
+        best = int(probs.argmax())
+        return self.labels[best], float(probs[best])
+
+    def is_low_risk(self, label: str) -> bool:
+        _, urgency, action = split_label(label)
+        return urgency != "high" and action in self.LOW_RISK_ACTIONS
+
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as handle:
+            np.savez_compressed(
+                handle,
+                weights=self.weights.astype(np.float32),
+                bias=self.bias,
+                labels=np.array(self.labels),
+                n_features=np.array(self.n_features),
+            )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "FastPathClassifier":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data["weights"].astype(np.float64),
+                data["bias"],
+                [str(label) for label in data["labels"]],
+                int(data["n_features"]),
+            )
+
+
+def make_label(category: str, urgency: str, action: str) -> str:
+    return f"{category}|{urgency}|{action}"
+
+
+def split_label(label: str) -> Tuple[str, str, str]:
+    category, urgency, action = label.split("|", 2)
+    return category, urgency, action
+
+
+@lru_cache
+def load_default_classifier() -> Optional[FastPathClassifier]:
+    """Load the configured model once per process; ``None`` disables the fast path."""
+
+    settings = get_settings()
+    if not settings.fastpath_model_path:
+        return None
+    path = Path(settings.fastpath_model_path)
+    logger = configure_logging()
+    if not path.exists():
+        logger.warning("Fast-path model %s not found; fast path disabled.", path)
+        return None
+    classifier = FastPathClassifier.load(path)
+    logger.info("Loaded fast-path classifier with %s labels from %s", len(classifier.labels), path)
+    return classifier
+
+
+def iter_training_rows(engine, chunk_size: int = 5000) -> Iterator[Tuple[str, str]]:
+    """Yield ``(text, label)`` pairs for LLM-produced SymptomEvent rows."""
+
+    last_id = 0
+    while True:
+        with Session(engine) as session:
+            rows = session.exec(
+                select(SymptomEvent)
+                .where(SymptomEvent.id > last_id)
+                .order_by(SymptomEvent.id)
+                .limit(chunk_size)
+            ).all()
+        if not rows:
+            return
+        for row in rows:
+            if row.reasoning.startswith(NON_LLM_REASONING):
+                continue
+            text = f"{row.symptoms} {row.context or ''}"
+            yield text, make_label(row.category, row.urgency, row.recommended_action)
+        last_id = rows[-1].id
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Train the fast-path triage classifier.")
+    parser.add_argument("--output", default=settings.fastpath_model_path or "models/fastpath.npz")
+    parser.add_argument("--database-url", default=settings.database_url)
+    parser.add_argument("--n-features", type=int, default=2**14)
+    parser.add_argument("--epochs", type=int, default=40)
+    parser.add_argument("--min-rows", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    logger = configure_logging()
+    engine = create_engine(args.database_url, echo=False)
+    texts: List[str] = []
+    labels: List[str] = []
+    for text, label in iter_training_rows(engine):
+        texts.append(text)
+        labels.append(label)
+    if len(texts) < args.min_rows:
+        raise SystemExit(f"Only {len(texts)} usable rows; need at least {args.min_rows}.")
+
+    classifier = FastPathClassifier.train(
+        texts, labels, n_features=args.n_features, epochs=args.epochs
+    )
+    correct = sum(classifier.predict(t)[0] == l for t, l in zip(texts, labels))
+    classifier.save(args.output)
+    logger.info(
+        "Trained fast path on %s rows, %s labels, train accuracy %.3f -> %s",
+        len(texts), len(classifier.labels), correct / len(texts), args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import math
+import threading
+from collections import defaultdict, deque
+from typing import Deque, Dict, Optional
+
+
+class HedgePolicy:
+    """Decides when a slow LLM call earns a second, identical request.
+
+    Latencies are tracked per model over the last ``window`` calls; a hedge
+    fires once the primary has been outstanding for the rolling
+    ``percentile`` of that window. Hedges are paid for from a budget: every
+    primary request deposits ``budget_ratio`` of a token (capped at
+    ``max_tokens``) and each hedge spends a whole one, so hedges never exceed
+    roughly ``budget_ratio`` of traffic even when the upstream is uniformly
+    slow.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        budget_ratio: float = 0.05,
+        window: int = 200,
+        min_samples: int = 20,
+        min_delay_seconds: float = 0.05,
+        max_tokens: float = 10.0,
+    ) -> None:
+        self.percentile = percentile
+        self.budget_ratio = budget_ratio
+        self.min_samples = min_samples
+        self.min_delay_seconds = min_delay_seconds
+        self.max_tokens = max_tokens
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+        self._tokens = 0.0
+
+    def observe(self, model_name: str, latency: float) -> None:
+        with self._lock:
+            self._latencies[model_name].append(latency)
+
+    def delay(self, model_name: str) -> Optional[float]:
+        """Seconds to wait before hedging, or ``None`` until enough samples exist."""
+
+        with self._lock:
+            values = sorted(self._latencies[model_name])
+        if len(values) < self.min_samples:
+            return None
+        index = min(len(values) - 1, max(0, math.ceil(self.percentile / 100 * len(values)) - 1))
+        return max(values[index], self.min_delay_seconds)
+
+    def deposit(self) -> None:
+        """Credit the budget for one primary request."""
+
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.budget_ratio)
+
+    def try_spend(self) -> bool:
+        """Take one hedge from the budget if it can afford it."""
+
+        with self._lock:
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Mapping, Optional, Tuple, Union
+
+from app.observability.metrics import metrics
+
+
+def cache_key(
+    prompt: Union[str, Mapping[str, Any]], model_name: str, generation_config: Mapping[str, Any]
+) -> str:
+    """Hash the canonicalized prompt together with everything that shapes the output.
+
+    ``prompt`` may instead be a mapping of the inputs the answer depends on
+    (e.g. symptoms and context), so requests whose rendered prompts differ
+    only in per-user details share an entry. Text values are compared
+    case- and whitespace-insensitively and lists as unordered.
+    """
+
+    canonical = " ".join(prompt.split()) if isinstance(prompt, str) else _canonical(prompt)
+    payload = json.dumps(
+        {"prompt": canonical, "model": model_name, "config": dict(generation_config)},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _canonical(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    if isinstance(value, Mapping):
+        return {str(name): _canonical(item) for name, item in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return sorted(_canonical(item) for item in value)
+    return value
+
+
+class _MemoryTier:
+    """Thread-safe LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, Tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                metrics.record_cache("llm", "expired")
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                metrics.record_cache("llm", "eviction")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class _SQLiteTier:
+    """On-disk tier that survives restarts; expiry uses wall-clock time."""
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_llm_cache_accessed_at ON llm_cache (accessed_at)"
+        )
+        self._count = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """Return ``(value, remaining_ttl)`` for a live entry."""
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at < now:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._count -= 1
+                metrics.record_cache("llm", "expired")
+                return None
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            return value, expires_at - now
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            existed = self._conn.execute(
+                "SELECT 1 FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl_seconds, now),
+            )
+            if not existed:
+                self._count += 1
+            overflow = self._count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN ("
+                    " SELECT key FROM llm_cache ORDER BY accessed_at LIMIT ?)",
+                    (overflow,),
+                )
+                self._count -= overflow
+                for _ in range(overflow):
+                    metrics.record_cache("llm", "eviction")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._count = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class LLMResponseCache:
+    """Two-tier response cache: in-process LRU backed by an optional SQLite file."""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 600.0,
+        sqlite_path: Optional[str] = None,
+        sqlite_max_entries: int = 50_000,
+    ) -> None:
+        self.memory = _MemoryTier(max_entries, ttl_seconds)
+        self.disk = (
+            _SQLiteTier(sqlite_path, sqlite_max_entries, ttl_seconds) if sqlite_path else None
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up both tiers, promoting disk hits into memory."""
+
+        value = self.memory.get(key)
+        if value is not None:
+            metrics.record_cache("llm", "hit_memory")
+            return value
+        if self.disk is None:
+            metrics.record_cache("llm", "miss")
+            return None
+        return self._get_disk(key)
+
+    def set(self, key: str, value: str) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    async def aget(self, key: str) -> Optional[str]:
+        """Async lookup that keeps SQLite I/O off the event loop."""
+
+        value = self.memory.get(key)
+        if value is not None:
+            metrics.record_cache("llm", "hit_memory")
+            return value
+        if self.disk is None:
+            metrics.record_cache("llm", "miss")
+            return None
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self._get_disk, key)
+
+    async def aset(self, key: str, value: str) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, self.disk.set, key, value)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def _get_disk(self, key: str) -> Optional[str]:
+        entry = self.disk.get(key)
+        if entry is None:
+            metrics.record_cache("llm", "miss")
+            return None
+        value, remaining = entry
+        self.memory.set(key, value, ttl_seconds=remaining)
+        metrics.record_cache("llm", "hit_disk")
+        return value
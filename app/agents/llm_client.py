@@ -1,125 +1,660 @@
 from __future__ import annotations
 
 import asyncio
-import json
-import re
-from typing import Any, Dict, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple
 
 import google.generativeai as genai
 from google.generativeai import types as genai_types
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import (
+    AsyncRetrying,
+    retry_if_exception_type,
+    retry_if_not_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
 
+from app.agents.cassette import offline_models, record_models
+from app.agents.hedging import HedgePolicy
+from app.agents.llm_cache import LLMResponseCache, cache_key
+from app.agents.singleflight import SingleFlight
+from app.agents.tokens import estimate_tokens, usage_counts
 from app.config import Settings, get_settings
+from app.deadline import current_deadline
+from app.observability.metrics import metrics
+from app.observability.tracing import current_span
+from app.resilience import CircuitBreaker, CircuitOpenError
+from app.rules.fallback import render_fallback
+from app.rules.packs import rule_registry
 from app.utils import configure_logging
 
 
 class LLMClient:
-    """Wrapper around Gemini with a deterministic offline fallback."""
+    """Wrapper around Gemini with a deterministic offline fallback.
 
-    def __init__(self, settings: Optional[Settings] = None) -> None:
+    Upstream calls use the SDK's native async API when the model provides one
+    and otherwise run on a dedicated, sized thread pool so LLM latency never
+    occupies the event loop's default executor. A semaphore bounds how many
+    calls are in flight at once; retries back off with ``asyncio.sleep``.
+    A circuit breaker short-circuits straight to the deterministic fallback
+    while Gemini is failing or slow. Optional hedging races a duplicate
+    request against calls that outlive the model's tail latency.
+    """
+
+    FALLBACK_REASONS: Dict[str, str] = {
+        "unavailable": "Fallback heuristic response when LLM is unavailable.",
+        "error": "Fallback heuristic response after the LLM call failed.",
+        "no_content": "Fallback heuristic response; the LLM returned no usable content.",
+        "circuit_open": "Fallback heuristic response; LLM circuit breaker is open.",
+        "deadline": "Fallback heuristic response; the request deadline left no time for the LLM.",
+    }
+
+    def __init__(
+        self,
+        settings: Optional[Settings] = None,
+        model: Optional[Any] = None,
+        cache: Optional[LLMResponseCache] = None,
+        models: Optional[Sequence[Tuple[str, Any]]] = None,
+    ) -> None:
         self.settings = settings or get_settings()
         self.logger = configure_logging(self.settings.log_level)
-        self._model = None
-        if self.settings.gemini_api_key:
+        self._generation_config: Dict[str, Any] = {
+            "temperature": 0.1,
+            "max_output_tokens": 1000,
+        }
+        self._safety_settings = [
+            {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
+            {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
+            {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
+            {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_ONLY_HIGH"},
+        ]
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._gate_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._gate_semaphore: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+        self._in_flight = 0
+        self.cache = cache or LLMResponseCache(
+            max_entries=self.settings.llm_cache_max_entries,
+            ttl_seconds=self.settings.llm_cache_ttl_seconds,
+            sqlite_path=self.settings.llm_cache_sqlite_path,
+            sqlite_max_entries=self.settings.llm_cache_sqlite_max_entries,
+        )
+        self._inflight = SingleFlight("llm")
+        self.breaker = CircuitBreaker(
+            "llm",
+            failure_rate_threshold=self.settings.llm_breaker_failure_rate,
+            slow_call_seconds=self.settings.llm_breaker_slow_call_seconds,
+            slow_call_rate_threshold=self.settings.llm_breaker_slow_call_rate,
+            window_size=self.settings.llm_breaker_window,
+            min_calls=self.settings.llm_breaker_min_calls,
+            open_seconds=self.settings.llm_breaker_open_seconds,
+        )
+        self.hedge: Optional[HedgePolicy] = None
+        if self.settings.llm_hedge_enabled:
+            self.hedge = HedgePolicy(
+                percentile=self.settings.llm_hedge_percentile,
+                budget_ratio=self.settings.llm_hedge_budget,
+                min_samples=self.settings.llm_hedge_min_samples,
+                min_delay_seconds=self.settings.llm_hedge_min_delay_seconds,
+            )
+        self._draining: Set[asyncio.Task] = set()
+        self.rule_registry = rule_registry
+        # Ordered (name, model) tiers: cheapest first, escalating on rejection
+        self._models: List[Tuple[str, Any]] = []
+        if models:
+            self._models = list(models)
+            self.logger.info("Using injected model tiers: %s", [name for name, _ in self._models])
+        elif model is not None:
+            self._models = [(self.settings.gemini_model, model)]
+            self.logger.info("Using injected model for LLM calls")
+        elif self.settings.llm_backend in ("stub", "replay"):
+            self._models = offline_models(self.settings)
+            self.logger.info(
+                "Using offline %s backend for model tiers %s",
+                self.settings.llm_backend,
+                [name for name, _ in self._models],
+            )
+        elif self.settings.gemini_api_key:
             try:
                 genai.configure(api_key=self.settings.gemini_api_key)
-                self._model = genai.GenerativeModel(self.settings.gemini_model)
-                self.logger.info(f"Initialized Gemini model: {self.settings.gemini_model}")
+                self._models = [
+                    (name, genai.GenerativeModel(name)) for name in self.settings.model_tiers
+                ]
+                self.logger.info(f"Initialized Gemini models: {self.settings.model_tiers}")
             except Exception as e:
                 self.logger.error(f"Failed to initialize Gemini: {e}")
-                self._model = None
+                self._models = []
+            if self._models and self.settings.llm_backend == "record":
+                if not self.settings.llm_cassette_path:
+                    raise ValueError("LLM_CASSETTE_PATH is required for the record backend.")
+                self._models = record_models(self._models, self.settings.llm_cassette_path)
+                self.logger.info("Recording LLM calls to %s", self.settings.llm_cassette_path)
         else:
             self.logger.warning(
                 "GEMINI_API_KEY not set; using heuristic fallback for triage responses."
             )
 
-    async def complete(self, prompt: str) -> str:
-        """Generate structured output for the given prompt."""
+    async def complete(
+        self,
+        prompt: str,
+        bypass_cache: bool = False,
+        escalate: Optional[Callable[[str], Optional[str]]] = None,
+        fallback_fields: Optional[Sequence[Optional[str]]] = None,
+        cache_inputs: Optional[Mapping[str, Any]] = None,
+        cache_write: bool = True,
+    ) -> str:
+        """Generate structured output for the given prompt.
 
-        if not self._model:
-            return json.dumps(self._fallback(prompt))
+        Model responses are cached by prompt, model tiers and generation
+        config; pass ``bypass_cache=True`` (or disable ``llm_cache_enabled``)
+        to force a fresh upstream call. Fallback responses are never cached.
+        Concurrent identical requests share a single upstream call.
+
+        ``cache_inputs`` replaces the prompt in the cache and single-flight
+        key with the inputs the answer actually depends on, so callers can
+        leave per-user details such as the user id out of it. With
+        ``cache_write=False`` a cached answer is still served, but a fresh
+        one is not stored (e.g. when the prompt lacks context it should have).
+
+        Tiers are tried cheapest first. ``escalate`` inspects each tier's
+        output and returns a reason string to escalate to the next tier, or
+        ``None`` to accept it; the last tier's output is always returned.
+
+        Under a request deadline the call gets only the remaining budget; when
+        that is too short or runs out, the deterministic fallback is returned
+        and the ``llm`` stage is marked degraded.
+
+        ``fallback_fields`` (e.g. symptoms and context) are what the fallback
+        heuristic screens; without them it screens the prompt itself.
+        """
+
+        fields = fallback_fields or (prompt,)
+        if not self._models:
+            return self._fallback(fields, "unavailable")
+
+        use_cache = self.settings.llm_cache_enabled and not bypass_cache
+        route = ">".join(name for name, _ in self._models)
+        key = cache_key(cache_inputs or prompt, route, self._generation_config)
+        if use_cache:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                return cached
+        else:
+            metrics.record_cache("llm", "bypass")
+
+        deadline = current_deadline()
+        timeout = None
+        if deadline is not None:
+            timeout = deadline.remaining()
+            if timeout < self.settings.llm_min_budget_seconds:
+                deadline.mark_degraded("llm")
+                return self._fallback(fields, "deadline")
 
-        loop = asyncio.get_event_loop()
         try:
-            return await loop.run_in_executor(None, self._sync_completion, prompt)
-        except Exception as exc:  # pragma: no cover - defensive
+            # Callers sharing the key get the first caller's answer, even when
+            # their prompts differ outside ``cache_inputs``
+            text = await asyncio.wait_for(
+                self._inflight.do(key, lambda: self._routed_completion(prompt, escalate)),
+                timeout=timeout,
+            )
+        except asyncio.TimeoutError as exc:
+            if deadline is None:
+                self.logger.error("LLM call timed out, using fallback: %s", exc)
+                return self._fallback(fields, "error")
+            deadline.mark_degraded("llm")
+            return self._fallback(fields, "deadline")
+        except CircuitOpenError:
+            return self._fallback(fields, "circuit_open")
+        except Exception as exc:
             self.logger.error("LLM call failed, using fallback: %s", exc)
-            return json.dumps(self._fallback(prompt))
+            return self._fallback(fields, "error")
 
-    @retry(wait=wait_exponential(multiplier=1, min=1, max=8), stop=stop_after_attempt(3))
-    def _sync_completion(self, prompt: str) -> str:
-        try:
-            response = self._model.generate_content(
+        if text is None:
+            return self._fallback(fields, "no_content")
+        if use_cache and cache_write:
+            await self.cache.aset(key, text)
+        return text
+
+    async def stream(
+        self,
+        prompt: str,
+        fallback_fields: Optional[Sequence[Optional[str]]] = None,
+        bypass_cache: bool = False,
+        cache_inputs: Optional[Mapping[str, Any]] = None,
+        cache_write: bool = True,
+    ) -> AsyncIterator[str]:
+        """Yield model output incrementally as it is generated.
+
+        Caching works as in ``complete``. Cached responses, fallbacks and
+        models without an async API are yielded as a single chunk. Streams
+        are not retried, since partial output has already reached the
+        caller; a stream that fails before producing anything yields the
+        fallback instead.
+        """
+
+        fields = fallback_fields or (prompt,)
+        if not self._models:
+            yield self._fallback(fields, "unavailable")
+            return
+        # Streamed output reaches the caller as it is produced, so there is no
+        # chance to escalate: stream from the first tier only.
+        name, model = self._models[0]
+        generate_async = getattr(model, "generate_content_async", None)
+        if generate_async is None:
+            yield await self.complete(
                 prompt,
-                generation_config=genai_types.GenerationConfig(
-                    temperature=0.1,
-                    max_output_tokens=1000,
-                ),
-                safety_settings=[
-                    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
-                    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
-                    {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
-                    {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_ONLY_HIGH"},
-                ]
+                bypass_cache=bypass_cache,
+                fallback_fields=fallback_fields,
+                cache_inputs=cache_inputs,
+                cache_write=cache_write,
+            )
+            return
+
+        use_cache = self.settings.llm_cache_enabled and not bypass_cache
+        key = cache_key(cache_inputs or prompt, name, self._generation_config)
+        if use_cache:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                yield cached
+                return
+        else:
+            metrics.record_cache("llm", "bypass")
+
+        # Chunks reach the caller outside the upstream slot: a slow reader
+        # neither holds a concurrency slot nor counts as upstream latency
+        queue: asyncio.Queue = asyncio.Queue()
+        pump = asyncio.ensure_future(self._pump_stream(generate_async, prompt, queue))
+        chunks: List[str] = []
+        try:
+            while (text := await queue.get()) is not None:
+                chunks.append(text)
+                yield text
+            last_chunk, latency = await pump
+        except CircuitOpenError:
+            yield self._fallback(fields, "circuit_open")
+            return
+        except Exception as exc:
+            self.logger.error("LLM stream failed: %s", exc)
+            if not chunks:
+                yield self._fallback(fields, "error")
+            return
+        finally:
+            # Stops reading upstream if the caller went away mid-stream
+            pump.cancel()
+
+        self._record_usage(name, prompt, last_chunk, "".join(chunks) or None, latency)
+
+        if not chunks:
+            yield self._fallback(fields, "no_content")
+        elif use_cache and cache_write:
+            await self.cache.aset(key, "".join(chunks))
+
+    async def _pump_stream(
+        self, generate_async: Callable[..., Any], prompt: str, queue: asyncio.Queue
+    ) -> Tuple[Any, float]:
+        """Read a streamed response into ``queue`` within one upstream slot.
+
+        Puts ``None`` once the stream ends or fails; returns the last chunk,
+        which carries usage for the whole stream, and the upstream latency.
+        """
+
+        last_chunk: Any = None
+        try:
+            async with self._upstream_slot():
+                started = time.perf_counter()
+                response = await generate_async(prompt, stream=True, **self._request_kwargs())
+                async for chunk in response:
+                    last_chunk = chunk
+                    text = self._chunk_text(chunk)
+                    if text:
+                        queue.put_nowait(text)
+                latency = time.perf_counter() - started
+        finally:
+            queue.put_nowait(None)
+        return last_chunk, latency
+
+    @staticmethod
+    def _chunk_text(chunk: Any) -> Optional[str]:
+        try:
+            return chunk.text
+        except (AttributeError, ValueError):
+            # Blocked or empty chunks raise on .text in the SDK
+            return None
+
+    async def _routed_completion(
+        self, prompt: str, escalate: Optional[Callable[[str], Optional[str]]]
+    ) -> Optional[str]:
+        """Walk the model tiers until one produces an acceptable answer."""
+
+        metrics.counters["llm_routed_requests"] += 1
+        last_tier = len(self._models) - 1
+        for tier, (name, model) in enumerate(self._models):
+            started = time.perf_counter()
+            try:
+                text = await self._upstream_completion(prompt, name, model)
+            except CircuitOpenError:
+                raise
+            except Exception:
+                if tier == last_tier:
+                    raise
+                text, reason = None, "error"
+            else:
+                if text is None:
+                    reason = "no_content"
+                else:
+                    reason = escalate(text) if escalate else None
+            metrics.observe(f"llm_model_{name}_seconds", time.perf_counter() - started)
+
+            if reason is None or tier == last_tier:
+                metrics.counters[f"llm_route_{name}_answered"] += 1
+                self._publish_escalation_rate()
+                return text
+            metrics.counters["llm_escalated"] += 1
+            metrics.counters[f"llm_escalation_{reason}"] += 1
+            self.logger.info("Escalating from %s: %s", name, reason)
+        return None  # pragma: no cover - the last tier always returns
+
+    @staticmethod
+    def _publish_escalation_rate() -> None:
+        routed = metrics.counters["llm_routed_requests"]
+        escalated = metrics.counters["llm_escalated"]
+        metrics.set_gauge("llm_escalation_rate", escalated / routed if routed else 0.0)
+
+    async def _upstream_completion(self, prompt: str, name: str, model: Any) -> Optional[str]:
+        """Call the model with non-blocking exponential backoff between attempts."""
+
+        retrying = AsyncRetrying(
+            wait=wait_exponential(
+                multiplier=1,
+                min=self.settings.llm_retry_min_seconds,
+                max=self.settings.llm_retry_max_seconds,
+            ),
+            stop=stop_after_attempt(self.settings.llm_max_attempts),
+            # Never retry cancellation (a caller's deadline) or an open circuit
+            retry=retry_if_exception_type(Exception)
+            & retry_if_not_exception_type(CircuitOpenError),
+            reraise=True,
+        )
+        async for attempt in retrying:
+            with attempt:
+                if attempt.retry_state.attempt_number > 1:
+                    metrics.counters["llm_retry"] += 1
+                return await self._generate_hedged(prompt, name, model)
+        return None  # pragma: no cover - AsyncRetrying always returns or raises
+
+    async def _generate_hedged(self, prompt: str, name: str, model: Any) -> Optional[str]:
+        """Run one attempt, racing a duplicate once the primary outlives the tail.
+
+        The hedge fires after the model's rolling percentile latency when the
+        budget allows and no calls are queued for the gate. The first
+        successful response wins. A losing hedge is cancelled; a losing
+        primary is left to finish in the background (bounded by the slow-call
+        threshold) so its true latency keeps the percentile window honest.
+        """
+
+        if self.hedge is None:
+            return await self._generate_once(prompt, name, model)
+
+        self.hedge.deposit()
+        metrics.counters["llm_hedge_requests"] += 1
+        delay = self.hedge.delay(name)
+        started = time.perf_counter()
+        primary = asyncio.ensure_future(self._generate_once(prompt, name, model))
+        hedge: Optional[asyncio.Future] = None
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait({primary}, timeout=delay)
+                if not done:
+                    hedge = self._launch_hedge(prompt, name, model)
+            winner = await self._first_success([t for t in (primary, hedge) if t is not None])
+        except BaseException:
+            primary.cancel()
+            if hedge is not None:
+                hedge.cancel()
+            raise
+
+        elapsed = time.perf_counter() - started
+        metrics.observe("llm_hedged_seconds", elapsed)
+        if winner is primary:
+            if hedge is not None:
+                hedge.cancel()
+            self._observe_primary(name, elapsed)
+        else:
+            metrics.counters["llm_hedge_won"] += 1
+            self._drain_primary(name, primary, started)
+        self._publish_hedge_stats()
+        return winner.result()
+
+    def _launch_hedge(self, prompt: str, name: str, model: Any) -> Optional[asyncio.Future]:
+        if self._waiting or not self.hedge.try_spend():
+            metrics.counters["llm_hedge_skipped"] += 1
+            return None
+        metrics.counters["llm_hedge_sent"] += 1
+        return asyncio.ensure_future(self._generate_once(prompt, name, model))
+
+    @staticmethod
+    async def _first_success(tasks: List[asyncio.Future]) -> asyncio.Future:
+        """Return the first task to succeed; raise the primary's error if all fail."""
+
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            succeeded = [task for task in done if task.exception() is None]
+            if succeeded:
+                return succeeded[0]
+        for task in tasks:
+            if task.exception() is not None:
+                raise task.exception()
+        raise RuntimeError("No hedged call completed")  # pragma: no cover
+
+    def _drain_primary(self, name: str, primary: asyncio.Future, started: float) -> None:
+        async def drain() -> None:
+            remaining = self.settings.llm_breaker_slow_call_seconds - (time.perf_counter() - started)
+            try:
+                await asyncio.wait_for(primary, timeout=max(remaining, 0.0))
+            except asyncio.TimeoutError:
+                pass  # Cancelled; the elapsed time is a lower bound
+            except Exception:
+                return
+            self._observe_primary(name, time.perf_counter() - started)
+            self._publish_hedge_stats()
+
+        task = asyncio.ensure_future(drain())
+        self._draining.add(task)
+        task.add_done_callback(self._draining.discard)
+
+    def _observe_primary(self, name: str, latency: float) -> None:
+        self.hedge.observe(name, latency)
+        metrics.observe("llm_unhedged_seconds", latency)
+
+    @staticmethod
+    def _publish_hedge_stats() -> None:
+        requests = metrics.counters["llm_hedge_requests"]
+        sent = metrics.counters["llm_hedge_sent"]
+        metrics.set_gauge("llm_hedge_rate", sent / requests if requests else 0.0)
+        metrics.set_gauge(
+            "llm_hedge_p99_improvement_seconds",
+            metrics.percentile("llm_unhedged_seconds", 99)
+            - metrics.percentile("llm_hedged_seconds", 99),
+        )
+
+    async def _generate_once(self, prompt: str, name: str, model: Any) -> Optional[str]:
+        """Run a single model call under the concurrency limit."""
+
+        async with self._upstream_slot():
+            started = time.perf_counter()
+            response = await self._call_model(prompt, model)
+            latency = time.perf_counter() - started
+        text = self._extract_text(response)
+        self._record_usage(name, prompt, response, text, latency)
+        return text
+
+    def _record_usage(
+        self, name: str, prompt: str, response: Any, text: Optional[str], latency: float
+    ) -> None:
+        """Report token counts, prompt size and latency of one model call.
+
+        Counts come from the response's ``usage_metadata`` when the backend
+        provides it and from ``estimate_tokens`` otherwise. Values are added
+        to the active trace span, so a request that escalates or hedges
+        reports its total usage.
+        """
+
+        input_tokens, output_tokens = usage_counts(response)
+        estimated = input_tokens is None or output_tokens is None
+        if input_tokens is None:
+            input_tokens = estimate_tokens(prompt)
+        else:
+            # Signed relative error of the estimator the prompt budget relies on
+            metrics.observe(
+                "llm_token_estimate_error", (estimate_tokens(prompt) - input_tokens) / input_tokens
             )
-            
-            # Check if response was blocked
-            if response.candidates and len(response.candidates) > 0:
-                candidate = response.candidates[0]
-                if hasattr(candidate, 'finish_reason') and candidate.finish_reason.name == 'SAFETY':
-                    self.logger.warning("Response blocked by safety filters")
-                    return json.dumps(self._fallback(prompt))
-            
-            # Try to get text content
-            if hasattr(response, 'text') and response.text:
-                return response.text
-            elif response.candidates and len(response.candidates) > 0:
-                candidate = response.candidates[0]
-                if hasattr(candidate, 'content') and candidate.content.parts:
-                    return candidate.content.parts[0].text
-            
-            self.logger.warning("No valid text content in response")
-            return json.dumps(self._fallback(prompt))
-            
+        if output_tokens is None:
+            output_tokens = estimate_tokens(text)
+        if estimated:
+            metrics.counters["llm_tokens_estimated"] += 1
+
+        metrics.observe("llm_prompt_chars", len(prompt))
+        metrics.observe("llm_input_tokens", input_tokens)
+        metrics.observe("llm_output_tokens", output_tokens)
+        metrics.counters["llm_input_tokens_total"] += input_tokens
+        metrics.counters["llm_output_tokens_total"] += output_tokens
+        metrics.counters[f"llm_model_{name}_input_tokens"] += input_tokens
+        metrics.counters[f"llm_model_{name}_output_tokens"] += output_tokens
+
+        span = current_span()
+        if span is None:
+            return
+        span.increment_tag("llm_calls")
+        span.increment_tag("llm_prompt_chars", len(prompt))
+        span.increment_tag("llm_input_tokens", input_tokens)
+        span.increment_tag("llm_output_tokens", output_tokens)
+        span.increment_tag("llm_latency_ms", round(latency * 1000, 1))
+        span.add_tag("llm_model", name)
+        if estimated:
+            span.add_tag("llm_tokens_estimated", True)
+
+    @asynccontextmanager
+    async def _upstream_slot(self) -> AsyncIterator[None]:
+        """Admit one upstream call through the breaker and concurrency gate.
+
+        Outcomes and latency of the wrapped block are reported to the breaker
+        and to metrics; cancellation frees the slot without counting as a
+        failure.
+        """
+
+        if not self.breaker.allow_request():
+            raise CircuitOpenError("LLM circuit breaker is open")
+
+        queued_at = time.perf_counter()
+        self._waiting += 1
+        metrics.set_gauge("llm_queue_depth", self._waiting)
+        try:
+            await self._gate().acquire()
+        except BaseException:
+            self.breaker.release()
+            raise
+        finally:
+            self._waiting -= 1
+            metrics.set_gauge("llm_queue_depth", self._waiting)
+        metrics.observe("llm_queue_wait_seconds", time.perf_counter() - queued_at)
+
+        self._in_flight += 1
+        metrics.set_gauge("llm_in_flight", self._in_flight)
+        started = time.perf_counter()
+        try:
+            yield
+        except (asyncio.CancelledError, GeneratorExit):
+            self.breaker.release()
+            raise
         except Exception as e:
+            metrics.counters["llm_call_failure"] += 1
+            self.breaker.record_failure(time.perf_counter() - started)
             self.logger.error(f"Gemini API error: {e}")
             raise
+        else:
+            self.breaker.record_success(time.perf_counter() - started)
+        finally:
+            self._in_flight -= 1
+            metrics.set_gauge("llm_in_flight", self._in_flight)
+            metrics.observe("llm_call_seconds", time.perf_counter() - started)
+            self._gate().release()
 
-    def _fallback(self, prompt: str) -> Dict[str, Any]:
-        """Simple safety-first heuristic used when an API key is missing."""
-
-        lower_prompt = prompt.lower()
-        critical_terms = [
-            "chest pain",
-            "trouble breathing",
-            "suicidal",
-            "stroke",
-            "bleeding",
-            "severe headache",
-        ]
-        category = "general"
-        urgency = "moderate"
-        action = "primary_care"
-
-        for term in critical_terms:
-            if term in lower_prompt:
-                category = "emergency"
-                urgency = "high"
-                action = "go_to_er"
-                break
-
-        if "rash" in lower_prompt:
-            category = "dermatological"
-        elif re.search(r"headache|vision|dizzy", lower_prompt):
-            category = "neurological"
-        elif re.search(r"breath|cough|lung", lower_prompt):
-            category = "respiratory"
-
+    def _request_kwargs(self) -> Dict[str, Any]:
         return {
-            "category": category,
-            "urgency": urgency,
-            "recommended_action": action,
-            "red_flags": [],
-            "reasoning": "Fallback heuristic response when LLM is unavailable.",
+            "generation_config": genai_types.GenerationConfig(**self._generation_config),
+            "safety_settings": self._safety_settings,
         }
 
+    async def _call_model(self, prompt: str, model: Any) -> Any:
+        kwargs = self._request_kwargs()
+        generate_async = getattr(model, "generate_content_async", None)
+        if generate_async is not None:
+            return await generate_async(prompt, **kwargs)
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self._get_executor(), partial(model.generate_content, prompt, **kwargs)
+        )
+
+    def _extract_text(self, response: Any) -> Optional[str]:
+        """Return the response text, or ``None`` when it was blocked or empty."""
+
+        # Check if response was blocked
+        if response.candidates and len(response.candidates) > 0:
+            candidate = response.candidates[0]
+            if hasattr(candidate, 'finish_reason') and candidate.finish_reason.name == 'SAFETY':
+                self.logger.warning("Response blocked by safety filters")
+                return None
+
+        # Try to get text content
+        if hasattr(response, 'text') and response.text:
+            return response.text
+        elif response.candidates and len(response.candidates) > 0:
+            candidate = response.candidates[0]
+            if hasattr(candidate, 'content') and candidate.content.parts:
+                return candidate.content.parts[0].text
+
+        self.logger.warning("No valid text content in response")
+        return None
+
+    def _gate(self) -> asyncio.Semaphore:
+        """Concurrency semaphore bound to the running event loop."""
+
+        loop = asyncio.get_running_loop()
+        if self._gate_loop is not loop:
+            self._gate_loop = loop
+            self._gate_semaphore = asyncio.Semaphore(self.settings.llm_max_concurrency)
+        return self._gate_semaphore
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.settings.llm_executor_workers,
+                thread_name_prefix="medassist-llm",
+            )
+        return self._executor
+
+    def close(self) -> None:
+        """Release the dedicated executor and any cassette being recorded."""
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        for _, model in self._models:
+            writer = getattr(model, "writer", None)
+            if writer is not None:
+                writer.close()
+
+    def _fallback(self, fields: Sequence[Optional[str]], reason: str = "unavailable") -> str:
+        """Serialized safety-first heuristic used when the LLM cannot answer.
+
+        Runs the active rule pack's precompiled fallback rules over the
+        structured request fields; see ``app.rules.fallback``.
+        """
+
+        metrics.counters[f"llm_fallback_{reason}"] += 1
+        category, urgency, action = self.rule_registry.current.fallback.classify(*fields)
+        return render_fallback(category, urgency, action, self.FALLBACK_REASONS[reason])
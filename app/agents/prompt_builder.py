@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from app.agents.tokens import estimate_tokens
+from app.memory.context_compaction import ContextCompactor
+from app.prompts import TRIAGE_PROMPT_TEMPLATE
+
+# Rendered in place of a section that is empty or trimmed away entirely
+PLACEHOLDERS = {
+    "symptoms": "None provided",
+    "context": "None provided",
+    "history": "None available",
+    "medical_context": "None available",
+}
+
+
+@dataclass(frozen=True)
+class BuiltPrompt:
+    text: str
+    tokens: int
+    trimmed: Tuple[str, ...] = ()
+
+
+class TriagePromptBuilder:
+    """Assembles the triage prompt within a token budget.
+
+    The fixed instructions are paid for first. What remains is shared by the
+    variable sections in priority order (``SECTIONS``, highest first): each
+    section is guaranteed ``section_min_tokens`` (or its full size, if
+    smaller) while budget lasts, then higher-priority sections take as much
+    of the rest as they need. Sections over their allocation are shrunk with
+    ``ContextCompactor.fit_text``, so history entries are dropped and
+    summarized whole and free text is cut at a sentence boundary.
+    """
+
+    SECTIONS = ("symptoms", "context", "history", "medical_context")
+
+    def __init__(
+        self,
+        max_tokens: int,
+        section_min_tokens: int = 24,
+        template: str = TRIAGE_PROMPT_TEMPLATE,
+        compactor: Optional[ContextCompactor] = None,
+    ) -> None:
+        self.max_tokens = max_tokens
+        self.section_min_tokens = section_min_tokens
+        self.template = template
+        self.compactor = compactor or ContextCompactor(max_tokens=max_tokens)
+        self._overhead = estimate_tokens(
+            template.format(user_id="", **{name: "" for name in self.SECTIONS})
+        )
+
+    def build(
+        self,
+        user_id: str,
+        symptoms: str,
+        context: Optional[str] = None,
+        history: Optional[str] = None,
+        medical_context: Optional[str] = None,
+    ) -> BuiltPrompt:
+        sections = {
+            "symptoms": symptoms or "",
+            "context": context or "",
+            "history": history or "",
+            "medical_context": medical_context or "",
+        }
+        sizes = {name: estimate_tokens(text) for name, text in sections.items()}
+        available = self.max_tokens - self._overhead - estimate_tokens(user_id)
+        allocation = self.allocate(sizes, available)
+
+        trimmed = []
+        for name in self.SECTIONS:
+            if sizes[name] > allocation[name]:
+                sections[name] = self.compactor.fit_text(sections[name], allocation[name])
+                trimmed.append(name)
+        text = self.template.format(
+            user_id=user_id,
+            **{name: value or PLACEHOLDERS[name] for name, value in sections.items()},
+        )
+        return BuiltPrompt(text=text, tokens=estimate_tokens(text), trimmed=tuple(trimmed))
+
+    def allocate(self, sizes: Dict[str, int], available: int) -> Dict[str, int]:
+        """Split ``available`` tokens across sections; see the class docstring."""
+
+        remaining = max(available, 0)
+        if sum(sizes.values()) <= remaining:
+            return dict(sizes)
+        allocation: Dict[str, int] = {}
+        for name in self.SECTIONS:
+            allocation[name] = min(sizes[name], self.section_min_tokens, remaining)
+            remaining -= allocation[name]
+        for name in self.SECTIONS:
+            extra = min(sizes[name] - allocation[name], remaining)
+            allocation[name] += extra
+            remaining -= extra
+        return allocation
@@ -1,21 +1,28 @@
 from __future__ import annotations
 
-import asyncio
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.db.db import session_scope
+from app.db.db import AsyncDatabase, async_session_scope
 from app.db.models import MedicationCheck, ReminderEvent, SymptomEvent, User
 from app.utils import configure_logging
 
 
 class ReminderLoopAgent:
-    """Loop agent that periodically scans user data and emits reminders."""
+    """Loop agent that periodically scans user data and emits reminders.
 
-    def __init__(self, interval_seconds: int = 3600) -> None:
+    The scan runs on the app's event loop through the async engine.
+    """
+
+    def __init__(
+        self, interval_seconds: int = 3600, database: Optional[AsyncDatabase] = None
+    ) -> None:
         self.interval_seconds = interval_seconds
+        self.database = database
         self.scheduler = AsyncIOScheduler(timezone=timezone.utc)
         self.job_id = "medassist-reminder-loop"
         self.logger = configure_logging()
@@ -39,6 +46,8 @@ class ReminderLoopAgent:
         if not self._is_running:
             return
         self.scheduler.shutdown(wait=False)
+        # APScheduler stays bound to the loop it started on; restart with a fresh one
+        self.scheduler = AsyncIOScheduler(timezone=timezone.utc)
         self._is_running = False
         self.logger.info("Reminder loop agent stopped")
 
@@ -64,16 +73,15 @@ class ReminderLoopAgent:
     async def _run_cycle(self) -> None:
         """Scheduled job entry point."""
 
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, self._scan_and_emit)
+        await self._scan_and_emit()
 
-    def _scan_and_emit(self) -> None:
+    async def _scan_and_emit(self) -> None:
         cutoff = datetime.now(timezone.utc) - timedelta(days=7)
-        with session_scope() as session:
-            users = session.exec(select(User)).all()
+        async with async_session_scope(self.database) as session:
+            users = (await session.exec(select(User))).all()
             for user in users:
-                if self._needs_medication_followup(session, user.user_id, cutoff):
-                    if self._recent_reminder_exists(session, user.user_id):
+                if await self._needs_medication_followup(session, user.user_id, cutoff):
+                    if await self._recent_reminder_exists(session, user.user_id):
                         continue
                     message = (
                         f"User {user.user_id} has no medication safety check in the last 7 days."
@@ -87,38 +95,37 @@ class ReminderLoopAgent:
                     session.add(reminder)
                     self.logger.info("Reminder generated: %s", message)
 
-    def _needs_medication_followup(
-        self, session: Session, user_id: str, cutoff: datetime
+    async def _needs_medication_followup(
+        self, session: AsyncSession, user_id: str, cutoff: datetime
     ) -> bool:
-        latest_check = session.exec(
+        latest_check = (await session.exec(
             select(MedicationCheck)
             .where(MedicationCheck.user_id == user_id)
             .order_by(MedicationCheck.created_at.desc())
-        ).first()
+        )).first()
         if latest_check:
             return latest_check.created_at.replace(tzinfo=timezone.utc) < cutoff
 
-        latest_event = session.exec(
+        latest_event = (await session.exec(
             select(SymptomEvent)
             .where(SymptomEvent.user_id == user_id)
             .order_by(SymptomEvent.created_at.desc())
-        ).first()
+        )).first()
         if latest_event:
             return latest_event.created_at.replace(tzinfo=timezone.utc) < cutoff
         return False
 
-    def _recent_reminder_exists(self, session: Session, user_id: str) -> bool:
+    async def _recent_reminder_exists(self, session: AsyncSession, user_id: str) -> bool:
         recent_cutoff = datetime.now(timezone.utc) - timedelta(days=1)
-        existing = session.exec(
+        existing = (await session.exec(
             select(ReminderEvent)
             .where(ReminderEvent.user_id == user_id)
             .where(ReminderEvent.reminder_type == "medication_followup")
             .where(ReminderEvent.created_at >= recent_cutoff)
-        ).first()
+        )).first()
         return existing is not None
 
     async def run_once(self) -> None:
         """Manual trigger for tests."""
 
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, self._scan_and_emit)
+        await self._scan_and_emit()
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Dict, TypeVar
+
+from app.observability.metrics import metrics
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one underlying task.
+
+    The first caller for a key starts the work as its own task; callers that
+    arrive while it is running await the same task and receive its result or
+    its exception. Each waiter awaits through ``asyncio.shield`` so a cancelled
+    waiter (a dropped HTTP request, say) never cancels the shared call for
+    everyone else; only when the last waiter gives up is the call cancelled.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._calls: Dict[str, asyncio.Future] = {}
+        self._waiters: Dict[asyncio.Future, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._calls[key] = task
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+            metrics.counters[f"{self.name}_singleflight_leader"] += 1
+        else:
+            metrics.counters[f"{self.name}_singleflight_coalesced"] += 1
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    # Nobody is left to use the result (e.g. a deadline expired).
+                    # Forget it now, not when it finishes unwinding, so a caller
+                    # arriving in between starts afresh instead of joining it.
+                    task.cancel()
+                    if self._calls.get(key) is task:
+                        del self._calls[key]
+
+    def _forget(self, key: str, task: asyncio.Future) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,148 @@
+"""Offline stand-in for a Gemini ``GenerativeModel``.
+
+``StubModel`` answers with canned text after sleeping for a latency drawn
+from a configurable distribution, which makes tail-latency behaviour
+(hedging, breakers, timeouts) reproducible without network access::
+
+    model = StubModel(latency=latency_distribution("tail:0.2,2.0,0.05"))
+    client = LLMClient(model=model)
+
+Distributions are plain callables taking a ``random.Random`` and returning
+seconds; ``latency_distribution`` builds one from a short spec string.
+``error_rate`` makes that share of calls raise ``InjectedUpstreamError``
+after their latency has elapsed, like a real upstream failure would.
+Streamed responses are split into ``chunk_size``-character chunks, and
+``peak`` records the most calls that were ever in flight at once.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import random
+import time
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Callable, Optional, Union
+
+LatencyDistribution = Callable[[random.Random], float]
+
+
+class InjectedUpstreamError(RuntimeError):
+    """Synthetic upstream failure raised by offline model backends."""
+
+
+DEFAULT_RESPONSE = json.dumps(
+    {
+        "category": "general",
+        "urgency": "moderate",
+        "recommended_action": "primary_care",
+        "red_flags": [],
+        "reasoning": "Stub model response.",
+        "confidence": 0.9,
+    }
+)
+
+
+def fixed(seconds: float) -> LatencyDistribution:
+    return lambda rng: seconds
+
+
+def uniform(low: float, high: float) -> LatencyDistribution:
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal(median: float, sigma: float) -> LatencyDistribution:
+    mu = math.log(median)
+    return lambda rng: rng.lognormvariate(mu, sigma)
+
+
+def long_tail(
+    base: float, tail: float, tail_probability: float, jitter: float = 0.0
+) -> LatencyDistribution:
+    """Mostly ``base`` seconds, but ``tail`` seconds with the given probability.
+
+    ``jitter`` is the sigma of a log-normal factor applied to either value.
+    """
+
+    def sample(rng: random.Random) -> float:
+        value = tail if rng.random() < tail_probability else base
+        return value * rng.lognormvariate(0.0, jitter) if jitter else value
+
+    return sample
+
+
+_DISTRIBUTIONS = {
+    "fixed": fixed,
+    "uniform": uniform,
+    "lognormal": lognormal,
+    "tail": long_tail,
+}
+
+
+def latency_distribution(spec: str) -> LatencyDistribution:
+    """Parse ``name:arg,arg`` such as ``lognormal:0.4,0.6`` or ``tail:0.2,3,0.02,0.1``."""
+
+    name, _, args = spec.partition(":")
+    factory = _DISTRIBUTIONS.get(name.strip())
+    if factory is None:
+        raise ValueError(f"Unknown latency distribution {name!r}; expected one of {sorted(_DISTRIBUTIONS)}")
+    values = [float(arg) for arg in args.split(",") if arg.strip()]
+    try:
+        return factory(*values)
+    except TypeError as exc:
+        raise ValueError(f"Bad arguments for latency distribution {spec!r}") from exc
+
+
+class StubModel:
+    """Latency-shaped fake exposing the SDK's ``generate_content`` methods."""
+
+    def __init__(
+        self,
+        response: Union[str, Callable[[str], str]] = DEFAULT_RESPONSE,
+        latency: Optional[LatencyDistribution] = None,
+        seed: Optional[int] = 0,
+        error_rate: float = 0.0,
+        chunk_size: Optional[int] = None,
+    ) -> None:
+        self.response = response
+        self.latency = latency or fixed(0.0)
+        self.rng = random.Random(seed)
+        self.error_rate = error_rate
+        self.chunk_size = chunk_size
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+
+    def _respond(self, prompt: str) -> Any:
+        self.calls += 1
+        if self.error_rate and self.rng.random() < self.error_rate:
+            raise InjectedUpstreamError("Injected stub model failure")
+        text = self.response(prompt) if callable(self.response) else self.response
+        return SimpleNamespace(text=text, candidates=[])
+
+    async def generate_content_async(self, prompt: str, stream: bool = False, **kwargs: Any) -> Any:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.latency(self.rng))
+            response = self._respond(prompt)
+        finally:
+            self.active -= 1
+        if stream:
+            return self._chunks(response)
+        return response
+
+    async def _chunks(self, response: Any) -> AsyncIterator[Any]:
+        """Yield the text in pieces; the last one carries the response's metadata."""
+
+        text = response.text
+        size = self.chunk_size or len(text) or 1
+        pieces = [text[i : i + size] for i in range(0, len(text), size)] or [""]
+        for piece in pieces[:-1]:
+            yield SimpleNamespace(text=piece, candidates=[])
+        yield SimpleNamespace(**{**vars(response), "text": pieces[-1]})
+
+    def generate_content(self, prompt: str, **kwargs: Any) -> Any:
+        time.sleep(self.latency(self.rng))
+        return self._respond(prompt)
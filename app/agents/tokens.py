@@ -0,0 +1,130 @@
+"""Offline token estimates for prompts and model output.
+
+Gemini reports exact counts in ``usage_metadata``, but not for every path
+(offline backends, blocked responses, streams cut short) and not before a
+prompt is sent, and the SDK has no local tokenizer: ``count_tokens`` is a
+network call, too slow for budgeting every prompt. ``estimate_tokens`` is a
+heuristic instead. Each punctuation mark costs one token and each word one
+token per ``WORD_PIECE_CHARS`` characters, roughly how SentencePiece splits
+English text. The raw figure is multiplied by ``TOKEN_ESTIMATE_SCALE``.
+
+Calibrate the scale against real counts with::
+
+    python -m app.agents.tokens samples.jsonl
+
+where each line is ``{"prompt": ...}``, optionally with a recorded
+``"tokens"`` count; prompts without one are counted via the API. In
+production ``LLMClient`` compares the estimate with every count the SDK
+reports, in the ``llm_token_estimate_error`` histogram.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import re
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+from app.config import get_settings
+
+WORD_PIECE_CHARS = 4
+
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def _piece_cost(length: int) -> int:
+    return -(-length // WORD_PIECE_CHARS)
+
+
+def raw_token_estimate(text: Optional[str]) -> int:
+    """Unscaled heuristic count of ``text``."""
+
+    if not text:
+        return 0
+    return sum(_piece_cost(match.end() - match.start()) for match in _PIECE_RE.finditer(text))
+
+
+def estimate_tokens(text: Optional[str], scale: Optional[float] = None) -> int:
+    """Approximate token count of ``text``, calibrated by ``scale``."""
+
+    raw = raw_token_estimate(text)
+    scale = get_settings().token_estimate_scale if scale is None else scale
+    return math.ceil(raw * scale) if raw else 0
+
+
+def truncate_to_tokens(text: str, max_tokens: int, scale: Optional[float] = None) -> str:
+    """Longest prefix of ``text`` whose estimate fits in ``max_tokens``."""
+
+    scale = get_settings().token_estimate_scale if scale is None else scale
+    budget = max_tokens / scale
+    count = 0
+    end = 0
+    for match in _PIECE_RE.finditer(text):
+        count += _piece_cost(match.end() - match.start())
+        if count > budget:
+            return text[:end]
+        end = match.end()
+    return text
+
+
+def calibrate(samples: Sequence[Tuple[str, int]]) -> Tuple[float, float, float]:
+    """Fit the scale to ``(text, real_count)`` samples.
+
+    Returns ``(scale, mean_abs_error_unscaled, mean_abs_error_scaled)``, the
+    errors relative to the real counts.
+    """
+
+    samples = [(text, actual) for text, actual in samples if actual > 0]
+    if not samples:
+        raise ValueError("Calibration needs samples with real token counts.")
+    raws = [raw_token_estimate(text) for text, _ in samples]
+    scale = sum(actual for _, actual in samples) / max(1, sum(raws))
+
+    def error(factor: float) -> float:
+        return sum(abs(raw * factor - actual) / actual for raw, (_, actual) in zip(raws, samples)) / len(samples)
+
+    return scale, error(1.0), error(scale)
+
+
+def usage_counts(response: Any) -> Tuple[Optional[int], Optional[int]]:
+    """``(input_tokens, output_tokens)`` reported by the SDK, when present."""
+
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return None, None
+    prompt = getattr(usage, "prompt_token_count", None)
+    output = getattr(usage, "candidates_token_count", None)
+    return prompt or None, output or None
+
+
+def _count_with_api(prompts: List[str]) -> List[int]:
+    import google.generativeai as genai
+
+    settings = get_settings()
+    if not settings.gemini_api_key:
+        raise SystemExit("GEMINI_API_KEY is required to count prompts without recorded tokens.")
+    genai.configure(api_key=settings.gemini_api_key)
+    model = genai.GenerativeModel(settings.gemini_model)
+    return [model.count_tokens(prompt).total_tokens for prompt in prompts]
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Calibrate the offline token estimate.")
+    parser.add_argument("samples", help='JSON lines of {"prompt": ..., "tokens": optional}')
+    args = parser.parse_args(argv)
+
+    with open(args.samples, encoding="utf-8") as handle:
+        rows = [json.loads(line) for line in handle if line.strip()]
+    missing = [row["prompt"] for row in rows if not row.get("tokens")]
+    counted = iter(_count_with_api(missing) if missing else [])
+    samples = [(row["prompt"], row.get("tokens") or next(counted)) for row in rows]
+
+    scale, before, after = calibrate(samples)
+    print(f"samples: {len(samples)}")
+    print(f"mean abs error: {before:.1%} unscaled, {after:.1%} at scale {scale:.3f}")
+    print(f"TOKEN_ESTIMATE_SCALE={scale:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,61 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+import asyncio
+import json
+import random
+import re
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple
 
+from app.agents.fastpath import FastPathClassifier, load_default_classifier, split_label
 from app.agents.llm_client import LLMClient
-from app.prompts import TRIAGE_PROMPT_TEMPLATE
-from app.schemas import TriageRequest, TriageResponse
-from app.tools.manager import ToolManager
-from app.utils import configure_logging, safe_json_loads
-from app.observability.metrics import track_execution
-from app.observability.tracing import trace_operation
+from app.agents.medication import MedicationSafetyAgent
+from app.agents.prompt_builder import TriagePromptBuilder
+from app.config import Settings, get_settings
+from app.deadline import current_deadline, deadline_scope
+from app.rules.packs import RulePack, RulePackRegistry, rule_registry
+from app.schemas import TriageLLMOutput, TriageRequest, TriageResponse
+from app.tools.manager import ToolCall, ToolManager
+from app.utils import PartialJSONFieldParser, configure_logging, parse_model_output
+from app.observability.metrics import metrics, track_execution
+from app.observability.tracing import TraceSpan, trace_operation
+
+
+# Candidate drug names after a verb of use ("taking ibuprofen", "started metformin")
+_MEDICATION_MENTION_RE = re.compile(
+    r"\b(?:taking|take|took|using|started|prescribed)\s+(?:(?:my|some|the)\s+)?([a-z][a-z-]{3,})"
+)
+_KNOWN_MEDICATIONS = sorted(
+    {name for combo in MedicationSafetyAgent.INTERACTION_RULES for name in combo}
+)
+# Whole-word mentions only, so a short name never fires inside another word
+_KNOWN_MEDICATION_RE = re.compile(
+    r"\b(" + "|".join(re.escape(name) for name in _KNOWN_MEDICATIONS) + r")\b"
+)
+
+
+def mentioned_medications(
+    text: str, limit: int = 3, is_drug: Optional[Callable[[str], bool]] = None
+) -> List[str]:
+    """Medication names mentioned in free text, in order of appearance.
+
+    A word after a verb of use only counts if it is a known drug: one of the
+    interaction-rule drugs, or a name ``is_drug`` recognises (the RxTerms
+    local index in production). "started feeling dizzy" names no drug.
+    """
+
+    lowered = text.lower()
+    found = [
+        (match.start(1), match.group(1))
+        for match in _MEDICATION_MENTION_RE.finditer(lowered)
+        if match.group(1) in _KNOWN_MEDICATIONS or (is_drug is not None and is_drug(match.group(1)))
+    ]
+    found.extend((match.start(), match.group(1)) for match in _KNOWN_MEDICATION_RE.finditer(lowered))
+    names: List[str] = []
+    for _, name in sorted(found):
+        if name not in names:
+            names.append(name)
+    return names[:limit]
 
 
 class RedFlagEngine:
@@ -16,180 +63,493 @@ class RedFlagEngine:
 
     - critical: force immediate ER escalation (true red flags)
     - urgent: raise minimum triage severity but do not force ER alone
+
+    Phrase tables come from a versioned rule pack (``app/rules/red_flags.json``
+    by default) held in a shared registry, so every engine sees the same
+    compiled snapshot and picks up hot reloads without a restart.
     """
 
-    def __init__(self) -> None:
-        # Critical red flags that should always escalate to ER
-        self.critical_phrases: Dict[str, str] = {
-            # Cardiac/respiratory
-            "chest pain": "Possible cardiac emergency.",
-            "heart pain": "Possible cardiac emergency.",
-            "pressure in chest": "Possible cardiac emergency.",
-            "tightness in chest": "Possible cardiac emergency.",
-            "pain radiating to left arm": "Possible myocardial infarction.",
-            "jaw pain": "Possible cardiac ischemia.",
-            "trouble breathing": "Respiratory distress risk.",
-            "shortness of breath at rest": "Respiratory distress risk.",
-            "blue lips": "Hypoxia.",
-            # Neurological emergency
-            "worst headache of my life": "Possible subarachnoid hemorrhage.",
-            "severe headache": "Neurological emergency risk.",
-            "sudden vision loss": "Stroke or neurological emergency.",
-            "weakness on one side": "Stroke risk.",
-            "difficulty speaking": "Stroke risk.",
-            "loss of consciousness": "Altered mental status.",
-            "seizure": "New seizure or status epilepticus risk.",
-            # Hemorrhage/sepsis/anaphylaxis/trauma
-            "uncontrolled bleeding": "Hemorrhage risk.",
-            "vomiting blood": "GI bleed risk.",
-            "coughing up blood": "Hemoptysis.",
-            "black tarry stools": "GI bleeding.",
-            "stiff neck with fever": "Possible meningitis.",
-            "swollen tongue": "Airway compromise.",
-            "anaphylaxis": "Severe allergic reaction.",
-            "severe burn": "Severe injury.",
-            "major trauma": "Severe injury.",
-            # Mental health crisis
-            "suicidal": "Mental health crisis.",
-            "not responsive": "Altered mental status.",
-        }
-        # Urgent (yellow flags) — warrant prompt care but not automatic ER
-        self.urgent_phrases: Dict[str, str] = {
-            "severe shortness of breath": "Respiratory distress risk.",
-            "fainting": "Syncope — evaluate for serious causes.",
-            "new confusion": "Acute cognitive change.",
-            "severe abdominal pain": "Possible surgical abdomen.",
-            "blood in urine": "Hematuria.",
-            "persistent high fever": "Infection risk.",
-            "dehydration": "Significant volume loss.",
-            "severe back pain": "Possible serious etiology.",
-        }
+    def __init__(self, registry: Optional[RulePackRegistry] = None) -> None:
+        self.registry = registry or rule_registry
+
+    @property
+    def rules(self) -> RulePack:
+        """Active rule snapshot; hold onto it for the duration of a request."""
+        return self.registry.current
+
+    @property
+    def critical_phrases(self) -> Mapping[str, str]:
+        return self.rules.critical_phrases
+
+    @property
+    def urgent_phrases(self) -> Mapping[str, str]:
+        return self.rules.urgent_phrases
 
     def detect(self, text: str) -> Dict[str, List[str]]:
-        lowered = text.lower()
-        critical = [p for p in self.critical_phrases if p in lowered]
-        urgent = [p for p in self.urgent_phrases if p in lowered]
-        return {"critical": critical, "urgent": urgent}
+        return self.rules.detect(text)
 
 
 class TriageAgent:
     """Coordinates rule-based safety checks with LLM reasoning."""
 
+    # Fields surfaced to streaming clients as soon as the LLM completes them
+    STREAMED_FIELDS = ("category", "urgency", "recommended_action")
+    # Minimum severity when urgent (not critical) red flags are present
+    URGENT_FLOORS = {
+        "urgency": {"low": "moderate"},
+        "recommended_action": {"self_care": "primary_care"},
+    }
+
     def __init__(
         self,
         llm_client: Optional[LLMClient] = None,
         red_flag_engine: Optional[RedFlagEngine] = None,
         tool_manager: Optional[ToolManager] = None,
+        fast_path: Optional[FastPathClassifier] = None,
+        settings: Optional[Settings] = None,
+        prompt_builder: Optional[TriagePromptBuilder] = None,
     ) -> None:
+        self.settings = settings or get_settings()
         self.llm_client = llm_client or LLMClient()
         self.red_flag_engine = red_flag_engine or RedFlagEngine()
         self.tool_manager = tool_manager or ToolManager()
+        self.fast_path = fast_path or load_default_classifier()
+        self.prompt_builder = prompt_builder or TriagePromptBuilder(
+            self.settings.triage_prompt_max_tokens,
+            self.settings.triage_prompt_section_min_tokens,
+        )
         self.logger = configure_logging()
+        # Strong references to in-flight shadow comparisons
+        self._shadow_tasks: Set[asyncio.Task] = set()
 
     @track_execution("triage_agent")
     async def run(self, request: TriageRequest) -> TriageResponse:
-        with trace_operation(f"triage_analysis_{request.user_id}") as span:
-            span.add_tag("user_id", request.user_id)
-            span.add_tag("symptoms_length", len(request.symptoms))
-
-            symptoms_blob = f"{request.symptoms} {request.context or ''}"
-            flags = self.red_flag_engine.detect(symptoms_blob)
-            span.add_tag("critical_flags_detected", len(flags["critical"]))
-            span.add_tag("urgent_flags_detected", len(flags["urgent"]))
-            # True red flags force ER escalation
-            if flags["critical"]:
-                span.add_tag("red_flag_override", True)
-                span.log(f"Critical red flags detected: {flags['critical']}")
-                self.logger.info("Critical red-flag override triggered: %s", flags["critical"])
-                return TriageResponse(
-                    category="emergency",
-                    urgency="high",
-                    recommended_action="go_to_er",
-                    red_flags=flags["critical"],  # only critical items are red_flags
-                    reasoning="Deterministic critical red-flag rule forced escalation.",
-                )
+        """Triage a request within ``triage_deadline_seconds``.
 
-            # Use tools to enhance context
-            span.log("Gathering medical context")
-            medical_info = await self._gather_medical_context(request.symptoms)
-            span.add_tag("medical_context_available", bool(medical_info))
+        The budget tightens any deadline the caller already set (the API sets
+        one per request). Stages that run out of time are skipped and listed
+        in ``TriageResponse.degraded``.
+        """
 
-            prompt = TRIAGE_PROMPT_TEMPLATE.format(
-                user_id=request.user_id,
-                symptoms=request.symptoms,
-                context=request.context or "None provided",
-                medical_context=medical_info,
-            )
-            span.log("Calling LLM for triage analysis")
-            raw_output = await self.llm_client.complete(prompt)
-            parsed = safe_json_loads(raw_output)
-            span.add_tag("llm_response_parsed", bool(parsed))
-
-            if not parsed:
-                span.log("LLM response parsing failed, using fallback", "warning")
-                self.logger.warning("LLM response parsing failed; falling back to safe mode.")
-                # Apply minimum severity if urgent flags were detected
-                urgency = "moderate" if flags["urgent"] else "moderate"
-                action = "primary_care"
-                return TriageResponse(
-                    category="general",
-                    urgency=urgency,
-                    recommended_action=action,
-                    red_flags=[],
-                    reasoning="Fallback response due to parsing failure.",
+        with trace_operation(f"triage_analysis_{request.user_id}") as span, deadline_scope(
+            self.settings.triage_deadline_seconds,
+            reserve=self.settings.triage_deadline_reserve_seconds,
+        ) as deadline:
+            result = await self._triage(request, span)
+            if deadline.degraded:
+                result.degraded = list(deadline.degraded)
+                span.add_tag("degraded_stages", result.degraded)
+                metrics.counters["triage_degraded"] += 1
+            return result
+
+    async def _triage(self, request: TriageRequest, span: TraceSpan) -> TriageResponse:
+        rules, flags = self._screen(request, span)
+        # True red flags force ER escalation
+        if flags["critical"]:
+            return self._critical_response(rules, flags, span)
+
+        fast_answer = self._try_fast_path(request, rules, flags, span)
+        if fast_answer is not None:
+            return fast_answer
+
+        prompt = await self._build_prompt(request, span)
+        deadline = current_deadline()
+        span.log("Calling LLM for triage analysis")
+        raw_output = await self.llm_client.complete(
+            prompt,
+            escalate=self._escalation_check(flags),
+            fallback_fields=(request.symptoms, request.context),
+            **self._cache_options(request, rules.version, deadline.degraded if deadline else ()),
+        )
+        return self._finalize(raw_output, rules, flags, span)
+
+    async def run_stream(
+        self, request: TriageRequest
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Stream triage progress as ``(event, data)`` pairs.
+
+        The deterministic red-flag verdict is yielded before any I/O, then each
+        of ``STREAMED_FIELDS`` as soon as the LLM has finished writing it, and
+        finally the guardrail-adjusted ``TriageResponse`` as a ``result`` event.
+        Streamed fields already carry the minimum-severity floors, so a client
+        never shows a lower urgency than the result will.
+        """
+
+        started = time.time()
+        success = False
+        try:
+            with trace_operation(f"triage_stream_{request.user_id}") as span:
+                rules, flags = self._screen(request, span)
+                yield "red_flags", {
+                    "critical": flags["critical"],
+                    "urgent": flags["urgent"],
+                    "rule_pack_version": rules.version,
+                }
+                if flags["critical"]:
+                    result = self._critical_response(rules, flags, span)
+                else:
+                    result = self._try_fast_path(request, rules, flags, span)
+                if result is None:
+                    # The stream itself is open-ended; only context gathering is budgeted
+                    with deadline_scope(self.settings.triage_deadline_seconds) as deadline:
+                        prompt = await self._build_prompt(request, span)
+                    span.log("Streaming LLM triage analysis")
+                    fields = PartialJSONFieldParser(self.STREAMED_FIELDS)
+                    chunks: List[str] = []
+                    async for chunk in self.llm_client.stream(
+                        prompt,
+                        fallback_fields=(request.symptoms, request.context),
+                        **self._cache_options(request, rules.version, deadline.degraded),
+                    ):
+                        chunks.append(chunk)
+                        for name, value in fields.feed(chunk):
+                            yield "field", {"name": name, "value": self._floor(name, value, flags)}
+                    result = self._finalize("".join(chunks), rules, flags, span)
+                    result.degraded = list(deadline.degraded)
+                yield "result", result.model_dump()
+            success = True
+        finally:
+            metrics.record_agent_execution("triage_agent_stream", time.time() - started, success)
+
+    def _screen(
+        self, request: TriageRequest, span: TraceSpan
+    ) -> Tuple[RulePack, Dict[str, List[str]]]:
+        """Run the deterministic red-flag scan against a pinned rule snapshot."""
+
+        span.add_tag("user_id", request.user_id)
+        span.add_tag("symptoms_length", len(request.symptoms))
+
+        symptoms_blob = f"{request.symptoms} {request.context or ''}"
+        # Pin one rule snapshot so a concurrent reload cannot change it mid-request
+        rules = self.red_flag_engine.rules
+        flags = rules.detect(symptoms_blob)
+        span.add_tag("rule_pack_version", rules.version)
+        span.add_tag("critical_flags_detected", len(flags["critical"]))
+        span.add_tag("urgent_flags_detected", len(flags["urgent"]))
+        return rules, flags
+
+    def _critical_response(
+        self, rules: RulePack, flags: Dict[str, List[str]], span: TraceSpan
+    ) -> TriageResponse:
+        span.add_tag("red_flag_override", True)
+        span.log(f"Critical red flags detected: {flags['critical']}")
+        self.logger.info("Critical red-flag override triggered: %s", flags["critical"])
+        return TriageResponse(
+            category="emergency",
+            urgency="high",
+            recommended_action="go_to_er",
+            red_flags=flags["critical"],  # only critical items are red_flags
+            reasoning="Deterministic critical red-flag rule forced escalation.",
+            rule_pack_version=rules.version,
+        )
+
+    def _escalation_check(
+        self, flags: Dict[str, List[str]]
+    ) -> Callable[[str], Optional[str]]:
+        """Build the predicate ``LLMClient`` uses to escalate to a larger model."""
+
+        min_confidence = self.settings.triage_min_confidence
+
+        def check(raw_output: str) -> Optional[str]:
+            parsed = parse_model_output(raw_output, TriageLLMOutput)
+            if parsed is None:
+                return "unparsable"
+            if parsed.confidence is not None and parsed.confidence < min_confidence:
+                return "low_confidence"
+            # A cheap model downplaying deterministic urgent flags gets a second opinion
+            if flags["urgent"] and (
+                parsed.urgency == "low" or parsed.recommended_action == "self_care"
+            ):
+                return "urgent_flag_conflict"
+            return None
+
+        return check
+
+    def _try_fast_path(
+        self,
+        request: TriageRequest,
+        rules: RulePack,
+        flags: Dict[str, List[str]],
+        span: TraceSpan,
+    ) -> Optional[TriageResponse]:
+        """Answer confident low-risk requests locally, skipping tools and the LLM."""
+
+        if self.fast_path is None:
+            return None
+        label, confidence = self.fast_path.predict(f"{request.symptoms} {request.context or ''}")
+        span.add_tag("fast_path_confidence", round(confidence, 3))
+        if (
+            confidence < self.settings.fastpath_confidence_threshold
+            or not self.fast_path.is_low_risk(label)
+        ):
+            metrics.counters["fastpath_defer"] += 1
+            self._publish_fast_path_rate()
+            return None
+
+        metrics.counters["fastpath_hit"] += 1
+        self._publish_fast_path_rate()
+        span.add_tag("fast_path", True)
+        category, urgency, action = split_label(label)
+        result = self._finalize(
+            json.dumps(
+                {
+                    "category": category,
+                    "urgency": urgency,
+                    "recommended_action": action,
+                    "red_flags": [],
+                    "reasoning": f"Local fast-path classifier (confidence {confidence:.2f}).",
+                }
+            ),
+            rules,
+            flags,
+            span,
+        )
+        if random.random() < self.settings.fastpath_shadow_rate:
+            task = asyncio.ensure_future(self._shadow_compare(request, result))
+            self._shadow_tasks.add(task)
+            task.add_done_callback(self._shadow_tasks.discard)
+        return result
+
+    async def _shadow_compare(self, request: TriageRequest, fast: TriageResponse) -> None:
+        """Ask the LLM the same question and count disagreements with the fast path."""
+
+        try:
+            with trace_operation(f"fast_path_shadow_{request.user_id}") as span:
+                prompt = await self._build_prompt(request, span)
+                parsed = parse_model_output(
+                    await self.llm_client.complete(
+                        prompt,
+                        fallback_fields=(request.symptoms, request.context),
+                        **self._cache_options(request, fast.rule_pack_version),
+                    ),
+                    TriageLLMOutput,
                 )
+            if parsed is None:
+                return
+            metrics.counters["fastpath_shadow_total"] += 1
+            llm_label = (parsed.category, parsed.urgency, parsed.recommended_action)
+            if llm_label != (fast.category, fast.urgency, fast.recommended_action):
+                metrics.counters["fastpath_shadow_disagree"] += 1
+                self.logger.info(
+                    "Fast path disagreed with LLM: %s vs %s",
+                    (fast.category, fast.urgency, fast.recommended_action),
+                    llm_label,
+                )
+        except Exception as e:
+            self.logger.warning(f"Fast-path shadow comparison failed: {e}")
+
+    @staticmethod
+    def _publish_fast_path_rate() -> None:
+        hits = metrics.counters["fastpath_hit"]
+        total = hits + metrics.counters["fastpath_defer"]
+        metrics.set_gauge("fastpath_hit_rate", hits / total if total else 0.0)
+
+    def _cache_options(
+        self, request: TriageRequest, rule_pack_version: str, degraded: Sequence[str] = ()
+    ) -> Dict[str, Any]:
+        """How the LLM call for ``request`` may use the shared response cache.
+
+        Without health history the answer depends only on the complaint, so
+        it is keyed on the clinical inputs and the rule pack version, and
+        identical complaints from different users share one entry and one
+        upstream call. The medical context is left out of the key because
+        the tools derive it from these same inputs; when a lookup was skipped
+        (``degraded`` stages) the prompt lacks part of it, so the answer may
+        be served from the cache but is not stored. An answer shaped by one
+        user's history is not reused for anyone else, nor stored, so such
+        requests bypass the cache.
+        """
+
+        if request.history:
+            return {"bypass_cache": True}
+        return {
+            "cache_inputs": {
+                "template": self.prompt_builder.template,
+                "rule_pack_version": rule_pack_version,
+                "symptoms": request.symptoms,
+                "context": request.context or "",
+                "medications": request.medications,
+            },
+            "cache_write": not degraded,
+        }
+
+    async def _build_prompt(self, request: TriageRequest, span: TraceSpan) -> str:
+        # Use tools to enhance context
+        span.log("Gathering medical context")
+        medical_info = await self._gather_medical_context(request)
+        span.add_tag("medical_context_available", bool(medical_info))
+
+        prompt = self.prompt_builder.build(
+            user_id=request.user_id,
+            symptoms=request.symptoms,
+            context=request.context,
+            history=request.history,
+            medical_context=medical_info,
+        )
+        metrics.observe("triage_prompt_tokens", prompt.tokens)
+        span.add_tag("prompt_tokens", prompt.tokens)
+        if prompt.trimmed:
+            metrics.counters["triage_prompt_trimmed"] += 1
+            span.add_tag("prompt_trimmed_sections", list(prompt.trimmed))
+        return prompt.text
+
+    def _finalize(
+        self,
+        raw_output: str,
+        rules: RulePack,
+        flags: Dict[str, List[str]],
+        span: TraceSpan,
+    ) -> TriageResponse:
+        """Parse LLM output and apply the deterministic safety guardrails."""
+
+        parsed = parse_model_output(raw_output, TriageLLMOutput)
+        span.add_tag("llm_response_parsed", parsed is not None)
 
-            # Post-process LLM output with guardrails: do not over-flag, but enforce minimums
-            category = parsed.get("category", "general")
-            urgency = parsed.get("urgency", "moderate")
-            action = parsed.get("recommended_action", "primary_care")
-            reasoning = parsed.get("reasoning", "LLM reasoning unavailable.")
-            llm_red_flags = parsed.get("red_flags", [])
-
-            # Ensure red_flags only contain critical items from our deterministic set
-            filtered_red_flags = [rf for rf in llm_red_flags if rf in self.red_flag_engine.critical_phrases]
-
-            # If any urgent flags present, enforce a minimum urgency of moderate and at least primary care
-            if flags["urgent"]:
-                if urgency == "low":
-                    urgency = "moderate"
-                # Ensure action is at least primary care
-                if action == "self_care":
-                    action = "primary_care"
-
-            span.add_tag("final_urgency", urgency)
-            span.add_tag("final_action", action)
-            span.log(f"Triage completed: {category} ({urgency})")
-            
+        if parsed is None:
+            span.log("LLM response parsing failed, using fallback", "warning")
+            self.logger.warning("LLM response parsing failed; falling back to safe mode.")
+            # Apply minimum severity if urgent flags were detected
+            urgency = "moderate" if flags["urgent"] else "moderate"
+            action = "primary_care"
             return TriageResponse(
-                category=category,
+                category="general",
                 urgency=urgency,
                 recommended_action=action,
-                red_flags=filtered_red_flags,  # keep red_flags to true critical items only
-                reasoning=reasoning,
+                red_flags=[],
+                reasoning="Fallback response due to parsing failure.",
+                rule_pack_version=rules.version,
             )
-    
-    async def _gather_medical_context(self, symptoms: str) -> str:
-        """Use tools to gather additional medical context."""
-        try:
-            # Use medical lookup tool
-            lookup_result = await self.tool_manager.execute_tool(
-                "medical_lookup", 
-                query=symptoms[:50],  # Limit query length
-                lookup_type="conditions"
+
+        # Post-process LLM output with guardrails: do not over-flag, but enforce minimums
+        category = parsed.category
+        urgency = parsed.urgency
+        action = parsed.recommended_action
+        reasoning = parsed.reasoning
+        llm_red_flags = parsed.red_flags
+
+        # Ensure red_flags only contain critical items from our deterministic set
+        filtered_red_flags = [rf for rf in llm_red_flags if rf in rules.critical_phrases]
+
+        # If any urgent flags present, enforce a minimum urgency of moderate and at least primary care
+        urgency = self._floor("urgency", urgency, flags)
+        action = self._floor("recommended_action", action, flags)
+
+        span.add_tag("final_urgency", urgency)
+        span.add_tag("final_action", action)
+        span.log(f"Triage completed: {category} ({urgency})")
+
+        return TriageResponse(
+            category=category,
+            urgency=urgency,
+            recommended_action=action,
+            red_flags=filtered_red_flags,  # keep red_flags to true critical items only
+            reasoning=reasoning,
+            rule_pack_version=rules.version,
+        )
+
+    def _floor(self, name: str, value: Any, flags: Dict[str, List[str]]) -> Any:
+        """Raise an urgency or action label to ``URGENT_FLOORS`` if flags require it."""
+
+        if name not in self.URGENT_FLOORS or not isinstance(value, str):
+            return value
+        label = TriageLLMOutput._normalize_label(value)
+        if not flags["urgent"]:
+            return label
+        return self.URGENT_FLOORS[name].get(label, label)
+
+    def _drug_vocabulary(self) -> Optional[Callable[[str], bool]]:
+        """Drug-name check backed by the lookup tool's local index, if it has one."""
+        index = getattr(self.tool_manager.get_tool("medical_lookup"), "index", None)
+        if index is None:
+            return None
+        return lambda word: index.has_name("drugs", word)
+
+    async def _gather_medical_context(self, request: TriageRequest) -> str:
+        """Use tools to gather additional medical context.
+
+        Condition lookups, drug lookups for every medication the user listed
+        or mentioned, and an MCP guideline query run concurrently. Under a
+        deadline the batch gets ``triage_context_budget_share`` of the
+        remaining time so the LLM keeps the rest; whatever finished by then
+        is used and the stragglers are cancelled.
+        """
+        deadline = current_deadline()
+        budget = (
+            deadline.remaining() * self.settings.triage_context_budget_share
+            if deadline is not None
+            else None
+        )
+        timeout = self.settings.triage_tool_timeout_seconds
+        symptoms = request.symptoms
+        medications = list(request.medications)
+        for name in mentioned_medications(
+            f"{symptoms} {request.context or ''}", is_drug=self._drug_vocabulary()
+        ):
+            if name not in medications:
+                medications.append(name)
+        calls = [
+            ToolCall(
+                "medical_lookup",
+                {"query": symptoms[:50], "lookup_type": "conditions"},  # Limit query length
+                timeout=timeout,
+                key="conditions",
+            ),
+            ToolCall(
+                "mcp_client",
+                {
+                    "method": "tools/call",
+                    "params": {"name": "medical_guidelines", "arguments": {"query": symptoms[:200]}},
+                },
+                timeout=timeout,
+                key="guidelines",
+            ),
+        ]
+        calls.extend(
+            ToolCall(
+                "medical_lookup",
+                {"query": name, "lookup_type": "drugs"},
+                timeout=timeout,
+                key=f"drug:{name}",
             )
-            
-            if lookup_result.get("success"):
-                conditions = lookup_result.get("results", [])
-                # Ensure conditions are strings
-                condition_strs = [str(c) for c in conditions[:3] if c]
-                if condition_strs:
-                    return f"Related conditions: {', '.join(condition_strs)}"
-                else:
-                    return "No related conditions found."
-            else:
-                return "No additional medical context available."
+            for name in medications[:3]
+        )
+        try:
+            results = await self.tool_manager.execute_many(calls, timeout=budget)
         except Exception as e:
             self.logger.warning(f"Failed to gather medical context: {e}")
             return "Medical context lookup unavailable."
+        
+        if all(result.get("deadline_exceeded") for result in results.values()):
+            return "Medical context skipped to meet the response deadline."
+        
+        lines: List[str] = []
+        conditions = results["conditions"]
+        if conditions.get("success"):
+            # Ensure conditions are strings
+            condition_strs = [str(c) for c in conditions.get("results", [])[:3] if c]
+            lines.append(
+                f"Related conditions: {', '.join(condition_strs)}"
+                if condition_strs
+                else "No related conditions found."
+            )
+        drugs = [
+            f"{call.kwargs['query']} ({', '.join(str(r) for r in result.get('results', [])[:2])})"
+            for call in calls
+            if call.key.startswith("drug:")
+            for result in [results[call.key]]
+            if result.get("success") and result.get("results")
+        ]
+        if drugs:
+            lines.append(f"Medications: {'; '.join(drugs)}")
+        guidelines = self._guideline_text(results["guidelines"])
+        if guidelines:
+            lines.append(f"Guidelines: {guidelines}")
+        return "\n".join(lines) or "No additional medical context available."
 
+    @staticmethod
+    def _guideline_text(response: Dict[str, Any]) -> Optional[str]:
+        if response.get("fallback") or "result" not in response:
+            return None
+        content = response["result"].get("content") or []
+        text = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+        return text.strip() or None
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 from functools import lru_cache
+from pathlib import Path
 from typing import Optional
 
 from pydantic import BaseModel, Field
@@ -17,6 +18,17 @@ class Settings(BaseModel):
     database_url: str = Field(
         default=os.getenv("DATABASE_URL", "sqlite:///./medassist.db")
     )
+    database_pool_size: int = Field(
+        default=int(os.getenv("DATABASE_POOL_SIZE", "1")),
+        description=(
+            "Connections held by the async engine. SQLite admits one writer at a "
+            "time, so more only contend for its lock; raise it for PostgreSQL."
+        ),
+    )
+    database_max_overflow: int = Field(
+        default=int(os.getenv("DATABASE_MAX_OVERFLOW", "0")),
+        description="Extra async connections opened under load beyond the pool size.",
+    )
     gemini_api_key: Optional[str] = Field(
         default=os.getenv("GEMINI_API_KEY"), description="Google Gemini API key."
     )
@@ -24,10 +36,271 @@ class Settings(BaseModel):
         default=os.getenv("GEMINI_MODEL", "gemini-2.5-flash"),
         description="Gemini model name to use for LLM calls.",
     )
+    gemini_models: list[str] = Field(
+        default=[
+            name.strip()
+            for name in os.getenv("GEMINI_MODELS", "").split(",")
+            if name.strip()
+        ],
+        description="Ordered model tiers, cheapest first; defaults to gemini_model alone.",
+    )
+    llm_backend: str = Field(
+        default=os.getenv("LLM_BACKEND", "gemini").lower(),
+        description="Model backend: gemini, record (gemini plus cassette), replay or stub.",
+    )
+    llm_cassette_path: Optional[str] = Field(
+        default=os.getenv("LLM_CASSETTE_PATH"),
+        description="Cassette written in record mode and served in replay mode.",
+    )
+    llm_stub_latency: Optional[str] = Field(
+        default=os.getenv("LLM_STUB_LATENCY"),
+        description="Synthetic latency spec such as 'lognormal:0.8,0.4'; overrides recorded latency.",
+    )
+    llm_stub_error_rate: float = Field(
+        default=float(os.getenv("LLM_STUB_ERROR_RATE", "0")),
+        description="Share of offline backend calls that fail with an injected error.",
+    )
+    triage_min_confidence: float = Field(
+        default=float(os.getenv("TRIAGE_MIN_CONFIDENCE", "0.6")),
+        description="Self-reported LLM confidence below which triage escalates a tier.",
+    )
+    llm_max_concurrency: int = Field(
+        default=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+        description="Maximum LLM calls in flight per client.",
+    )
+    llm_executor_workers: int = Field(
+        default=int(os.getenv("LLM_EXECUTOR_WORKERS", "8")),
+        description="Dedicated threads for models without a native async API.",
+    )
+    llm_max_attempts: int = Field(
+        default=int(os.getenv("LLM_MAX_ATTEMPTS", "3")),
+        description="Upstream attempts per LLM call, including the first.",
+    )
+    llm_retry_min_seconds: float = Field(
+        default=float(os.getenv("LLM_RETRY_MIN_SECONDS", "1")),
+        description="Lower bound of the exponential retry backoff.",
+    )
+    llm_retry_max_seconds: float = Field(
+        default=float(os.getenv("LLM_RETRY_MAX_SECONDS", "8")),
+        description="Upper bound of the exponential retry backoff.",
+    )
+    llm_breaker_failure_rate: float = Field(
+        default=float(os.getenv("LLM_BREAKER_FAILURE_RATE", "0.5")),
+        description="Failure rate over the window that opens the LLM circuit.",
+    )
+    llm_breaker_slow_call_seconds: float = Field(
+        default=float(os.getenv("LLM_BREAKER_SLOW_CALL_SECONDS", "10")),
+        description="Calls at least this slow count as slow for the breaker.",
+    )
+    llm_breaker_slow_call_rate: float = Field(
+        default=float(os.getenv("LLM_BREAKER_SLOW_CALL_RATE", "0.8")),
+        description="Share of slow calls over the window that opens the LLM circuit.",
+    )
+    llm_breaker_window: int = Field(
+        default=int(os.getenv("LLM_BREAKER_WINDOW", "20")),
+        description="Number of recent calls the breaker evaluates.",
+    )
+    llm_breaker_min_calls: int = Field(
+        default=int(os.getenv("LLM_BREAKER_MIN_CALLS", "5")),
+        description="Calls required in the window before the breaker may open.",
+    )
+    llm_breaker_open_seconds: float = Field(
+        default=float(os.getenv("LLM_BREAKER_OPEN_SECONDS", "30")),
+        description="How long the circuit stays open before a half-open probe.",
+    )
+    triage_deadline_seconds: float = Field(
+        default=float(os.getenv("TRIAGE_DEADLINE_SECONDS", "3")),
+        description="End-to-end budget for answering a triage request.",
+    )
+    triage_deadline_reserve_seconds: float = Field(
+        default=float(os.getenv("TRIAGE_DEADLINE_RESERVE_SECONDS", "0.25")),
+        description="Part of the budget held back for persisting and returning the response.",
+    )
+    triage_context_budget_share: float = Field(
+        default=float(os.getenv("TRIAGE_CONTEXT_BUDGET_SHARE", "0.3")),
+        description="Share of the remaining budget medical context gathering may use.",
+    )
+    triage_tool_timeout_seconds: float = Field(
+        default=float(os.getenv("TRIAGE_TOOL_TIMEOUT_SECONDS", "2")),
+        description="Longest any single context lookup may take, within the shared budget.",
+    )
+    token_estimate_scale: float = Field(
+        default=float(os.getenv("TOKEN_ESTIMATE_SCALE", "1.0")),
+        description="Multiplier for the offline token estimate; fit with python -m app.agents.tokens.",
+    )
+    triage_prompt_max_tokens: int = Field(
+        default=int(os.getenv("TRIAGE_PROMPT_MAX_TOKENS", "1024")),
+        description="Token budget for the assembled triage prompt, instructions included.",
+    )
+    triage_prompt_section_min_tokens: int = Field(
+        default=int(os.getenv("TRIAGE_PROMPT_SECTION_MIN_TOKENS", "24")),
+        description="Tokens each prompt section keeps before higher-priority sections take the rest.",
+    )
+    llm_min_budget_seconds: float = Field(
+        default=float(os.getenv("LLM_MIN_BUDGET_SECONDS", "0.3")),
+        description="Remaining budget below which the LLM is skipped for the fallback.",
+    )
+    llm_hedge_enabled: bool = Field(
+        default=os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true",
+        description="Send a duplicate LLM request when the first one is slower than usual.",
+    )
+    llm_hedge_percentile: float = Field(
+        default=float(os.getenv("LLM_HEDGE_PERCENTILE", "95")),
+        description="Rolling latency percentile after which a hedge is sent.",
+    )
+    llm_hedge_budget: float = Field(
+        default=float(os.getenv("LLM_HEDGE_BUDGET", "0.05")),
+        description="Maximum share of extra requests hedging may add.",
+    )
+    llm_hedge_min_samples: int = Field(
+        default=int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20")),
+        description="Latency samples per model required before hedging starts.",
+    )
+    llm_hedge_min_delay_seconds: float = Field(
+        default=float(os.getenv("LLM_HEDGE_MIN_DELAY_SECONDS", "0.05")),
+        description="Lower bound on the hedge delay.",
+    )
+    llm_cache_enabled: bool = Field(
+        default=os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true",
+        description="Serve repeated prompts from the LLM response cache.",
+    )
+    llm_cache_max_entries: int = Field(
+        default=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024")),
+        description="Maximum entries kept in the in-process LRU tier.",
+    )
+    llm_cache_ttl_seconds: float = Field(
+        default=float(os.getenv("LLM_CACHE_TTL_SECONDS", "600")),
+        description="Lifetime of a cached LLM response.",
+    )
+    llm_cache_sqlite_path: Optional[str] = Field(
+        default=os.getenv("LLM_CACHE_SQLITE_PATH"),
+        description="Optional SQLite file for a cache tier that survives restarts.",
+    )
+    llm_cache_sqlite_max_entries: int = Field(
+        default=int(os.getenv("LLM_CACHE_SQLITE_MAX_ENTRIES", "50000")),
+        description="Maximum entries kept in the on-disk tier.",
+    )
+    fastpath_model_path: Optional[str] = Field(
+        default=os.getenv("FASTPATH_MODEL_PATH"),
+        description="Serialized fast-path classifier; unset disables the fast path.",
+    )
+    fastpath_confidence_threshold: float = Field(
+        default=float(os.getenv("FASTPATH_CONFIDENCE_THRESHOLD", "0.9")),
+        description="Minimum classifier confidence to answer without the LLM.",
+    )
+    fastpath_shadow_rate: float = Field(
+        default=float(os.getenv("FASTPATH_SHADOW_RATE", "0.05")),
+        description="Share of fast-path answers also sent to the LLM for comparison.",
+    )
     log_level: str = Field(
         default=os.getenv("LOG_LEVEL", "INFO"), description="Application log level."
     )
     app_name: str = Field(default="MedAssist API")
+    red_flag_rules_path: str = Field(
+        default=os.getenv(
+            "RED_FLAG_RULES_PATH",
+            str(Path(__file__).resolve().parent / "rules" / "red_flags.json"),
+        ),
+        description="JSON or YAML red-flag rule pack loaded at startup.",
+    )
+    red_flag_rules_watch_seconds: float = Field(
+        default=float(os.getenv("RED_FLAG_RULES_WATCH_SECONDS", "5")),
+        description="Polling interval for rule pack hot reload; 0 disables watching.",
+    )
+    medical_index_path: Optional[str] = Field(
+        default=os.getenv("MEDICAL_INDEX_PATH"),
+        description="Local conditions/RxTerms index (python -m app.tools.local_index); unset uses the remote API only.",
+    )
+    medical_lookup_remote_fallback: bool = Field(
+        default=os.getenv("MEDICAL_LOOKUP_REMOTE_FALLBACK", "true").lower() == "true",
+        description="Query the remote clinicaltables API when the local index has no match.",
+    )
+    tool_cache_enabled: bool = Field(
+        default=os.getenv("TOOL_CACHE_ENABLED", "true").lower() == "true",
+        description="Cache results of tools that declare a cache policy.",
+    )
+    tool_breaker_failure_rate: float = Field(
+        default=float(os.getenv("TOOL_BREAKER_FAILURE_RATE", "0.5")),
+        description="Failure rate over the window that opens a tool's circuit.",
+    )
+    tool_breaker_slow_call_seconds: float = Field(
+        default=float(os.getenv("TOOL_BREAKER_SLOW_CALL_SECONDS", "2")),
+        description="Tool calls at least this slow count as slow for the breaker.",
+    )
+    tool_breaker_slow_call_rate: float = Field(
+        default=float(os.getenv("TOOL_BREAKER_SLOW_CALL_RATE", "0.8")),
+        description="Share of slow calls over the window that opens a tool's circuit.",
+    )
+    tool_breaker_window: int = Field(
+        default=int(os.getenv("TOOL_BREAKER_WINDOW", "20")),
+        description="Number of recent calls each tool breaker evaluates.",
+    )
+    tool_breaker_min_calls: int = Field(
+        default=int(os.getenv("TOOL_BREAKER_MIN_CALLS", "5")),
+        description="Calls required in the window before a tool breaker may open.",
+    )
+    tool_breaker_open_seconds: float = Field(
+        default=float(os.getenv("TOOL_BREAKER_OPEN_SECONDS", "15")),
+        description="How long a tripped tool is skipped before a live probe call.",
+    )
+    mcp_transport: str = Field(
+        default=os.getenv("MCP_TRANSPORT", "http").lower(),
+        description="MCP transport: http (streamable HTTP) or stdio.",
+    )
+    mcp_server_url: str = Field(
+        default=os.getenv("MCP_SERVER_URL", "http://localhost:3000/mcp"),
+        description="MCP endpoint for the http transport.",
+    )
+    mcp_command: Optional[str] = Field(
+        default=os.getenv("MCP_COMMAND"),
+        description="Server command line for the stdio transport.",
+    )
+    mcp_request_timeout_seconds: float = Field(
+        default=float(os.getenv("MCP_REQUEST_TIMEOUT_SECONDS", "15")),
+        description="Timeout for one MCP request.",
+    )
+    mcp_reconnect_seconds: float = Field(
+        default=float(os.getenv("MCP_RECONNECT_SECONDS", "5")),
+        description="After a failed connection, serve fallbacks this long before reconnecting.",
+    )
+    mcp_tools_ttl_seconds: float = Field(
+        default=float(os.getenv("MCP_TOOLS_TTL_SECONDS", "300")),
+        description="How long a discovered MCP tool list is reused without a list_changed notice.",
+    )
+    http_timeout_seconds: float = Field(
+        default=float(os.getenv("HTTP_TIMEOUT_SECONDS", "10")),
+        description="Default read/write timeout of the shared HTTP client; tools may pass their own.",
+    )
+    http_connect_timeout_seconds: float = Field(
+        default=float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "3")),
+        description="Timeout for establishing a new upstream connection.",
+    )
+    http_max_connections: int = Field(
+        default=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+        description="Upper bound on open connections across all hosts.",
+    )
+    http_max_connections_per_host: int = Field(
+        default=int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "10")),
+        description="Concurrent requests allowed to one host; further requests wait for a slot.",
+    )
+    http_max_keepalive_connections: int = Field(
+        default=int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")),
+        description="Idle connections kept open for reuse.",
+    )
+    http_keepalive_expiry_seconds: float = Field(
+        default=float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "30")),
+        description="How long an idle pooled connection is kept.",
+    )
+    http_http2: bool = Field(
+        default=os.getenv("HTTP_HTTP2", "false").lower() == "true",
+        description="Negotiate HTTP/2 where supported; needs the optional h2 package.",
+    )
+
+    @property
+    def model_tiers(self) -> list[str]:
+        """Models tried in order by ``LLMClient``."""
+
+        return self.gemini_models or [self.gemini_model]
 
 
 @lru_cache
@@ -1,21 +1,118 @@
 from __future__ import annotations
 
-from contextlib import contextmanager
-from typing import Generator
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Generator, Optional
 
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.config import get_settings
+from app.db.migrations import migrate
 
 
 settings = get_settings()
-engine = create_engine(settings.database_url, echo=False)
+
+
+def tune_sqlite(engine: Engine) -> Engine:
+    """Switch SQLite connections to WAL with ``synchronous=NORMAL``.
+
+    Readers then no longer block the writer, and a commit appends to the
+    log without an fsync; the log is synced at checkpoints, so a power
+    loss can drop the last commits but never corrupts the file. Other
+    databases are returned unchanged.
+    """
+
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _sqlite_pragmas)
+    return engine
+
+
+def _sqlite_pragmas(connection: Any, _record: Any) -> None:
+    cursor = connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+engine = tune_sqlite(create_engine(settings.database_url, echo=False))
+
+# Async drivers for the sync URLs accepted in DATABASE_URL
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def async_database_url(url: str) -> str:
+    """Translate a sync database URL to its async-driver equivalent."""
+
+    parsed = make_url(url)
+    if parsed.drivername in ASYNC_DRIVERS:
+        parsed = parsed.set(drivername=f"{parsed.drivername}+{ASYNC_DRIVERS[parsed.drivername]}")
+    return parsed.render_as_string(hide_password=False)
+
+
+class AsyncDatabase:
+    """Owns the async engine used by request handlers and agents.
+
+    The sync ``engine`` and ``session_scope`` remain for batch jobs and
+    background threads; code running on the event loop should use this so
+    database round trips do not stall other requests.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        pool_size: Optional[int] = None,
+        max_overflow: Optional[int] = None,
+    ) -> None:
+        self.url = async_database_url(url or settings.database_url)
+        self.pool_size = settings.database_pool_size if pool_size is None else pool_size
+        self.max_overflow = settings.database_max_overflow if max_overflow is None else max_overflow
+        self._engine: Optional[AsyncEngine] = None
+
+    @property
+    def engine(self) -> AsyncEngine:
+        """The engine, created on first use.
+
+        Pooled driver connections belong to the event loop that opened them;
+        see ``dispose``.
+        """
+        if self._engine is None:
+            self._engine = create_async_engine(
+                self.url, echo=False, pool_size=self.pool_size, max_overflow=self.max_overflow
+            )
+            tune_sqlite(self._engine.sync_engine)
+        return self._engine
+
+    def session(self) -> AsyncSession:
+        # Objects stay readable after commit without another round trip
+        return AsyncSession(self.engine, expire_on_commit=False)
+
+    async def create_all(self) -> None:
+        async with self.engine.begin() as connection:
+            await connection.run_sync(SQLModel.metadata.create_all)
+
+    async def dispose(self) -> None:
+        """Close pooled connections on the loop that opened them.
+
+        The app disposes on shutdown; scripts and tests running their own
+        loop must too. The next use creates a new engine.
+        """
+
+        if self._engine is not None:
+            await self._engine.dispose()
+        self._engine = None
+
+
+# Global async database shared by handlers, MemoryBank and the coordinator
+async_db = AsyncDatabase()
 
 
 def init_db() -> None:
-    """Create all database tables on startup."""
+    """Create or upgrade the database schema on startup."""
 
-    SQLModel.metadata.create_all(engine)
+    migrate(engine)
 
 
 @contextmanager
@@ -33,9 +130,28 @@ def session_scope() -> Generator[Session, None, None]:
         session.close()
 
 
+@asynccontextmanager
+async def async_session_scope(database: Optional[AsyncDatabase] = None) -> AsyncIterator[AsyncSession]:
+    """Async counterpart of ``session_scope`` for code on the event loop."""
+
+    async with (database or async_db).session() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+
 def get_session() -> Generator[Session, None, None]:
     """FastAPI dependency that yields a database session."""
 
     with Session(engine) as session:
         yield session
 
+
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency that yields an async database session."""
+
+    async with async_db.session() as session:
+        yield session
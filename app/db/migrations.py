@@ -0,0 +1,226 @@
+"""Versioned schema migrations.
+
+Each migration has an integer version and runs once, in order. Applied
+versions are recorded in ``schema_migrations``, so ``migrate`` is safe to
+run on every startup and against a live database. Migrations only add
+schema objects, guarded by ``IF NOT EXISTS``, so one interrupted halfway is
+simply re-run. An index build holds SQLite's write lock only while it
+runs: readers carry on, and writers wait on the busy timeout rather than
+failing.
+
+Check or apply migrations from the command line::
+
+    python -m app.db.migrations --status
+    python -m app.db.migrations            # upgrade to the latest version
+
+Migrations never read ``app/db/models.py``: each one spells out the schema
+it creates, so replaying it later gives the same result however the models
+have changed since. To change the schema, update the models and append a
+migration that brings existing databases to the same state.
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Iterable, List, Optional
+
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    inspect,
+    select,
+)
+from sqlalchemy.engine import Connection, Engine
+
+from app.utils import configure_logging
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, description: str):
+    """Register ``upgrade(connection)`` as migration ``version``."""
+
+    def register(upgrade: Callable[[Connection], None]) -> Callable[[Connection], None]:
+        if MIGRATIONS and version <= MIGRATIONS[-1].version:
+            raise ValueError(f"Migration {version} must come after {MIGRATIONS[-1].version}")
+        MIGRATIONS.append(Migration(version, description, upgrade))
+        return upgrade
+
+    return register
+
+
+# The schema as first released, before migrations existed. Frozen: it must
+# not follow later changes to the models.
+_baseline_schema = MetaData()
+
+Table(
+    "user",
+    _baseline_schema,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", String, nullable=False, index=True, unique=True),
+    Column("full_name", String),
+    Column("created_at", DateTime, nullable=False),
+)
+Table(
+    "symptomevent",
+    _baseline_schema,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", String, ForeignKey("user.user_id"), nullable=False, index=True),
+    Column("symptoms", String, nullable=False),
+    Column("context", String),
+    Column("category", String, nullable=False),
+    Column("urgency", String, nullable=False),
+    Column("recommended_action", String, nullable=False),
+    Column("reasoning", String, nullable=False),
+    Column("red_flags", JSON, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+)
+Table(
+    "medicationcheck",
+    _baseline_schema,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", String, nullable=False, index=True),
+    Column("medications", JSON, nullable=False),
+    Column("risk_level", String, nullable=False),
+    Column("conflicts", JSON, nullable=False),
+    Column("guidance", String, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+)
+Table(
+    "reminderevent",
+    _baseline_schema,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", String, nullable=False, index=True),
+    Column("reminder_type", String, nullable=False),
+    Column("status", String, nullable=False),
+    Column("message", String, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+)
+Table(
+    "remindertask",
+    _baseline_schema,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", String, nullable=False, index=True),
+    Column("reminder_type", String, nullable=False),
+    Column("cadence_minutes", Integer, nullable=False),
+    Column("next_run_at", DateTime, nullable=False),
+    Column("is_active", Boolean, nullable=False),
+    Column("message_template", String, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+)
+Table(
+    "reminderdelivery",
+    _baseline_schema,
+    Column("id", Integer, primary_key=True),
+    Column("task_id", Integer, ForeignKey("remindertask.id"), nullable=False),
+    Column("user_id", String, nullable=False, index=True),
+    Column("message", String, nullable=False),
+    Column("delivered_at", DateTime, nullable=False),
+)
+
+
+@migration(1, "Baseline tables")
+def _baseline(connection: Connection) -> None:
+    # Databases created before migrations existed already have these tables
+    _baseline_schema.create_all(connection, checkfirst=True)
+
+
+@migration(2, "Composite (user_id, created_at) indexes for history queries")
+def _history_indexes(connection: Connection) -> None:
+    for statement in (
+        "CREATE INDEX IF NOT EXISTS ix_symptomevent_user_id_created_at"
+        " ON symptomevent (user_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_medicationcheck_user_id_created_at"
+        " ON medicationcheck (user_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_reminderevent_user_id_created_at"
+        " ON reminderevent (user_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_reminderevent_user_id_reminder_type_created_at"
+        " ON reminderevent (user_id, reminder_type, created_at)",
+    ):
+        connection.exec_driver_sql(statement)
+
+
+def current_version(engine: Engine) -> int:
+    """Highest applied migration version (0 for an unmanaged database)."""
+
+    if not inspect(engine).has_table(schema_migrations.name):
+        return 0
+    with engine.connect() as connection:
+        versions = connection.execute(select(schema_migrations.c.version)).scalars().all()
+    return max(versions, default=0)
+
+
+def pending(engine: Engine, target: Optional[int] = None) -> List[Migration]:
+    applied = current_version(engine)
+    return [
+        item
+        for item in MIGRATIONS
+        if item.version > applied and (target is None or item.version <= target)
+    ]
+
+
+def migrate(engine: Engine, target: Optional[int] = None) -> List[int]:
+    """Apply pending migrations up to ``target``; returns the versions applied."""
+
+    logger = configure_logging()
+    schema_migrations.create(engine, checkfirst=True)
+    applied = []
+    for item in pending(engine, target):
+        with engine.begin() as connection:
+            item.upgrade(connection)
+            connection.execute(
+                schema_migrations.insert().values(
+                    version=item.version,
+                    description=item.description,
+                    applied_at=datetime.utcnow(),
+                )
+            )
+        logger.info("Applied migration %s: %s", item.version, item.description)
+        applied.append(item.version)
+    return applied
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    from app.db.db import engine
+
+    parser = argparse.ArgumentParser(description="Apply database schema migrations.")
+    parser.add_argument("--target", type=int, help="Stop at this version")
+    parser.add_argument("--status", action="store_true", help="Show versions without migrating")
+    args = parser.parse_args(argv)
+
+    if args.status:
+        print(f"current version: {current_version(engine)}")
+        for item in pending(engine, args.target):
+            print(f"pending: {item.version} {item.description}")
+        return
+    applied = migrate(engine, args.target)
+    print(f"applied: {applied or 'nothing'}; now at version {current_version(engine)}")
+
+
+if __name__ == "__main__":
+    main()
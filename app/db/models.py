@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Column
+from sqlalchemy import Column, Index
 from sqlalchemy.dialects.sqlite import JSON
 from sqlmodel import Field, SQLModel
 
@@ -19,6 +19,9 @@ class User(SQLModel, table=True):
 class SymptomEvent(SQLModel, table=True):
     """Persistent record of a triage interaction."""
 
+    # History reads filter by user and sort by recency
+    __table_args__ = (Index("ix_symptomevent_user_id_created_at", "user_id", "created_at"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: str = Field(foreign_key="user.user_id", index=True)
     symptoms: str
@@ -39,6 +42,8 @@ class SymptomEvent(SQLModel, table=True):
 class MedicationCheck(SQLModel, table=True):
     """Record of a medication safety assessment."""
 
+    __table_args__ = (Index("ix_medicationcheck_user_id_created_at", "user_id", "created_at"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: str = Field(index=True)
     medications: list[str] = Field(
@@ -55,6 +60,17 @@ class MedicationCheck(SQLModel, table=True):
 class ReminderEvent(SQLModel, table=True):
     """Loop agent output capturing reminders that were generated."""
 
+    __table_args__ = (
+        Index("ix_reminderevent_user_id_created_at", "user_id", "created_at"),
+        # The reminder loop checks for a recent reminder of one type
+        Index(
+            "ix_reminderevent_user_id_reminder_type_created_at",
+            "user_id",
+            "reminder_type",
+            "created_at",
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: str = Field(index=True)
     reminder_type: str = Field(default="medication_followup")
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+
+class Deadline:
+    """Absolute point in (monotonic) time by which a request must be answered.
+
+    Nested deadlines share the parent's ``degraded`` list, so a stage skipped
+    deep inside a tool call is still reported on the top-level response.
+    """
+
+    def __init__(self, expires_at: float, degraded: Optional[List[str]] = None) -> None:
+        self.expires_at = expires_at
+        self.degraded: List[str] = degraded if degraded is not None else []
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        return cls(time.monotonic() + seconds)
+
+    def remaining(self) -> float:
+        """Seconds left, never negative."""
+
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def child(self, seconds: Optional[float] = None, reserve: float = 0.0) -> "Deadline":
+        """Deadline no later than this one, optionally tighter and minus a reserve."""
+
+        expires_at = self.expires_at
+        if seconds is not None:
+            expires_at = min(expires_at, time.monotonic() + seconds)
+        return Deadline(expires_at - reserve, self.degraded)
+
+    def mark_degraded(self, stage: str) -> None:
+        if stage not in self.degraded:
+            self.degraded.append(stage)
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Deadline of the request being served, if any."""
+
+    return _current_deadline.get()
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left on the current deadline, or ``None`` when unbounded."""
+
+    deadline = _current_deadline.get()
+    return deadline.remaining() if deadline is not None else None
+
+
+@contextmanager
+def deadline_scope(
+    seconds: Optional[float] = None, reserve: float = 0.0
+) -> Iterator[Optional[Deadline]]:
+    """Run a block under a deadline, tightening any deadline already in effect.
+
+    ``reserve`` seconds are held back for work that happens after the block,
+    such as persisting and serializing the response. Without ``seconds`` and
+    without an enclosing deadline the block is unbounded and ``None`` is
+    yielded.
+    """
+
+    parent = _current_deadline.get()
+    if parent is not None:
+        deadline: Optional[Deadline] = parent.child(seconds, reserve)
+    elif seconds is not None:
+        deadline = Deadline.after(seconds - reserve)
+    else:
+        deadline = None
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
-from typing import List
+import asyncio
+import json
+from typing import List, Optional
 
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.agents.medication import MedicationSafetyAgent
 from app.agents.reminder import ReminderLoopAgent
@@ -14,9 +18,13 @@ from app.observability.metrics import metrics
 from app.observability.tracing import tracer
 from app.evaluation.evaluator import AgentEvaluator
 from app.protocols.a2a import a2a_protocol, AgentMessage
+from app.rules.packs import rule_registry
+from app.tools.http_pool import http_pool
+from app.tools.manager import ToolManager
 
 from app.config import get_settings
-from app.db.db import get_session, init_db
+from app.deadline import deadline_scope
+from app.db.db import async_db, async_session_scope, get_async_session, get_session, init_db
 from app.db.models import MedicationCheck, ReminderEvent, SymptomEvent, User
 from app.schemas import (
     MedicationCheckRead,
@@ -32,10 +40,12 @@ from app.utils import configure_logging
 
 settings = get_settings()
 logger = configure_logging(settings.log_level)
-triage_agent = TriageAgent()
+# One tool manager so both triage paths share tool caches and health
+tool_manager = ToolManager()
+triage_agent = TriageAgent(tool_manager=tool_manager)
 med_agent = MedicationSafetyAgent()
 reminder_agent = ReminderLoopAgent(interval_seconds=1800)
-coordinator = AgentCoordinator()
+coordinator = AgentCoordinator(tool_manager=tool_manager)
 evaluator = AgentEvaluator()
 
 
@@ -56,10 +66,12 @@ app.add_middleware(
 
 
 @app.on_event("startup")
-def startup() -> None:
+async def startup() -> None:
     logger.info("Starting MedAssist API")
     init_db()
+    await http_pool.start()
     reminder_agent.start()
+    rule_registry.start_watching(settings.red_flag_rules_watch_seconds)
     
     # Register agents for A2A communication
     a2a_protocol.register_agent("triage", triage_agent)
@@ -68,8 +80,14 @@ def startup() -> None:
 
 
 @app.on_event("shutdown")
-def shutdown() -> None:
+async def shutdown() -> None:
     reminder_agent.shutdown()
+    rule_registry.stop_watching()
+    triage_agent.llm_client.close()
+    coordinator.triage_agent.llm_client.close()
+    await tool_manager.aclose()
+    await http_pool.aclose()
+    await async_db.dispose()
 
 
 @app.get("/health")
@@ -77,17 +95,13 @@ def healthcheck() -> dict[str, str]:
     return {"status": "ok"}
 
 
-@app.post("/triage", response_model=TriageResponse)
-async def triage(
-    payload: TriageRequest, session: Session = Depends(get_session)
-) -> TriageResponse:
-    result = await triage_agent.run(payload)
-    user = session.exec(select(User).where(User.user_id == payload.user_id)).first()
+async def _persist_symptom_event(
+    session: AsyncSession, payload: TriageRequest, result: TriageResponse
+) -> None:
+    user = (await session.exec(select(User).where(User.user_id == payload.user_id))).first()
     if not user:
-        user = User(user_id=payload.user_id)
-        session.add(user)
-        session.commit()
-        session.refresh(user)
+        # Committed together with the event below: one transaction, one write
+        session.add(User(user_id=payload.user_id))
 
     event = SymptomEvent(
         user_id=payload.user_id,
@@ -100,13 +114,57 @@ async def triage(
         red_flags=result.red_flags,
     )
     session.add(event)
-    session.commit()
+    await session.commit()
+
+
+def _request_budget(deadline_ms: Optional[int]) -> float:
+    """Seconds allowed for a request; a client header may only tighten the SLA."""
+    budget = settings.triage_deadline_seconds
+    if deadline_ms is not None and deadline_ms > 0:
+        budget = min(budget, deadline_ms / 1000)
+    return budget
+
+
+@app.post("/triage", response_model=TriageResponse)
+async def triage(
+    payload: TriageRequest,
+    session: AsyncSession = Depends(get_async_session),
+    deadline_ms: Optional[int] = Header(default=None, alias="X-Request-Deadline-Ms"),
+) -> TriageResponse:
+    # The agent keeps triage_deadline_reserve_seconds of this for the write below
+    with deadline_scope(_request_budget(deadline_ms)):
+        result = await triage_agent.run(payload)
+    await _persist_symptom_event(session, payload, result)
     return result
 
 
+@app.post("/triage/stream")
+async def triage_stream(payload: TriageRequest) -> StreamingResponse:
+    """Server-Sent Events variant of ``/triage``.
+
+    Emits ``red_flags`` immediately, a ``field`` event for each of category,
+    urgency and recommended_action as the LLM completes it, and a final
+    ``result`` event carrying the guardrail-adjusted ``TriageResponse``.
+    """
+
+    async def events():
+        async for event, data in triage_agent.run_stream(payload):
+            if event == "result":
+                # The request-scoped session is gone once streaming starts
+                async with async_session_scope() as session:
+                    await _persist_symptom_event(session, payload, TriageResponse(**data))
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.post("/medications/check", response_model=MedicationCheckResponse)
 async def medication_check(
-    payload: MedicationCheckRequest, session: Session = Depends(get_session)
+    payload: MedicationCheckRequest, session: AsyncSession = Depends(get_async_session)
 ) -> MedicationCheckResponse:
     response = await med_agent.run(payload)
 
@@ -118,7 +176,7 @@ async def medication_check(
         guidance=response.guidance,
     )
     session.add(record)
-    session.commit()
+    await session.commit()
 
     return response
 
@@ -187,9 +245,7 @@ def reminder_status() -> dict[str, object]:
 
 
 @app.post("/health-assessment")
-async def parallel_health_assessment(
-    payload: dict, session: Session = Depends(get_session)
-) -> dict:
+async def parallel_health_assessment(payload: dict) -> dict:
     """Coordinated parallel health assessment."""
     result = await coordinator.parallel_health_assessment(
         user_id=payload["user_id"],
@@ -202,14 +258,43 @@ async def parallel_health_assessment(
 
 @app.get("/tools")
 def list_tools() -> dict:
-    """List available agent tools."""
-    return {"tools": coordinator.triage_agent.tool_manager.list_tools()}
+    """List available agent tools with their health."""
+    return {"tools": tool_manager.list_tools()}
+
+
+@app.get("/admin/rules")
+def active_rule_pack() -> dict:
+    """Describe the active red-flag rule pack."""
+    rules = rule_registry.current
+    return {
+        "version": rules.version,
+        "source": rules.source,
+        "critical_phrases": len(rules.critical_phrases),
+        "urgent_phrases": len(rules.urgent_phrases),
+        "fallback_categories": list(rules.fallback.categories),
+    }
+
+
+@app.post("/admin/rules/reload")
+async def reload_rule_pack() -> dict:
+    """Recompile the red-flag rule pack off the event loop and swap it in."""
+    previous = rule_registry.current.version
+    loop = asyncio.get_event_loop()
+    try:
+        rules = await loop.run_in_executor(None, rule_registry.reload)
+    except Exception as exc:
+        raise HTTPException(
+            status_code=400, detail=f"Rule pack reload failed: {exc}"
+        ) from exc
+    return {"previous_version": previous, "version": rules.version}
 
 
 @app.get("/metrics")
 def get_metrics() -> dict:
     """Get system metrics."""
-    return metrics.get_summary()
+    summary = metrics.get_summary()
+    summary["tool_health"] = tool_manager.health()
+    return summary
 
 
 
@@ -253,7 +338,7 @@ async def test_system() -> dict:
                 "urgency": triage_result.urgency,
                 "action": triage_result.recommended_action
             },
-            "tools_available": len(coordinator.triage_agent.tool_manager.list_tools()),
+            "tools_available": len(tool_manager.list_tools()),
             "a2a_agents": len(a2a_protocol.agents),
             "system_healthy": True
         }
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+import re
 from typing import Any, Dict, List
 
+from app.agents.tokens import estimate_tokens, truncate_to_tokens
 from app.utils import configure_logging
 
+TRUNCATION_MARKER = " …"
+# Sentence or clause ends we prefer to cut at when trimming free text
+_BOUNDARY_RE = re.compile(r"[.;!?\n]\s")
+
 
 class ContextCompactor:
     """Context engineering for managing long conversation histories."""
@@ -17,9 +23,7 @@ class ContextCompactor:
         if not messages:
             return []
         
-        # Estimate tokens (rough: 4 chars = 1 token)
-        total_chars = sum(len(msg.get("content", "")) for msg in messages)
-        estimated_tokens = total_chars // 4
+        estimated_tokens = sum(estimate_tokens(msg.get("content", "")) for msg in messages)
         
         if estimated_tokens <= self.max_tokens:
             return messages
@@ -43,6 +47,46 @@ class ContextCompactor:
         
         return [first_msg, summary_msg] + last_msgs
     
+    def fit_text(self, text: str, max_tokens: int) -> str:
+        """Shrink ``text`` to at most ``max_tokens`` estimated tokens.
+
+        Multi-line text is treated as a list of entries, most relevant first:
+        entries that fit are kept whole and the rest are summarized as a count.
+        Single blocks are cut at the last sentence or clause end that fits,
+        falling back to a word boundary, and marked as truncated.
+        """
+        if max_tokens <= 0 or not text:
+            return ""
+        if estimate_tokens(text) <= max_tokens:
+            return text
+
+        lines = [line for line in text.splitlines() if line.strip()]
+        if len(lines) > 1:
+            kept: List[str] = []
+            used = 0
+            for index, line in enumerate(lines):
+                omitted = f"[{len(lines) - index} more entries omitted]"
+                cost = estimate_tokens(line)
+                if used + cost + estimate_tokens(omitted) > max_tokens:
+                    if not kept:
+                        break  # Not even one entry fits; trim the first instead
+                    kept.append(omitted)
+                    return "\n".join(kept)
+                kept.append(line)
+                used += cost
+            if kept:
+                return "\n".join(kept)
+            text = lines[0]
+
+        budget = max_tokens - estimate_tokens(TRUNCATION_MARKER)
+        if budget <= 0:
+            return ""
+        prefix = truncate_to_tokens(text, budget)
+        boundaries = [match.start() + 1 for match in _BOUNDARY_RE.finditer(prefix)]
+        if boundaries and boundaries[-1] >= len(prefix) // 2:
+            prefix = prefix[: boundaries[-1]]
+        return prefix.rstrip() + TRUNCATION_MARKER
+    
     def compact_health_context(self, health_data: Dict[str, Any]) -> str:
         """Compact health history into concise context."""
         if not health_data:
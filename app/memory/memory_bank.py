@@ -3,39 +3,44 @@ from __future__ import annotations
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 
-from sqlmodel import Session, select
+from sqlmodel import select
 
-from app.db.db import session_scope
-from app.db.models import MedicationCheck, SymptomEvent, User
+from app.db.db import AsyncDatabase, async_session_scope
+from app.db.models import MedicationCheck, SymptomEvent
 from app.utils import configure_logging
 
 
 class MemoryBank:
-    """Long-term memory system for user health history and patterns."""
+    """Long-term memory system for user health history and patterns.
+
+    Queries go through the async engine so callers on the event loop are
+    not blocked while SQLite works.
+    """
     
-    def __init__(self):
+    def __init__(self, database: Optional[AsyncDatabase] = None):
+        self.database = database
         self.logger = configure_logging()
     
-    def get_user_health_summary(self, user_id: str, days: int = 30) -> Dict[str, Any]:
+    async def get_user_health_summary(self, user_id: str, days: int = 30) -> Dict[str, Any]:
         """Get comprehensive health summary for user."""
-        with session_scope() as session:
+        async with async_session_scope(self.database) as session:
             cutoff = datetime.utcnow() - timedelta(days=days)
             
             # Get recent symptoms
-            symptoms = session.exec(
+            symptoms = (await session.exec(
                 select(SymptomEvent)
                 .where(SymptomEvent.user_id == user_id)
                 .where(SymptomEvent.created_at >= cutoff)
                 .order_by(SymptomEvent.created_at.desc())
-            ).all()
+            )).all()
             
             # Get medication checks
-            med_checks = session.exec(
+            med_checks = (await session.exec(
                 select(MedicationCheck)
                 .where(MedicationCheck.user_id == user_id)
                 .where(MedicationCheck.created_at >= cutoff)
                 .order_by(MedicationCheck.created_at.desc())
-            ).all()
+            )).all()
             
             return {
                 "user_id": user_id,
@@ -48,16 +53,16 @@ class MemoryBank:
                 "patterns": self._analyze_patterns(symptoms, med_checks)
             }
     
-    def get_contextual_history(self, user_id: str, current_symptoms: str) -> str:
+    async def get_contextual_history(self, user_id: str, current_symptoms: str) -> str:
         """Get relevant historical context for current symptoms."""
-        with session_scope() as session:
+        async with async_session_scope(self.database) as session:
             # Get similar past events
-            past_events = session.exec(
+            past_events = (await session.exec(
                 select(SymptomEvent)
                 .where(SymptomEvent.user_id == user_id)
                 .order_by(SymptomEvent.created_at.desc())
                 .limit(10)
-            ).all()
+            )).all()
             
             if not past_events:
                 return "No previous health history available."
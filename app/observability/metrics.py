@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import math
 import time
-from collections import defaultdict
-from typing import Any, Dict
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict
 
 from app.utils import configure_logging
 
@@ -10,9 +11,16 @@ from app.utils import configure_logging
 class MetricsCollector:
     """Simple metrics collection for agent performance."""
     
+    # Most recent observations kept per histogram for percentile reporting
+    HISTOGRAM_WINDOW = 2048
+    
     def __init__(self):
         self.metrics: Dict[str, Any] = defaultdict(list)
         self.counters: Dict[str, int] = defaultdict(int)
+        self.gauges: Dict[str, Any] = {}
+        self.histograms: Dict[str, Deque[float]] = defaultdict(
+            lambda: deque(maxlen=self.HISTOGRAM_WINDOW)
+        )
         self.logger = configure_logging()
     
     def record_agent_execution(self, agent_name: str, duration: float, success: bool):
@@ -30,9 +38,29 @@ class MetricsCollector:
         if success:
             self.counters[f"tool_{tool_name}_success"] += 1
     
+    def record_cache(self, cache_name: str, outcome: str):
+        """Record a cache lookup outcome (hit, miss, eviction, ...)."""
+        self.counters[f"{cache_name}_cache_{outcome}"] += 1
+    
+    def set_gauge(self, name: str, value: Any):
+        """Record the latest value of a point-in-time metric."""
+        self.gauges[name] = value
+    
+    def observe(self, name: str, value: float):
+        """Add an observation to a rolling histogram."""
+        self.histograms[name].append(value)
+    
+    def percentile(self, name: str, pct: float) -> float:
+        """Return the nearest-rank percentile of a histogram (0.0 when empty)."""
+        values = sorted(self.histograms.get(name, ()))
+        if not values:
+            return 0.0
+        index = min(len(values) - 1, max(0, math.ceil(pct / 100 * len(values)) - 1))
+        return values[index]
+    
     def get_summary(self) -> Dict[str, Any]:
         """Get metrics summary."""
-        summary = {"counters": dict(self.counters)}
+        summary = {"counters": dict(self.counters), "gauges": dict(self.gauges)}
         
         # Calculate averages for durations
         for key, values in self.metrics.items():
@@ -40,6 +68,18 @@ class MetricsCollector:
                 summary[f"{key}_avg"] = sum(values) / len(values)
                 summary[f"{key}_count"] = len(values)
         
+        summary["histograms"] = {
+            name: {
+                "count": len(values),
+                "avg": sum(values) / len(values),
+                "p50": self.percentile(name, 50),
+                "p95": self.percentile(name, 95),
+                "p99": self.percentile(name, 99),
+            }
+            for name, values in self.histograms.items()
+            if values
+        }
+        
         return summary
 
 
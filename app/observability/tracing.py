@@ -9,6 +9,8 @@ from app.utils import configure_logging
 
 # Context variable for trace ID
 trace_id_var: ContextVar[Optional[str]] = ContextVar('trace_id', default=None)
+# Innermost span opened by ``trace_operation`` in the current context
+current_span_var: ContextVar[Optional["TraceSpan"]] = ContextVar('current_span', default=None)
 
 
 class TraceSpan:
@@ -28,6 +30,10 @@ class TraceSpan:
         """Add tag to span."""
         self.tags[key] = value
     
+    def increment_tag(self, key: str, amount: float = 1):
+        """Add to a numeric tag, starting from zero."""
+        self.tags[key] = self.tags.get(key, 0) + amount
+    
     def log(self, message: str, level: str = "info"):
         """Add log entry to span."""
         self.logs.append({
@@ -106,18 +112,31 @@ class SimpleTracer:
 tracer = SimpleTracer()
 
 
+def current_span() -> Optional[TraceSpan]:
+    """Span of the innermost active ``trace_operation``, if any."""
+    return current_span_var.get()
+
+
 class trace_operation:
     """Context manager for tracing operations."""
     
     def __init__(self, operation_name: str):
         self.operation_name = operation_name
         self.span: Optional[TraceSpan] = None
+        self._token = None
     
     def __enter__(self) -> TraceSpan:
         self.span = tracer.start_span(self.operation_name)
+        self._token = current_span_var.set(self.span)
         return self.span
     
     def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._token is not None:
+            try:
+                current_span_var.reset(self._token)
+            except ValueError:
+                # Exited from a different context (e.g. a resumed async generator)
+                current_span_var.set(None)
         if self.span:
             if exc_type:
                 self.span.add_tag("error", True)
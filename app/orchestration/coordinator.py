@@ -5,20 +5,23 @@ from typing import Any, Dict, List, Optional
 
 from app.agents.medication import MedicationSafetyAgent
 from app.agents.triage import TriageAgent
+from app.memory.context_compaction import ContextCompactor
 from app.memory.memory_bank import MemoryBank
 from app.memory.session import InMemorySessionService
 from app.schemas import MedicationCheckRequest, TriageRequest
+from app.tools.manager import ToolManager
 from app.utils import configure_logging
 
 
 class AgentCoordinator:
     """Coordinates parallel and sequential agent execution."""
     
-    def __init__(self):
-        self.triage_agent = TriageAgent()
+    def __init__(self, tool_manager: Optional[ToolManager] = None):
+        self.triage_agent = TriageAgent(tool_manager=tool_manager)
         self.medication_agent = MedicationSafetyAgent()
         self.memory_bank = MemoryBank()
         self.session_service = InMemorySessionService()
+        self.compactor = ContextCompactor()
         self.logger = configure_logging()
     
     async def parallel_health_assessment(
@@ -37,7 +40,8 @@ class AgentCoordinator:
         triage_request = TriageRequest(
             user_id=user_id,
             symptoms=symptoms,
-            context=context
+            context=context,
+            medications=medications or [],
         )
         
         tasks = [
@@ -72,10 +76,9 @@ class AgentCoordinator:
     async def _run_triage_with_memory(self, request: TriageRequest, session_id: str) -> Dict[str, Any]:
         """Run triage with memory context."""
         # Get historical context
-        health_summary = self.memory_bank.get_user_health_summary(request.user_id)
-        contextual_history = self.memory_bank.get_contextual_history(
-            request.user_id, 
-            request.symptoms
+        health_summary, contextual_history = await asyncio.gather(
+            self.memory_bank.get_user_health_summary(request.user_id),
+            self.memory_bank.get_contextual_history(request.user_id, request.symptoms),
         )
         
         # Update session context
@@ -87,13 +90,12 @@ class AgentCoordinator:
             {"type": "symptom_report"}
         )
         
-        # Enhanced request with memory
-        enhanced_context = f"{request.context or ''}\nHistory: {contextual_history}"
-        enhanced_request = TriageRequest(
-            user_id=request.user_id,
-            symptoms=request.symptoms,
-            context=enhanced_context
-        )
+        # Enhanced request with memory; the prompt builder trims history to its budget
+        history = "\n".join([
+            contextual_history,
+            f"Profile: {self.compactor.compact_health_context(health_summary)}",
+        ])
+        enhanced_request = request.model_copy(update={"history": history})
         
         result = await self.triage_agent.run(enhanced_request)
         
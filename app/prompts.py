@@ -12,7 +12,8 @@ TRIAGE_PROMPT_TEMPLATE = dedent(
       "urgency": "<one of: low, moderate, high>",
       "red_flags": ["<string>", "..."],
       "recommended_action": "<one of: self_care, primary_care, go_to_er>",
-      "reasoning": "<short explanation>"
+      "reasoning": "<short explanation>",
+      "confidence": <number from 0 to 1: how certain you are of this triage>
     }}
 
     Rules:
@@ -25,6 +26,7 @@ TRIAGE_PROMPT_TEMPLATE = dedent(
     user_id: {user_id}
     symptoms: {symptoms}
     additional_context: {context}
+    health_history: {history}
     medical_context: {medical_context}
     """
 ).strip()
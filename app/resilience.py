@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Tuple
+
+from app.observability.metrics import metrics
+from app.utils import configure_logging
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is short-circuited by an open breaker."""
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker driven by rolling error rate and latency.
+
+    The last ``window_size`` outcomes are kept. Once at least ``min_calls`` are
+    recorded, the breaker opens when the failure rate or the share of calls
+    slower than ``slow_call_seconds`` reaches its threshold. After
+    ``open_seconds`` it admits up to ``half_open_max_calls`` probes: a
+    successful probe closes it again, a failed or slow one re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 10.0,
+        slow_call_rate_threshold: float = 0.8,
+        window_size: int = 20,
+        min_calls: int = 5,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._lock = threading.Lock()
+        # Each outcome is (failed, slow)
+        self._window: Deque[Tuple[bool, bool]] = deque(maxlen=window_size)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self.logger = configure_logging()
+        self._publish()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def allow_request(self) -> bool:
+        """Return True if a call may proceed; counts short-circuits otherwise."""
+
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and self._probes_in_flight < self.half_open_max_calls:
+                self._probes_in_flight += 1
+                return True
+            metrics.counters[f"{self.name}_circuit_short_circuited"] += 1
+            return False
+
+    def record_success(self, latency: float) -> None:
+        self._record(failed=False, latency=latency)
+
+    def record_failure(self, latency: float) -> None:
+        self._record(failed=True, latency=latency)
+
+    def release(self) -> None:
+        """Free a half-open probe slot for a call that ended without an outcome."""
+
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def snapshot(self) -> Dict[str, object]:
+        """Describe the breaker for health and metrics endpoints."""
+
+        with self._lock:
+            self._maybe_half_open()
+            calls = len(self._window)
+            failures = sum(1 for failed, _ in self._window if failed)
+            slow = sum(1 for _, is_slow in self._window if is_slow)
+            return {
+                "state": self._state,
+                "window_calls": calls,
+                "failure_rate": failures / calls if calls else 0.0,
+                "slow_call_rate": slow / calls if calls else 0.0,
+            }
+
+    def _record(self, failed: bool, latency: float) -> None:
+        slow = latency >= self.slow_call_seconds
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if failed or slow:
+                    self._transition(self.OPEN)
+                else:
+                    self._window.clear()
+                    self._transition(self.CLOSED)
+                return
+            if self._state == self.OPEN:
+                # Late result from a call admitted before the breaker opened
+                return
+            self._window.append((failed, slow))
+            if len(self._window) < self.min_calls:
+                return
+            calls = len(self._window)
+            failure_rate = sum(1 for f, _ in self._window if f) / calls
+            slow_rate = sum(1 for _, s in self._window if s) / calls
+            if (
+                failure_rate >= self.failure_rate_threshold
+                or slow_rate >= self.slow_call_rate_threshold
+            ):
+                self._transition(self.OPEN)
+
+    def _maybe_half_open(self) -> None:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._probes_in_flight = 0
+            self._transition(self.HALF_OPEN)
+
+    def _transition(self, state: str) -> None:
+        if state == self._state:
+            return
+        if state == self.OPEN:
+            self._opened_at = self._clock()
+            metrics.counters[f"{self.name}_circuit_opened"] += 1
+        self.logger.warning("Circuit %s: %s -> %s", self.name, self._state, state)
+        self._state = state
+        self._publish()
+
+    def _publish(self) -> None:
+        metrics.set_gauge(f"{self.name}_circuit_state", self._state)
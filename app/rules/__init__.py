@@ -0,0 +1,22 @@
+"""Deterministic rule compilation used by the safety-critical triage path."""
+
+from app.rules.fallback import FallbackRules, compile_fallback_rules
+from app.rules.matcher import PhraseMatcher
+from app.rules.packs import (
+    RulePack,
+    RulePackRegistry,
+    compile_rule_pack,
+    load_rule_pack,
+    rule_registry,
+)
+
+__all__ = [
+    "FallbackRules",
+    "PhraseMatcher",
+    "RulePack",
+    "RulePackRegistry",
+    "compile_fallback_rules",
+    "compile_rule_pack",
+    "load_rule_pack",
+    "rule_registry",
+]
@@ -0,0 +1,219 @@
+"""Re-screen historical SymptomEvent rows against a new red-flag rule pack.
+
+Usage::
+
+    python -m app.rules.backfill --new-rules new_pack.json --output diff.jsonl
+
+Rows are streamed in keyset-paginated chunks (``WHERE id > :last ORDER BY id``)
+and fanned out to a process pool with a bounded number of chunks in flight, so
+memory stays constant no matter how large the table is. The report is JSON
+lines: a header, one line per event whose critical/urgent flags changed, and a
+final summary line.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import IO, Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, create_engine, select
+
+from app.config import get_settings
+from app.db.models import SymptomEvent
+from app.rules.packs import RulePack, load_rule_pack
+from app.utils import configure_logging
+
+Row = Tuple[int, str, str, Optional[str]]
+
+# Rule packs loaded once per worker process by ``_init_worker``
+_worker_packs: Optional[Tuple[RulePack, RulePack]] = None
+
+
+@dataclass
+class BackfillSummary:
+    old_version: str
+    new_version: str
+    rows_scanned: int = 0
+    rows_changed: int = 0
+    last_id: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_scanned / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
+def iter_symptom_batches(
+    engine: Engine, chunk_size: int, start_after: int = 0
+) -> Iterator[List[Row]]:
+    """Yield ``(id, user_id, symptoms, context)`` rows in keyset-paginated chunks."""
+
+    last_id = start_after
+    while True:
+        with Session(engine) as session:
+            rows = session.exec(
+                select(
+                    SymptomEvent.id,
+                    SymptomEvent.user_id,
+                    SymptomEvent.symptoms,
+                    SymptomEvent.context,
+                )
+                .where(SymptomEvent.id > last_id)
+                .order_by(SymptomEvent.id)
+                .limit(chunk_size)
+            ).all()
+        if not rows:
+            return
+        batch = [tuple(row) for row in rows]
+        last_id = batch[-1][0]
+        yield batch
+
+
+def diff_flags(old: RulePack, new: RulePack, rows: Sequence[Row]) -> List[Dict[str, Any]]:
+    """Return one diff record per row whose flags differ between the packs."""
+
+    diffs = []
+    for event_id, user_id, symptoms, context in rows:
+        # Same blob TriageAgent.run screens
+        blob = f"{symptoms} {context or ''}"
+        before = old.detect(blob)
+        after = new.detect(blob)
+        if before == after:
+            continue
+        record: Dict[str, Any] = {"id": event_id, "user_id": user_id}
+        for tier in ("critical", "urgent"):
+            old_set, new_set = set(before[tier]), set(after[tier])
+            record[f"{tier}_added"] = [p for p in after[tier] if p not in old_set]
+            record[f"{tier}_removed"] = [p for p in before[tier] if p not in new_set]
+        diffs.append(record)
+    return diffs
+
+
+def _init_worker(old_path: str, new_path: str) -> None:
+    global _worker_packs
+    _worker_packs = (load_rule_pack(old_path), load_rule_pack(new_path))
+
+
+def _screen_batch(rows: List[Row]) -> Tuple[int, int, List[Dict[str, Any]]]:
+    old, new = _worker_packs
+    return len(rows), rows[-1][0], diff_flags(old, new, rows)
+
+
+def run_backfill(
+    engine: Engine,
+    old_rules_path: str,
+    new_rules_path: str,
+    output: IO[str],
+    chunk_size: int = 5000,
+    workers: Optional[int] = None,
+    start_after: int = 0,
+    progress_every: int = 20,
+) -> BackfillSummary:
+    """Stream every SymptomEvent through both packs and write the diff report.
+
+    ``workers=0`` screens chunks inline, which is handy for small tables and tests.
+    """
+
+    logger = configure_logging()
+    old_pack, new_pack = load_rule_pack(old_rules_path), load_rule_pack(new_rules_path)
+    summary = BackfillSummary(
+        old_version=old_pack.version, new_version=new_pack.version, last_id=start_after
+    )
+    output.write(json.dumps({"old_version": old_pack.version, "new_version": new_pack.version}) + "\n")
+
+    started = time.perf_counter()
+    chunks_done = 0
+
+    def consume(result: Tuple[int, int, List[Dict[str, Any]]]) -> None:
+        nonlocal chunks_done
+        scanned, last_id, diffs = result
+        summary.rows_scanned += scanned
+        summary.rows_changed += len(diffs)
+        summary.last_id = last_id
+        for record in diffs:
+            output.write(json.dumps(record) + "\n")
+        chunks_done += 1
+        if chunks_done % progress_every == 0:
+            elapsed = time.perf_counter() - started
+            logger.info(
+                "Backfill progress: %s rows (last id %s), %.0f rows/sec",
+                summary.rows_scanned,
+                last_id,
+                summary.rows_scanned / elapsed if elapsed else 0.0,
+            )
+
+    batches = iter_symptom_batches(engine, chunk_size, start_after)
+    if workers == 0:
+        for rows in batches:
+            consume((len(rows), rows[-1][0], diff_flags(old_pack, new_pack, rows)))
+    else:
+        max_workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(old_rules_path, new_rules_path),
+        ) as pool:
+            # Cap chunks in flight so fetched-but-unscreened rows stay bounded;
+            # results are consumed in submission order to keep the report stable.
+            pending: Deque[Future] = deque()
+            for rows in batches:
+                pending.append(pool.submit(_screen_batch, rows))
+                if len(pending) >= max_workers * 2:
+                    consume(pending.popleft().result())
+            while pending:
+                consume(pending.popleft().result())
+
+    summary.elapsed_seconds = time.perf_counter() - started
+    output.write(
+        json.dumps({"summary": {**asdict(summary), "rows_per_second": summary.rows_per_second}})
+        + "\n"
+    )
+    logger.info(
+        "Backfill finished: %s rows scanned, %s changed, %.0f rows/sec",
+        summary.rows_scanned,
+        summary.rows_changed,
+        summary.rows_per_second,
+    )
+    return summary
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--new-rules", required=True, help="Candidate rule pack to screen with.")
+    parser.add_argument(
+        "--old-rules",
+        default=settings.red_flag_rules_path,
+        help="Baseline rule pack (defaults to the active RED_FLAG_RULES_PATH).",
+    )
+    parser.add_argument("--output", default="-", help="Report path, or '-' for stdout.")
+    parser.add_argument("--database-url", default=settings.database_url)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=None, help="0 screens inline.")
+    parser.add_argument("--start-after", type=int, default=0, help="Resume after this event id.")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.database_url, echo=False)
+    if args.output == "-":
+        run_backfill(
+            engine, args.old_rules, args.new_rules, sys.stdout,
+            args.chunk_size, args.workers, args.start_after,
+        )
+    else:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            run_backfill(
+                engine, args.old_rules, args.new_rules, handle,
+                args.chunk_size, args.workers, args.start_after,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Mapping, Optional, Sequence, Tuple
+
+# Used when a rule pack has no ``fallback`` section
+DEFAULT_FALLBACK_RULES: Mapping[str, Any] = {
+    "emergency": [
+        "chest pain",
+        "trouble breathing",
+        "suicidal",
+        "stroke",
+        "bleeding",
+        "severe headache",
+    ],
+    "categories": {
+        "dermatological": ["rash"],
+        "neurological": ["headache", "vision", "dizzy"],
+        "respiratory": ["breath", "cough", "lung"],
+    },
+}
+
+EMERGENCY_GROUP = "emergency"
+
+
+@dataclass(frozen=True)
+class FallbackRules:
+    """Compiled heuristic used when the LLM cannot answer.
+
+    Every emergency term and category keyword is folded into one alternation
+    with a named group per outcome, so a request costs a single regex pass
+    over its lowercased symptom and context fields. Keywords match at the
+    start of a word ("cough" matches "coughing" but "rash" does not match
+    "crash"), and a leading first-character class lets the engine skip most
+    positions cheaply. The alternation sits in a lookahead so overlapping
+    hits ("severe headache" is both an emergency term and a neurological
+    keyword) are all seen; at any one position the emergency group is tried
+    first. Categories are ranked in pack order: the first listed category
+    that matches wins, whatever its position in the text.
+    """
+
+    pattern: re.Pattern
+    categories: Tuple[str, ...]
+    emergency_terms: Tuple[str, ...] = field(default=())
+
+    def classify(self, *fields: Optional[str]) -> Tuple[str, str, str]:
+        """Return ``(category, urgency, recommended_action)`` for the given fields."""
+
+        text = "\n".join(f for f in fields if f).lower()
+        hits = {match.lastgroup for match in self.pattern.finditer(text)}
+
+        emergency = EMERGENCY_GROUP in hits
+        category = "emergency" if emergency else "general"
+        for index, name in enumerate(self.categories):
+            if f"c{index}" in hits:
+                category = name
+                break
+        if emergency:
+            return category, "high", "go_to_er"
+        return category, "moderate", "primary_care"
+
+
+def compile_fallback_rules(data: Optional[Mapping[str, Any]] = None) -> FallbackRules:
+    """Validate a rule pack's ``fallback`` section and compile it."""
+
+    data = DEFAULT_FALLBACK_RULES if data is None else data
+    emergency = [_keyword(term) for term in data.get("emergency", []) if _keyword(term)]
+    categories = data.get("categories", {})
+    if not isinstance(categories, Mapping):
+        raise ValueError("Fallback 'categories' must map category names to keyword lists.")
+
+    branches = []
+    if emergency:
+        branches.append(_group(EMERGENCY_GROUP, emergency))
+    names = []
+    every_keyword = list(emergency)
+    for name, keywords in categories.items():
+        keywords = [_keyword(k) for k in keywords if _keyword(k)]
+        if not keywords:
+            raise ValueError(f"Fallback category '{name}' has no keywords.")
+        branches.append(_group(f"c{len(names)}", keywords))
+        names.append(str(name))
+        every_keyword.extend(keywords)
+    if not branches:
+        raise ValueError("Fallback rules must define emergency terms or categories.")
+
+    prefix = "[" + "".join(re.escape(c) for c in sorted({k[0] for k in every_keyword})) + "]"
+    return FallbackRules(
+        pattern=re.compile(rf"\b(?={prefix})(?=" + "|".join(branches) + ")"),
+        categories=tuple(names),
+        emergency_terms=tuple(emergency),
+    )
+
+
+def _keyword(value: Any) -> str:
+    return str(value).strip().lower()
+
+
+def _group(name: str, keywords: Sequence[str]) -> str:
+    # Longest first so overlapping keywords inside one group prefer the full phrase
+    alternation = "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+    return f"(?P<{name}>{alternation})"
+
+
+@lru_cache(maxsize=256)
+def render_fallback(category: str, urgency: str, action: str, reasoning: str) -> str:
+    """Serialized fallback response; the outcome space is tiny, so memoize it."""
+
+    return json.dumps(
+        {
+            "category": category,
+            "urgency": urgency,
+            "recommended_action": action,
+            "red_flags": [],
+            "reasoning": reasoning,
+        }
+    )
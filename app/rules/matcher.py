@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+
+class PhraseMatcher:
+    """Aho-Corasick automaton that finds grouped phrases in a single pass.
+
+    Phrases are compiled once at construction. ``match`` walks the lowercased
+    text exactly once regardless of how many phrases are loaded, and only
+    reports hits that start on a word boundary so that e.g. ``"stroke"`` does
+    not fire inside ``"heatstroke"``. The end is left open, like the prefix
+    matching in ``app/rules/fallback.py``, so inflections still match:
+    ``"seizure"`` fires on ``"seizures"`` and ``"chest pain"`` on
+    ``"chest pains"``.
+    """
+
+    def __init__(self, groups: Mapping[str, Iterable[str]]) -> None:
+        self.groups: Tuple[str, ...] = tuple(groups)
+        # Each entry is (group, phrase); the index doubles as the report order.
+        self._patterns: List[Tuple[str, str]] = []
+        for group, phrases in groups.items():
+            for phrase in phrases:
+                normalized = phrase.strip().lower()
+                if normalized:
+                    self._patterns.append((group, normalized))
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[Tuple[int, ...]] = [()]
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def _build(self) -> None:
+        goto, fail = self._goto, self._fail
+        raw_outputs: List[List[int]] = [[]]
+
+        for index, (_, phrase) in enumerate(self._patterns):
+            state = 0
+            for char in phrase:
+                nxt = goto[state].get(char)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][char] = nxt
+                    goto.append({})
+                    fail.append(0)
+                    raw_outputs.append([])
+                state = nxt
+            raw_outputs[state].append(index)
+
+        # Breadth-first pass wires failure links and merges suffix outputs so the
+        # scan never has to follow output chains at match time.
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in goto[state].items():
+                queue.append(nxt)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                candidate = goto[fallback].get(char, 0)
+                fail[nxt] = candidate if candidate != nxt else 0
+                raw_outputs[nxt].extend(raw_outputs[fail[nxt]])
+
+        self._outputs = [tuple(out) for out in raw_outputs]
+        self._lengths = [len(phrase) for _, phrase in self._patterns]
+
+    def match(self, text: str) -> Dict[str, List[str]]:
+        """Return the phrases found in ``text`` keyed by group, in load order."""
+
+        lowered = text.lower()
+        goto, fail, outputs, lengths = self._goto, self._fail, self._outputs, self._lengths
+        hits = set()
+        state = 0
+
+        for position, char in enumerate(lowered):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not outputs[state]:
+                continue
+            end = position + 1
+            for index in outputs[state]:
+                start = end - lengths[index]
+                if start == 0 or not lowered[start - 1].isalnum():
+                    hits.add(index)
+
+        result: Dict[str, List[str]] = {group: [] for group in self.groups}
+        for index in sorted(hits):
+            group, phrase = self._patterns[index]
+            result[group].append(phrase)
+        return result
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional
+
+from app.config import get_settings
+from app.observability.metrics import metrics
+from app.rules.fallback import FallbackRules, compile_fallback_rules
+from app.rules.matcher import PhraseMatcher
+from app.utils import configure_logging
+
+
+@dataclass(frozen=True)
+class RulePack:
+    """Immutable, compiled snapshot of a versioned red-flag rule pack.
+
+    Everything a request needs (phrase tables, the compiled matcher and the
+    LLM fallback heuristic) hangs off a single object, so callers that grab
+    one snapshot never observe a mix of two rule versions.
+    """
+
+    version: str
+    critical_phrases: Mapping[str, str]
+    urgent_phrases: Mapping[str, str]
+    matcher: PhraseMatcher
+    source: Optional[str] = None
+    fallback: FallbackRules = field(default_factory=compile_fallback_rules)
+
+    def detect(self, text: str) -> Dict[str, List[str]]:
+        return self.matcher.match(text)
+
+
+def compile_rule_pack(data: Mapping[str, Any], source: Optional[str] = None) -> RulePack:
+    """Validate raw pack data and compile it into a ``RulePack``."""
+
+    version = data.get("version")
+    if not version:
+        raise ValueError("Rule pack is missing a 'version'.")
+
+    tiers: Dict[str, Dict[str, str]] = {}
+    for tier in ("critical", "urgent"):
+        phrases = data.get(tier, {})
+        if not isinstance(phrases, Mapping):
+            raise ValueError(f"Rule pack tier '{tier}' must map phrases to rationales.")
+        tiers[tier] = {
+            str(phrase).strip().lower(): str(reason)
+            for phrase, reason in phrases.items()
+            if str(phrase).strip()
+        }
+    if not tiers["critical"]:
+        raise ValueError("Rule pack must define at least one critical phrase.")
+
+    return RulePack(
+        version=str(version),
+        critical_phrases=MappingProxyType(tiers["critical"]),
+        urgent_phrases=MappingProxyType(tiers["urgent"]),
+        matcher=PhraseMatcher(tiers),
+        source=source,
+        fallback=compile_fallback_rules(data.get("fallback")),
+    )
+
+
+def load_rule_pack(path: str | os.PathLike[str]) -> RulePack:
+    """Load a JSON or YAML rule pack from disk."""
+
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() in {".yaml", ".yml"}:
+        try:
+            import yaml
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError("PyYAML is required to load YAML rule packs.") from exc
+        data = yaml.safe_load(text)
+    else:
+        data = json.loads(text)
+    if not isinstance(data, Mapping):
+        raise ValueError(f"Rule pack {path} must contain a mapping at the top level.")
+    return compile_rule_pack(data, source=str(path))
+
+
+class RulePackRegistry:
+    """Holds the active rule pack and swaps in recompiled versions atomically."""
+
+    def __init__(
+        self,
+        path: Optional[str | os.PathLike[str]] = None,
+        pack: Optional[RulePack] = None,
+    ) -> None:
+        if pack is None and path is None:
+            raise ValueError("RulePackRegistry needs a pack or a path to load from.")
+        self.path = Path(path) if path is not None else None
+        self.logger = configure_logging()
+        self._reload_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self._mtime = self._current_mtime()
+        self._pack = pack or load_rule_pack(self.path)
+        self._publish(self._pack)
+
+    @property
+    def current(self) -> RulePack:
+        """Return the active snapshot; a single reference read is atomic."""
+
+        return self._pack
+
+    def reload(self) -> RulePack:
+        """Recompile the pack from disk and swap it in.
+
+        The new pack is fully built before the reference is replaced, so
+        in-flight requests keep using their snapshot. On failure the active
+        pack is left untouched and the error is re-raised.
+        """
+
+        if self.path is None:
+            raise ValueError("Registry was built from an in-memory pack; nothing to reload.")
+        with self._reload_lock:
+            mtime = self._current_mtime()
+            try:
+                pack = load_rule_pack(self.path)
+            except Exception as exc:
+                metrics.counters["red_flag_rules_reload_failure"] += 1
+                self.logger.error("Rule pack reload from %s failed: %s", self.path, exc)
+                raise
+            previous = self._pack.version
+            self._pack = pack
+            self._mtime = mtime
+            metrics.counters["red_flag_rules_reload_success"] += 1
+            self._publish(pack)
+            self.logger.info("Red-flag rule pack swapped: %s -> %s", previous, pack.version)
+            return pack
+
+    def start_watching(self, interval_seconds: float) -> None:
+        """Poll the pack file in a background thread and reload on change."""
+
+        if self.path is None or interval_seconds <= 0 or self._watcher is not None:
+            return
+        self._stop_event.clear()
+        self._watcher = threading.Thread(
+            target=self._watch_loop,
+            args=(interval_seconds,),
+            name="medassist-rule-pack-watcher",
+            daemon=True,
+        )
+        self._watcher.start()
+        self.logger.info("Watching rule pack %s every %ss", self.path, interval_seconds)
+
+    def stop_watching(self) -> None:
+        if self._watcher is None:
+            return
+        self._stop_event.set()
+        self._watcher.join(timeout=5)
+        self._watcher = None
+
+    def _watch_loop(self, interval_seconds: float) -> None:
+        while not self._stop_event.wait(interval_seconds):
+            if self._current_mtime() == self._mtime:
+                continue
+            try:
+                self.reload()
+            except Exception:
+                # Keep serving the last good pack; the error is already logged.
+                self._mtime = self._current_mtime()
+
+    def _current_mtime(self) -> Optional[float]:
+        if self.path is None:
+            return None
+        try:
+            return self.path.stat().st_mtime
+        except OSError:
+            return None
+
+    @staticmethod
+    def _publish(pack: RulePack) -> None:
+        metrics.set_gauge("red_flag_rules_version", pack.version)
+        metrics.set_gauge("red_flag_rules_phrases", len(pack.matcher))
+
+
+# Process-wide registry shared by every TriageAgent
+rule_registry = RulePackRegistry(get_settings().red_flag_rules_path)
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, List, Literal, Optional
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
 class TriageRequest(BaseModel):
@@ -12,6 +12,65 @@ class TriageRequest(BaseModel):
     context: Optional[str] = Field(
         default=None, description="Optional medical history or recent events."
     )
+    history: Optional[str] = Field(
+        default=None,
+        description="Prior health history from memory, most relevant entry first.",
+    )
+    medications: List[str] = Field(
+        default_factory=list,
+        description="Current medications; looked up alongside any named in the symptoms.",
+    )
+
+
+class TriageLLMOutput(BaseModel):
+    """Validated triage fields extracted from raw LLM output.
+
+    Enumerated fields are normalized ("Go to ER" -> "go_to_er") before
+    validation; urgency and recommended action are required so a truncated
+    answer never silently defaults the safety-relevant fields.
+    """
+
+    category: str = "general"
+    urgency: Literal["low", "moderate", "high"]
+    recommended_action: Literal["self_care", "primary_care", "go_to_er"]
+    red_flags: List[str] = Field(default_factory=list)
+    reasoning: str = "LLM reasoning unavailable."
+    confidence: Optional[float] = None
+
+    @field_validator("category", mode="before")
+    @classmethod
+    def _normalize_category(cls, value: Any) -> Any:
+        return value.strip().lower() if isinstance(value, str) else value
+
+    @field_validator("urgency", "recommended_action", mode="before")
+    @classmethod
+    def _normalize_label(cls, value: Any) -> Any:
+        if isinstance(value, str):
+            return "_".join(value.strip().lower().replace("-", " ").split())
+        return value
+
+    @field_validator("red_flags", mode="before")
+    @classmethod
+    def _coerce_flags(cls, value: Any) -> Any:
+        if value is None:
+            return []
+        if isinstance(value, str):
+            return [value] if value else []
+        if isinstance(value, list):
+            return [str(item) for item in value if item]
+        return value
+
+    @field_validator("confidence", mode="before")
+    @classmethod
+    def _coerce_confidence(cls, value: Any) -> Any:
+        if value is None:
+            return None
+        try:
+            confidence = float(value)
+        except (TypeError, ValueError):
+            # An unreadable confidence is treated as no confidence at all
+            return 0.0
+        return min(max(confidence, 0.0), 1.0)
 
 
 class TriageResponse(BaseModel):
@@ -20,6 +79,11 @@ class TriageResponse(BaseModel):
     recommended_action: str
     red_flags: List[str]
     reasoning: str
+    rule_pack_version: Optional[str] = None
+    degraded: List[str] = Field(
+        default_factory=list,
+        description="Pipeline stages skipped to meet the request deadline.",
+    )
 
 
 class SymptomEventRead(TriageResponse):
@@ -1,16 +1,35 @@
 from __future__ import annotations
 
+import json
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+
+from app.tools.cache import CachePolicy
 
 
 class BaseTool(ABC):
-    """Base class for all agent tools."""
+    """Base class for all agent tools.
+
+    Tools opt into result caching by setting ``cache_policy``; ``cache_key``
+    may be overridden to normalize arguments or to return ``None`` for calls
+    that must not be cached. ``fallback`` answers without the tool's
+    dependency while ``ToolManager`` has its circuit open.
+    """
+    
+    cache_policy: Optional[CachePolicy] = None
     
     def __init__(self, name: str, description: str):
         self.name = name
         self.description = description
     
+    def cache_key(self, **kwargs) -> Optional[str]:
+        """Key identifying a call's result; ``None`` skips the cache."""
+        return json.dumps(kwargs, sort_keys=True, default=str)
+    
+    def fallback(self, **kwargs) -> Dict[str, Any]:
+        """Immediate answer used while the tool is tripped."""
+        return {"error": f"Tool '{self.name}' is unavailable", "fallback": True}
+    
     @abstractmethod
     async def execute(self, **kwargs) -> Dict[str, Any]:
         """Execute the tool with given parameters."""
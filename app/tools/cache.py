@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+FRESH = "fresh"
+STALE = "stale"
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """How ``ToolManager`` caches one tool's results.
+
+    Successful results are fresh for ``ttl_seconds`` and may then be served
+    for another ``stale_seconds`` while a background refresh runs. Errors are
+    cached for ``negative_ttl_seconds`` (0 disables negative caching) so a
+    failing upstream is not hammered by every request.
+    """
+
+    ttl_seconds: float = 300.0
+    max_entries: int = 512
+    negative_ttl_seconds: float = 15.0
+    stale_seconds: float = 0.0
+
+
+class ToolResultCache:
+    """Thread-safe LRU of tool results with fresh and stale windows."""
+
+    def __init__(self, policy: CachePolicy) -> None:
+        self.policy = policy
+        # key -> (fresh_until, stale_until, result)
+        self._entries: OrderedDict[str, Tuple[float, float, Dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Return ``(result, FRESH | STALE)``, or ``(None, None)`` on a miss."""
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, None
+            fresh_until, stale_until, result = entry
+            if now >= stale_until:
+                del self._entries[key]
+                return None, None
+            self._entries.move_to_end(key)
+            return result, FRESH if now < fresh_until else STALE
+
+    def set(self, key: str, result: Dict[str, Any], negative: bool = False) -> None:
+        if negative:
+            ttl, stale = self.policy.negative_ttl_seconds, 0.0
+        else:
+            ttl, stale = self.policy.ttl_seconds, self.policy.stale_seconds
+        if ttl <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (now + ttl, now + ttl + stale, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.policy.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,161 @@
+"""Process-wide pooled HTTP client shared by all tools.
+
+One ``httpx.AsyncClient`` keeps connections alive across tool calls, so a
+lookup only pays DNS, TCP and TLS setup when the pool has no idle connection
+to the host. The app opens it at startup and closes it on shutdown; code that
+runs outside the app (scripts, tests) gets one lazily on first use and must
+close it before its event loop ends.
+
+Every request is traced through httpcore's ``trace`` extension to report
+whether it reused a pooled connection or opened a new one, and how long it
+waited for a connection (per-host slot plus pool checkout) before its
+request headers went out.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+from app.config import Settings, get_settings
+from app.observability.metrics import metrics
+from app.utils import configure_logging
+
+try:
+    import h2  # noqa: F401
+except ImportError:  # pragma: no cover - optional HTTP/2 support
+    h2 = None
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that frees its per-host slot once it is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, slot: asyncio.Semaphore) -> None:
+        self._stream = stream
+        self._slot: Optional[asyncio.Semaphore] = slot
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        if self._slot is not None:
+            self._slot.release()
+            self._slot = None
+
+
+class PooledTransport(httpx.AsyncBaseTransport):
+    """Keep-alive transport with per-host concurrency limits and pool metrics."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_per_host: int) -> None:
+        self._transport = transport
+        self._max_per_host = max_per_host
+        self._slots: Dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(self._max_per_host)
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        slot = self._slots[f"{request.url.scheme}://{request.url.netloc.decode()}"]
+        await slot.acquire()
+        try:
+            request.extensions = {**request.extensions, "trace": self._tracer(started)}
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            slot.release()
+            raise
+        response.stream = _ReleasingStream(response.stream, slot)
+        return response
+
+    @staticmethod
+    def _tracer(started: float):
+        connected = False
+
+        async def trace(event: str, info: Dict[str, Any]) -> None:
+            nonlocal connected
+            if connected or not event.endswith(".started"):
+                return
+            if event == "connection.connect_tcp.started":
+                outcome = "new"
+            elif event.endswith(".send_request_headers.started"):
+                outcome = "reused"
+            else:
+                return
+            connected = True
+            metrics.counters[f"http_pool_connections_{outcome}"] += 1
+            metrics.observe("http_pool_wait_seconds", time.perf_counter() - started)
+            reused = metrics.counters["http_pool_connections_reused"]
+            total = reused + metrics.counters["http_pool_connections_new"]
+            metrics.set_gauge("http_pool_reuse_ratio", reused / total)
+
+        return trace
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class HTTPClientPool:
+    """Owns the shared ``httpx.AsyncClient``."""
+
+    def __init__(self, settings: Optional[Settings] = None) -> None:
+        self.settings = settings or get_settings()
+        self.logger = configure_logging()
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The pooled client, created on first use.
+
+        Its connections belong to the event loop that opened them; see
+        ``aclose``.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = self._build()
+        return self._client
+
+    def _build(self) -> httpx.AsyncClient:
+        settings = self.settings
+        http2 = settings.http_http2 and h2 is not None
+        if settings.http_http2 and not http2:
+            self.logger.warning("HTTP_HTTP2 is set but the h2 package is missing; using HTTP/1.1")
+        limits = httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry_seconds,
+        )
+        transport = PooledTransport(
+            httpx.AsyncHTTPTransport(limits=limits, http2=http2),
+            settings.http_max_connections_per_host,
+        )
+        return httpx.AsyncClient(
+            transport=transport,
+            timeout=httpx.Timeout(
+                settings.http_timeout_seconds, connect=settings.http_connect_timeout_seconds
+            ),
+        )
+
+    async def start(self) -> None:
+        """Open the pool ahead of the first request, bound to the app's loop."""
+
+        self.client  # noqa: B018 - the property creates the client
+
+    async def aclose(self) -> None:
+        """Close the client on the loop that used it; the next use opens a new one."""
+
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+
+
+# Global pool shared by all tools
+http_pool = HTTPClientPool()
@@ -0,0 +1,187 @@
+"""Offline index of the clinicaltables conditions and RxTerms datasets.
+
+``MedicalLookupTool`` answers ``conditions`` and ``drugs`` lookups from this
+index in-process, and only calls the remote API when the index has no match
+(if remote fallback is enabled). Build it from downloaded snapshots with::
+
+    python -m app.tools.local_index --index data/medical_index.db \\
+        --kind conditions conditions.csv
+    python -m app.tools.local_index --index data/medical_index.db \\
+        --kind drugs RxTerms202412.txt
+
+Snapshots may be CSV (``,``), pipe-delimited RxTerms text files, JSON lines,
+or a saved clinicaltables API response. Names are stored in an SQLite FTS5
+table and matched by word prefix ("hyperten" finds "Hypertension"), ranked
+by BM25 and then by name length. Queries that match no name on every word
+(free-text symptoms, usually) are retried on their meaningful words alone.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+from app.config import get_settings
+from app.observability.metrics import metrics
+from app.utils import configure_logging
+
+KINDS = ("conditions", "drugs")
+
+# Name columns tried in order when the snapshot has a header row
+NAME_COLUMNS = {
+    "conditions": ("primary_name", "consumer_name", "name", "term"),
+    "drugs": ("DISPLAY_NAME", "display_name", "FULL_NAME", "name"),
+}
+
+_WORD_RE = re.compile(r"\w+")
+
+# Common words in symptom descriptions that never identify a condition or drug
+STOPWORDS = frozenset(
+    "have been feel feeling after with since that this from when some very "
+    "really days weeks hours about what also just like mild".split()
+)
+
+_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS terms USING fts5(
+    name, kind UNINDEXED, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+class MedicalIndex:
+    """Read side of the FTS5 index; one shared connection, safe across threads."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        uri = f"file:{self.path.resolve()}?mode=ro"
+        self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    def search(self, kind: str, query: str, limit: int = 5) -> List[List[str]]:
+        """Best matching names as ``[[name], ...]``, the remote API's display shape."""
+
+        words = _WORD_RE.findall(query.lower())
+        started = time.perf_counter()
+        rows = self._match(" AND ".join(f'"{word}"*' for word in words), kind, limit)
+        if not rows:
+            # Free-text symptoms rarely match a name word for word: rank by
+            # how many of the meaningful words a name shares instead
+            keywords = [w for w in words if len(w) >= 4 and w not in STOPWORDS]
+            if keywords and len(words) > 1:
+                rows = self._match(" OR ".join(f'"{word}"*' for word in keywords), kind, limit)
+        metrics.observe("medical_index_lookup_seconds", time.perf_counter() - started)
+        return [[name] for (name,) in rows]
+
+    def has_name(self, kind: str, word: str) -> bool:
+        """True if some ``kind`` name starts with ``word`` as a whole word."""
+
+        word = word.lower()
+        if not _WORD_RE.fullmatch(word):
+            return False
+        rows = self._match(f'"{word}"', kind, 20)
+        return any(_WORD_RE.findall(name.lower())[:1] == [word] for (name,) in rows)
+
+    def _match(self, expression: str, kind: str, limit: int) -> List[tuple]:
+        if not expression:
+            return []
+        with self._lock:
+            return self._conn.execute(
+                "SELECT name FROM terms WHERE terms MATCH ? AND kind = ? "
+                "ORDER BY bm25(terms), length(name) LIMIT ?",
+                (expression, kind, limit),
+            ).fetchall()
+
+    def count(self, kind: Optional[str] = None) -> int:
+        with self._lock:
+            if kind is None:
+                return self._conn.execute("SELECT count(*) FROM terms").fetchone()[0]
+            return self._conn.execute(
+                "SELECT count(*) FROM terms WHERE kind = ?", (kind,)
+            ).fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def build_index(path: str | Path, kind: str, names: Iterable[str], replace: bool = True) -> int:
+    """Write ``names`` into the index under ``kind``; returns the number stored."""
+
+    if kind not in KINDS:
+        raise ValueError(f"Unknown index kind {kind!r}; expected one of {KINDS}")
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    unique = sorted({name.strip() for name in names if name and name.strip()})
+    with sqlite3.connect(path) as conn:
+        conn.executescript(_SCHEMA)
+        if replace:
+            conn.execute("DELETE FROM terms WHERE kind = ?", (kind,))
+        conn.executemany(
+            "INSERT INTO terms (name, kind) VALUES (?, ?)", ((name, kind) for name in unique)
+        )
+        conn.execute("INSERT INTO terms(terms) VALUES ('optimize')")
+    return len(unique)
+
+
+def read_snapshot(path: str | Path, kind: str, column: Optional[str] = None) -> Iterator[str]:
+    """Yield term names from a downloaded dataset snapshot."""
+
+    path = Path(path)
+    with path.open(encoding="utf-8", newline="") as handle:
+        if path.suffix == ".json":
+            yield from _names_from_api_response(json.load(handle))
+            return
+        if path.suffix == ".jsonl":
+            for line in handle:
+                if line.strip():
+                    row = json.loads(line)
+                    yield row if isinstance(row, str) else _pick(row, kind, column)
+            return
+        delimiter = "|" if path.suffix == ".txt" else ","
+        for row in csv.DictReader(handle, delimiter=delimiter):
+            yield _pick(row, kind, column)
+
+
+def _pick(row: dict, kind: str, column: Optional[str]) -> str:
+    for name in (column,) if column else NAME_COLUMNS[kind]:
+        if row.get(name):
+            return str(row[name])
+    return ""
+
+
+def _names_from_api_response(data) -> Iterator[str]:
+    # [total, codes, extra fields, display rows]
+    if isinstance(data, list) and len(data) > 3:
+        for display in data[3] or []:
+            yield display[0] if isinstance(display, list) else str(display)
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Import a dataset snapshot into the local medical index.")
+    parser.add_argument("snapshot", help="CSV, RxTerms .txt, .jsonl or saved API .json file")
+    parser.add_argument("--kind", choices=KINDS, required=True)
+    parser.add_argument("--index", default=get_settings().medical_index_path or "data/medical_index.db")
+    parser.add_argument("--column", help="Name column, if not one of the usual ones")
+    parser.add_argument("--append", action="store_true", help="Keep existing terms of this kind")
+    args = parser.parse_args(argv)
+
+    logger = configure_logging()
+    stored = build_index(
+        args.index,
+        args.kind,
+        read_snapshot(args.snapshot, args.kind, args.column),
+        replace=not args.append,
+    )
+    if not stored:
+        raise SystemExit(f"No {args.kind} names found in {args.snapshot}.")
+    logger.info("Indexed %s %s from %s -> %s", stored, args.kind, args.snapshot, args.index)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,53 +1,298 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import asyncio
+import contextvars
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
 
+from app.config import Settings, get_settings
+from app.deadline import current_deadline, deadline_scope
+from app.observability.metrics import metrics
+from app.observability.tracing import current_span
+from app.resilience import CircuitBreaker
 from app.tools.base import BaseTool
+from app.tools.cache import FRESH, ToolResultCache
 from app.tools.medical_lookup import GoogleSearchTool, MedicalLookupTool
 from app.tools.mcp_client import MCPClient
 from app.utils import configure_logging
 
 
+DEADLINE_EXCEEDED = {"error": "Request deadline exceeded", "deadline_exceeded": True}
+
+
+@dataclass
+class ToolCall:
+    """One invocation in a ``ToolManager.execute_many`` fan-out."""
+
+    name: str
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    # Per-call limit, applied on top of the shared deadline
+    timeout: Optional[float] = None
+    # Result key; defaults to the tool name and must be unique within a batch
+    key: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        return self.key or self.name
+
+
 class ToolManager:
-    """Manages and coordinates all available tools for agents."""
+    """Manages and coordinates all available tools for agents.
+
+    Every tool gets a circuit breaker fed by the outcome and latency of its
+    calls. While a breaker is open the tool is not called at all and its
+    ``fallback`` answers immediately; after ``tool_breaker_open_seconds`` one
+    live call is let through as a probe, closing the circuit if it succeeds.
+    """
     
-    def __init__(self):
+    def __init__(self, settings: Optional[Settings] = None):
+        self.settings = settings or get_settings()
         self.tools: Dict[str, BaseTool] = {}
+        self.caches: Dict[str, ToolResultCache] = {}
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.cache_enabled = self.settings.tool_cache_enabled
         self.logger = configure_logging()
+        # Background stale-while-revalidate refreshes, keyed by (tool, cache key)
+        self._refreshing: Dict[tuple, asyncio.Task] = {}
         self._register_default_tools()
     
     def _register_default_tools(self):
         """Register all available tools."""
-        self.tools["medical_lookup"] = MedicalLookupTool()
-        self.tools["google_search"] = GoogleSearchTool()
-        self.tools["mcp_client"] = MCPClient()
+        self._add_tool(MedicalLookupTool())
+        self._add_tool(GoogleSearchTool())
+        self._add_tool(MCPClient())
+    
+    def _add_tool(self, tool: BaseTool):
+        self.tools[tool.name] = tool
+        self.caches.pop(tool.name, None)
+        if self.cache_enabled and tool.cache_policy is not None:
+            self.caches[tool.name] = ToolResultCache(tool.cache_policy)
+        self.breakers[tool.name] = CircuitBreaker(
+            f"tool_{tool.name}",
+            failure_rate_threshold=self.settings.tool_breaker_failure_rate,
+            slow_call_seconds=self.settings.tool_breaker_slow_call_seconds,
+            slow_call_rate_threshold=self.settings.tool_breaker_slow_call_rate,
+            window_size=self.settings.tool_breaker_window,
+            min_calls=self.settings.tool_breaker_min_calls,
+            open_seconds=self.settings.tool_breaker_open_seconds,
+        )
     
     def register_tool(self, tool: BaseTool):
         """Register a custom tool."""
-        self.tools[tool.name] = tool
+        self._add_tool(tool)
         self.logger.info(f"Registered tool: {tool.name}")
     
     def get_tool(self, name: str) -> Optional[BaseTool]:
         """Get tool by name."""
         return self.tools.get(name)
     
-    def list_tools(self) -> List[Dict[str, str]]:
+    def list_tools(self) -> List[Dict[str, Any]]:
         """List all available tools."""
+        health = self.health()
         return [
-            {"name": tool.name, "description": tool.description}
+            {"name": tool.name, "description": tool.description, "health": health[tool.name]}
             for tool in self.tools.values()
         ]
     
+    def health(self) -> Dict[str, Dict[str, Any]]:
+        """Rolling success rate, latency and circuit state of each tool."""
+        health = {}
+        for name, breaker in self.breakers.items():
+            snapshot = breaker.snapshot()
+            latency = f"tool_{name}_call_seconds"
+            health[name] = {
+                "state": snapshot["state"],
+                "healthy": snapshot["state"] == CircuitBreaker.CLOSED,
+                "window_calls": snapshot["window_calls"],
+                "success_rate": round(1.0 - snapshot["failure_rate"], 3),
+                "slow_call_rate": round(snapshot["slow_call_rate"], 3),
+                "p50_ms": round(metrics.percentile(latency, 50) * 1000, 1),
+                "p95_ms": round(metrics.percentile(latency, 95) * 1000, 1),
+            }
+        return health
+    
+    async def aclose(self) -> None:
+        """Release connections held by tools (e.g. the MCP session)."""
+        for tool in self.tools.values():
+            close = getattr(tool, "aclose", None)
+            if close is not None:
+                await close()
+    
+    async def execute_many(
+        self, calls: Sequence[ToolCall], timeout: Optional[float] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Run several tool calls concurrently under one shared deadline.
+
+        ``timeout`` tightens any deadline already in effect. Each call may
+        also carry its own timeout. Results are keyed by ``ToolCall.label``;
+        calls still running when the deadline expires are cancelled and get
+        a ``deadline_exceeded`` result, so the batch returns whatever
+        finished in time. Per-call timings are tagged on the active span.
+        """
+        labels = [call.label for call in calls]
+        if len(set(labels)) != len(labels):
+            raise ValueError(f"Duplicate tool call keys: {labels}")
+        span = current_span()
+        started = time.perf_counter()
+        
+        with deadline_scope(timeout) as deadline:
+            tasks = {
+                asyncio.ensure_future(self._timed_call(call, span)): call for call in calls
+            }
+            if not tasks:
+                return {}
+            done, pending = await asyncio.wait(
+                tasks, timeout=deadline.remaining() if deadline is not None else None
+            )
+        
+        results: Dict[str, Dict[str, Any]] = {}
+        for task, call in tasks.items():
+            if task in pending:
+                task.cancel()
+                deadline.mark_degraded(f"tool:{call.name}")
+                metrics.counters[f"tool_{call.name}_deadline_exceeded"] += 1
+                if span is not None:
+                    span.log(f"Tool call {call.label} cancelled at the deadline", "warning")
+                results[call.label] = dict(DEADLINE_EXCEEDED)
+            else:
+                results[call.label] = task.result()
+        
+        metrics.observe("tool_fanout_seconds", time.perf_counter() - started)
+        if span is not None:
+            span.add_tag("tool_fanout_ms", round((time.perf_counter() - started) * 1000, 1))
+        return results
+    
+    async def _timed_call(self, call: ToolCall, span) -> Dict[str, Any]:
+        started = time.perf_counter()
+        with deadline_scope(call.timeout):
+            result = await self.execute_tool(call.name, **call.kwargs)
+        elapsed = time.perf_counter() - started
+        metrics.observe(f"tool_{call.name}_seconds", elapsed)
+        if span is not None:
+            span.add_tag(f"tool_{call.label}_ms", round(elapsed * 1000, 1))
+        return result
+    
     async def execute_tool(self, name: str, **kwargs) -> Dict[str, Any]:
-        """Execute a tool by name."""
+        """Execute a tool by name.
+
+        Results of cacheable tools are served from their cache: a fresh entry
+        is returned as is, a stale one is returned immediately while a single
+        background call refreshes it. Under a request deadline the tool only
+        gets the remaining budget; a tool that cannot finish in time is
+        skipped and reported as degraded.
+        """
         tool = self.get_tool(name)
         if not tool:
             return {"error": f"Tool '{name}' not found"}
         
+        cache = self.caches.get(name)
+        key = tool.cache_key(**kwargs) if cache is not None else None
+        if key is None:
+            return await self._run_tool(tool, name, kwargs)
+        
+        cached, state = cache.get(key)
+        if cached is not None:
+            if state == FRESH:
+                self._record_cache(name, "negative_hit" if "error" in cached else "hit")
+            else:
+                self._record_cache(name, "stale_hit")
+                self._revalidate(tool, name, key, kwargs)
+            return cached
+        
+        self._record_cache(name, "miss")
+        result = await self._run_tool(tool, name, kwargs)
+        self._store(cache, key, result)
+        return result
+    
+    @staticmethod
+    def _store(cache: ToolResultCache, key: str, result: Dict[str, Any]) -> None:
+        if result.get("deadline_exceeded") or result.get("circuit_open"):
+            return  # Says nothing about the tool's answer, only about this request
+        cache.set(key, result, negative="error" in result or bool(result.get("fallback")))
+    
+    def _revalidate(self, tool: BaseTool, name: str, key: str, kwargs: Dict[str, Any]) -> None:
+        if (name, key) in self._refreshing:
+            return
+        
+        async def refresh() -> None:
+            result = await self._run_tool(tool, name, kwargs)
+            cache = self.caches.get(name)
+            # Keep serving the stale value rather than replacing it with an error
+            if cache is not None and "error" not in result and not result.get("fallback"):
+                self._store(cache, key, result)
+        
+        # A fresh context: the refresh must not inherit the caller's deadline
+        task = asyncio.get_running_loop().create_task(refresh(), context=contextvars.Context())
+        self._refreshing[(name, key)] = task
+        task.add_done_callback(lambda _: self._refreshing.pop((name, key), None))
+    
+    @staticmethod
+    def _record_cache(name: str, outcome: str) -> None:
+        metrics.record_cache(f"tool_{name}", outcome)
+        counters = metrics.counters
+        hits = sum(counters[f"tool_{name}_cache_{o}"] for o in ("hit", "stale_hit", "negative_hit"))
+        total = hits + counters[f"tool_{name}_cache_miss"]
+        metrics.set_gauge(f"tool_{name}_cache_hit_rate", hits / total if total else 0.0)
+    
+    async def _run_tool(self, tool: BaseTool, name: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        deadline = current_deadline()
+        if deadline is not None and deadline.expired:
+            return self._deadline_exceeded(name, deadline)
+        breaker = self.breakers[name]
+        if not breaker.allow_request():
+            return self._short_circuit(tool, name, kwargs)
+        
+        started = time.perf_counter()
         try:
-            result = await tool.execute(**kwargs)
-            self.logger.info(f"Tool {name} executed successfully")
-            return result
+            if deadline is None:
+                result = await tool.execute(**kwargs)
+            else:
+                result = await asyncio.wait_for(tool.execute(**kwargs), deadline.remaining())
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except asyncio.TimeoutError:
+            self._record_outcome(breaker, name, started, failed=True)
+            if deadline is None:
+                self.logger.error(f"Tool {name} execution timed out")
+                return {"error": "Tool timed out"}
+            return self._deadline_exceeded(name, deadline)
         except Exception as e:
+            self._record_outcome(breaker, name, started, failed=True)
             self.logger.error(f"Tool {name} execution failed: {e}")
-            return {"error": str(e)}
\ No newline at end of file
+            return {"error": str(e)}
+        
+        # A tool that had to fall back did not reach its dependency
+        failed = "error" in result or bool(result.get("fallback"))
+        self._record_outcome(breaker, name, started, failed=failed)
+        self.logger.info(f"Tool {name} executed successfully")
+        return result
+    
+    def _deadline_exceeded(self, name: str, deadline) -> Dict[str, Any]:
+        deadline.mark_degraded(f"tool:{name}")
+        metrics.counters[f"tool_{name}_deadline_exceeded"] += 1
+        self.logger.warning(f"Tool {name} skipped: request deadline exceeded")
+        return dict(DEADLINE_EXCEEDED)
+    
+    def _short_circuit(self, tool: BaseTool, name: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        span = current_span()
+        if span is not None:
+            span.add_tag(f"tool_{name}_circuit_open", True)
+        try:
+            result = tool.fallback(**kwargs)
+        except Exception as e:
+            self.logger.error(f"Tool {name} fallback failed: {e}")
+            result = {"error": f"Tool '{name}' is unavailable", "fallback": True}
+        return {**result, "circuit_open": True}
+    
+    def _record_outcome(self, breaker: CircuitBreaker, name: str, started: float, failed: bool) -> None:
+        elapsed = time.perf_counter() - started
+        metrics.observe(f"tool_{name}_call_seconds", elapsed)
+        if failed:
+            metrics.counters[f"tool_{name}_failure"] += 1
+            breaker.record_failure(elapsed)
+        else:
+            breaker.record_success(elapsed)
+        snapshot = breaker.snapshot()
+        metrics.set_gauge(f"tool_{name}_success_rate", round(1.0 - snapshot["failure_rate"], 3))
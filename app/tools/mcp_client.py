@@ -1,60 +1,137 @@
 from __future__ import annotations
 
-import json
-from typing import Any, Dict, List, Optional
-
-import httpx
+import asyncio
+import shlex
+import time
+from typing import Any, Dict, Optional
 
+from app.config import Settings, get_settings
 from app.tools.base import BaseTool
+from app.tools.http_pool import HTTPClientPool, http_pool
+from app.tools.mcp_session import (
+    MCPError,
+    MCPSession,
+    MCPTransportError,
+    StdioTransport,
+    StreamableHTTPTransport,
+)
 from app.utils import configure_logging
 
 
 class MCPClient(BaseTool):
-    """Model Context Protocol client for external data integration."""
+    """Model Context Protocol client for external data integration.
+
+    Calls share one persistent ``MCPSession`` per event loop, opened on first
+    use. While the server is unreachable the client answers with mock data
+    and only tries to reconnect every ``mcp_reconnect_seconds``.
+    """
     
-    def __init__(self, server_url: str = "http://localhost:3000"):
+    def __init__(
+        self,
+        server_url: Optional[str] = None,
+        http: Optional[HTTPClientPool] = None,
+        settings: Optional[Settings] = None,
+    ):
         super().__init__(
             name="mcp_client",
             description="Connect to MCP servers for external data and tools"
         )
-        self.server_url = server_url
+        self.settings = settings or get_settings()
+        self.server_url = server_url or self.settings.mcp_server_url
+        self.http = http or http_pool
         self.logger = configure_logging()
+        self._session: Optional[MCPSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._connecting: Optional[asyncio.Task] = None
+        self._retry_at = 0.0
+    
+    def cache_key(self, method: str, params: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        return None  # The session caches tool discovery itself
     
     async def execute(self, method: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Execute MCP method call."""
         try:
-            payload = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": method,
-                "params": params or {}
-            }
-            
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                response = await client.post(
-                    f"{self.server_url}/mcp",
-                    json=payload,
-                    headers={"Content-Type": "application/json"}
-                )
-                
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    return {"error": f"MCP server returned {response.status_code}"}
-                    
-        except httpx.ConnectError:
+            session = await self.session()
+            if method == "tools/list":
+                result: Any = {"tools": await session.list_tools()}
+            else:
+                result = await session.request(method, params)
+            return {"jsonrpc": "2.0", "result": result}
+        except MCPError as e:
+            return {"error": e.message, "code": e.code}
+        except asyncio.TimeoutError:
+            self.logger.warning(f"MCP call {method} timed out")
+            return {"error": "MCP request timed out"}
+        except (MCPTransportError, OSError) as e:
             # Fallback when MCP server unavailable
+            self.logger.warning(f"MCP server unavailable: {e}")
+            await self._disconnect()
             return self._mock_mcp_response(method, params)
         except Exception as e:
             self.logger.error(f"MCP call failed: {e}")
             return {"error": str(e)}
     
+    async def session(self) -> MCPSession:
+        """The live session for the running loop, connecting if needed."""
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed and self._loop is loop:
+            return self._session
+        if time.monotonic() < self._retry_at:
+            raise MCPTransportError("MCP server unavailable; waiting to reconnect")
+        task = self._connecting
+        if task is None or task.done() or task.get_loop() is not loop:
+            # Concurrent first calls share one connection attempt
+            task = self._connecting = loop.create_task(self._connect())
+        return await asyncio.shield(task)
+    
+    async def _connect(self) -> MCPSession:
+        session = MCPSession(
+            self._transport(),
+            self.settings.mcp_request_timeout_seconds,
+            tools_ttl=self.settings.mcp_tools_ttl_seconds,
+        )
+        try:
+            await session.start()
+        except BaseException:
+            self._retry_at = time.monotonic() + self.settings.mcp_reconnect_seconds
+            await session.close()
+            raise
+        self._session, self._loop = session, asyncio.get_running_loop()
+        self.logger.info(f"MCP session open: {session.server_info.get('name', 'unknown server')}")
+        return session
+    
+    def _transport(self):
+        if self.settings.mcp_transport == "stdio":
+            if not self.settings.mcp_command:
+                raise ValueError("MCP_COMMAND is required for the stdio MCP transport.")
+            return StdioTransport(shlex.split(self.settings.mcp_command))
+        if self.settings.mcp_transport == "http":
+            return StreamableHTTPTransport(
+                self.server_url, self.http, self.settings.mcp_request_timeout_seconds
+            )
+        raise ValueError(f"Unknown MCP transport {self.settings.mcp_transport!r}.")
+    
+    async def _disconnect(self) -> None:
+        session, self._session = self._session, None
+        if session is not None:
+            self._retry_at = time.monotonic() + self.settings.mcp_reconnect_seconds
+            await session.close()
+    
+    async def aclose(self) -> None:
+        """Close the session; the next call reconnects."""
+        await self._disconnect()
+        self._retry_at = 0.0
+    
+    def fallback(self, method: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return self._mock_mcp_response(method, params)
+    
     def _mock_mcp_response(self, method: str, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """Mock MCP responses for demo purposes."""
         if method == "tools/list":
             return {
                 "jsonrpc": "2.0",
                 "id": 1,
+                "fallback": True,
                 "result": {
                     "tools": [
                         {
@@ -73,6 +150,7 @@ class MCPClient(BaseTool):
             return {
                 "jsonrpc": "2.0",
                 "id": 1,
+                "fallback": True,
                 "result": {
                     "content": [
                         {
@@ -0,0 +1,438 @@
+"""Long-lived Model Context Protocol session over stdio or streamable HTTP.
+
+One ``MCPSession`` performs the ``initialize`` handshake once and then
+multiplexes any number of concurrent requests over its transport, matching
+responses to callers by a monotonically increasing JSON-RPC id:
+
+- ``StdioTransport`` runs the server as a subprocess and exchanges
+  newline-delimited JSON messages over its stdin/stdout.
+- ``StreamableHTTPTransport`` POSTs messages to the server's MCP endpoint on
+  the shared HTTP pool, carrying the ``Mcp-Session-Id`` the server assigned.
+  Requests issued in the same event-loop tick are coalesced into one
+  JSON-RPC batch; replies may be plain JSON or an SSE stream.
+
+``tools/list`` results are cached for ``tools_ttl`` seconds, or until the
+server sends ``notifications/tools/list_changed``. Over stdio that arrives
+as soon as the server sends it; the HTTP transport does not hold the
+optional GET event stream open, so it sees the notification only when a
+server attaches it to a POST reply, and the TTL bounds staleness otherwise.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from app.observability.metrics import metrics
+from app.tools.http_pool import HTTPClientPool, http_pool
+from app.utils import configure_logging
+
+PROTOCOL_VERSION = "2025-03-26"
+CLIENT_INFO = {"name": "medassist", "version": "0.1.0"}
+
+Message = Dict[str, Any]
+MessageHandler = Callable[[Message], None]
+# Called with the ids of requests a transport could not deliver
+FailureHandler = Callable[[List[int], Exception], None]
+
+
+class MCPError(Exception):
+    """JSON-RPC error returned by an MCP server."""
+
+    def __init__(self, code: int, message: str, data: Any = None) -> None:
+        super().__init__(f"MCP error {code}: {message}")
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+class MCPTransportError(ConnectionError):
+    """The transport to the MCP server failed or closed."""
+
+
+class StdioTransport:
+    """Newline-delimited JSON-RPC over a server subprocess's stdin/stdout."""
+
+    def __init__(self, command: Sequence[str], env: Optional[Dict[str, str]] = None) -> None:
+        if not command:
+            raise ValueError("An MCP stdio transport needs a server command.")
+        self.command = list(command)
+        self.env = env
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._write_lock = asyncio.Lock()
+
+    async def start(
+        self, on_message: MessageHandler, on_close: Callable[[], None], on_failure: FailureHandler
+    ) -> None:
+        self._process = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            env=self.env,
+            limit=2**22,  # tool results can be large single lines
+        )
+        self._reader = asyncio.ensure_future(self._read(on_message, on_close))
+
+    async def _read(self, on_message: MessageHandler, on_close: Callable[[], None]) -> None:
+        assert self._process is not None and self._process.stdout is not None
+        try:
+            async for line in self._process.stdout:
+                if line.strip():
+                    on_message(json.loads(line))
+        finally:
+            on_close()
+
+    async def send(self, payload: Union[Message, List[Message]]) -> None:
+        if self._process is None or self._process.stdin is None or self._process.returncode is not None:
+            raise MCPTransportError("MCP server process is not running")
+        data = json.dumps(payload, separators=(",", ":")).encode() + b"\n"
+        async with self._write_lock:
+            self._process.stdin.write(data)
+            await self._process.stdin.drain()
+
+    async def close(self) -> None:
+        if self._process is None:
+            return
+        if self._process.stdin is not None:
+            self._process.stdin.close()
+        try:
+            await asyncio.wait_for(self._process.wait(), timeout=2)
+        except asyncio.TimeoutError:
+            self._process.kill()
+            await self._process.wait()
+        if self._reader is not None:
+            await asyncio.gather(self._reader, return_exceptions=True)
+        self._process = None
+
+
+class StreamableHTTPTransport:
+    """MCP streamable-HTTP transport on the shared connection pool."""
+
+    def __init__(
+        self, url: str, http: Optional[HTTPClientPool] = None, timeout: float = 15.0
+    ) -> None:
+        self.url = url
+        self.http = http or http_pool
+        self.timeout = timeout
+        self.session_id: Optional[str] = None
+        self._on_message: Optional[MessageHandler] = None
+        self._on_failure: Optional[FailureHandler] = None
+        self._outbox: List[Message] = []
+        self._flush_scheduled = False
+        self._flushes: set = set()
+
+    async def start(
+        self, on_message: MessageHandler, on_close: Callable[[], None], on_failure: FailureHandler
+    ) -> None:
+        self._on_message = on_message
+        self._on_failure = on_failure
+
+    async def send(self, payload: Union[Message, List[Message]]) -> None:
+        if isinstance(payload, list):
+            await self._post(payload)
+            return
+        # Coalesce single messages sent in the same tick into one batch
+        self._outbox.append(payload)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._schedule_flush)
+
+    def _schedule_flush(self) -> None:
+        self._flush_scheduled = False
+        messages, self._outbox = self._outbox, []
+        if not messages:
+            return
+        task = asyncio.ensure_future(self._post(messages[0] if len(messages) == 1 else messages))
+        self._flushes.add(task)
+        task.add_done_callback(self._flush_done(messages))
+
+    def _flush_done(self, messages: List[Message]) -> Callable[[asyncio.Task], None]:
+        def done(task: asyncio.Task) -> None:
+            self._flushes.discard(task)
+            if task.cancelled() or task.exception() is None:
+                return
+            # Fail every request in the batch rather than leaving callers hanging
+            ids = [message["id"] for message in messages if "id" in message]
+            if ids and self._on_failure is not None:
+                self._on_failure(ids, task.exception())
+
+        return done
+
+    async def _post(self, payload: Union[Message, List[Message]]) -> None:
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json, text/event-stream",
+        }
+        if self.session_id:
+            headers["Mcp-Session-Id"] = self.session_id
+        if isinstance(payload, list):
+            metrics.counters["mcp_batches_sent"] += 1
+        try:
+            response = await self.http.client.post(
+                self.url, content=json.dumps(payload), headers=headers, timeout=self.timeout
+            )
+        except Exception as exc:
+            raise MCPTransportError(f"MCP request failed: {exc}") from exc
+        if "mcp-session-id" in response.headers:
+            self.session_id = response.headers["mcp-session-id"]
+        if response.status_code == 202:
+            return  # Accepted notification or response, nothing to read
+        if response.status_code == 404 and self.session_id:
+            self.session_id = None
+            raise MCPTransportError("MCP session expired on the server")
+        if response.status_code != 200:
+            raise MCPTransportError(f"MCP server returned {response.status_code}")
+
+        if response.headers.get("content-type", "").startswith("text/event-stream"):
+            messages = _parse_sse(response.text)
+        else:
+            messages = [response.json()]
+        for message in messages:
+            for item in message if isinstance(message, list) else [message]:
+                self._on_message(item)
+
+    async def close(self) -> None:
+        for task in list(self._flushes):
+            task.cancel()
+        if self.session_id:
+            try:
+                await self.http.client.delete(
+                    self.url, headers={"Mcp-Session-Id": self.session_id}, timeout=self.timeout
+                )
+            except Exception:
+                pass  # Best effort; the server expires idle sessions
+            self.session_id = None
+
+
+def _parse_sse(body: str) -> List[Any]:
+    messages = []
+    for event in body.split("\n\n"):
+        data = "\n".join(
+            line[5:].lstrip() for line in event.splitlines() if line.startswith("data:")
+        )
+        if data:
+            messages.append(json.loads(data))
+    return messages
+
+
+Transport = Union[StdioTransport, StreamableHTTPTransport]
+
+
+class MCPSession:
+    """Initialized MCP connection shared by all concurrent callers."""
+
+    def __init__(
+        self,
+        transport: Transport,
+        request_timeout: float = 15.0,
+        client_info: Optional[Dict[str, str]] = None,
+        tools_ttl: Optional[float] = None,
+    ) -> None:
+        self.transport = transport
+        self.request_timeout = request_timeout
+        self.tools_ttl = tools_ttl
+        self.client_info = client_info or CLIENT_INFO
+        self.server_info: Dict[str, Any] = {}
+        self.capabilities: Dict[str, Any] = {}
+        self.logger = configure_logging()
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._tools: Optional[List[Dict[str, Any]]] = None
+        self._tools_expires_at = 0.0
+        self._tools_version = 0
+        self._closed = False
+
+    async def start(self) -> "MCPSession":
+        await self.transport.start(self._dispatch, self._on_transport_closed, self._on_send_failed)
+        result = await self.request(
+            "initialize",
+            {
+                "protocolVersion": PROTOCOL_VERSION,
+                "capabilities": {},
+                "clientInfo": self.client_info,
+            },
+        )
+        self.server_info = result.get("serverInfo", {})
+        self.capabilities = result.get("capabilities", {})
+        await self.notify("notifications/initialized")
+        return self
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    async def request(
+        self, method: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None
+    ) -> Any:
+        """Send one request and wait for its result; raises ``MCPError``."""
+
+        request_id, future = self._register()
+        await self._send(_request(request_id, method, params))
+        return await self._await(request_id, future, timeout)
+
+    async def batch(
+        self, calls: Sequence[Tuple[str, Optional[Dict[str, Any]]]], timeout: Optional[float] = None
+    ) -> List[Union[Any, MCPError]]:
+        """Send ``(method, params)`` pairs as one JSON-RPC batch.
+
+        Results come back in call order; a failed call yields its
+        ``MCPError`` in place of a result rather than failing the batch.
+        """
+
+        registered = [self._register() for _ in calls]
+        await self._send(
+            [_request(request_id, method, params) for (request_id, _), (method, params) in zip(registered, calls)]
+        )
+        outcomes = await asyncio.gather(
+            *(self._await(request_id, future, timeout) for request_id, future in registered),
+            return_exceptions=True,
+        )
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException) and not isinstance(outcome, MCPError):
+                raise outcome
+        return list(outcomes)
+
+    async def notify(self, method: str, params: Optional[Dict[str, Any]] = None) -> None:
+        message: Message = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        await self._send(message)
+
+    async def list_tools(self) -> List[Dict[str, Any]]:
+        """Server tools, cached until the server says they changed or ``tools_ttl`` passes."""
+
+        if self._tools is not None:
+            if self.tools_ttl is None or time.monotonic() < self._tools_expires_at:
+                metrics.record_cache("mcp_tools", "hit")
+                return self._tools
+            metrics.record_cache("mcp_tools", "expired")
+            self._tools = None
+        metrics.record_cache("mcp_tools", "miss")
+        version = self._tools_version
+        tools: List[Dict[str, Any]] = []
+        cursor = None
+        while True:
+            result = await self.request("tools/list", {"cursor": cursor} if cursor else None)
+            tools.extend(result.get("tools", []))
+            cursor = result.get("nextCursor")
+            if not cursor:
+                break
+        # Only cache if no list_changed notification arrived while paging
+        if version == self._tools_version:
+            self._tools = tools
+            self._tools_expires_at = time.monotonic() + (self.tools_ttl or 0.0)
+        return tools
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None) -> Any:
+        return await self.request("tools/call", {"name": name, "arguments": arguments or {}})
+
+    async def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            await self.transport.close()
+        finally:
+            self._fail_pending(MCPTransportError("MCP session closed"))
+
+    def _register(self) -> Tuple[int, asyncio.Future]:
+        if self._closed:
+            raise MCPTransportError("MCP session closed")
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        return request_id, future
+
+    async def _send(self, payload: Union[Message, List[Message]]) -> None:
+        try:
+            await self.transport.send(payload)
+        except BaseException:
+            for message in payload if isinstance(payload, list) else [payload]:
+                future = self._pending.pop(message.get("id"), None)
+                if future is not None:
+                    future.cancel()
+            raise
+
+    async def _await(self, request_id: int, future: asyncio.Future, timeout: Optional[float]) -> Any:
+        try:
+            return await asyncio.wait_for(future, timeout or self.request_timeout)
+        except asyncio.TimeoutError:
+            metrics.counters["mcp_request_timeout"] += 1
+            # Tell the server to stop working on it
+            try:
+                await self.notify("notifications/cancelled", {"requestId": request_id, "reason": "timeout"})
+            except Exception:
+                pass
+            raise
+        finally:
+            self._pending.pop(request_id, None)
+
+    def _dispatch(self, message: Message) -> None:
+        if isinstance(message, list):
+            for item in message:
+                self._dispatch(item)
+            return
+        if "method" not in message:
+            future = self._pending.get(message.get("id"))
+            if future is None or future.done():
+                return  # Late reply to a request that timed out
+            if "error" in message:
+                error = message["error"]
+                future.set_exception(
+                    MCPError(error.get("code", -32603), error.get("message", ""), error.get("data"))
+                )
+            else:
+                future.set_result(message.get("result"))
+            return
+        if "id" in message:
+            asyncio.ensure_future(self._answer_server_request(message))
+            return
+        self._on_notification(message["method"], message.get("params") or {})
+
+    def _on_notification(self, method: str, params: Dict[str, Any]) -> None:
+        metrics.counters["mcp_notifications"] += 1
+        if method == "notifications/tools/list_changed":
+            self._tools = None
+            self._tools_version += 1
+            self.logger.info("MCP server tools changed; discovery cache invalidated")
+
+    async def _answer_server_request(self, message: Message) -> None:
+        if message["method"] == "ping":
+            reply: Message = {"jsonrpc": "2.0", "id": message["id"], "result": {}}
+        else:
+            reply = {
+                "jsonrpc": "2.0",
+                "id": message["id"],
+                "error": {"code": -32601, "message": f"Method not found: {message['method']}"},
+            }
+        try:
+            await self.transport.send(reply)
+        except Exception as exc:
+            self.logger.warning(f"Could not answer MCP server request: {exc}")
+
+    def _on_send_failed(self, request_ids: List[int], error: Exception) -> None:
+        for request_id in request_ids:
+            future = self._pending.get(request_id)
+            if future is not None and not future.done():
+                future.set_exception(error)
+
+    def _on_transport_closed(self) -> None:
+        self._closed = True
+        self._fail_pending(MCPTransportError("MCP server closed the connection"))
+
+    def _fail_pending(self, error: Exception) -> None:
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+
+
+def _request(request_id: int, method: str, params: Optional[Dict[str, Any]]) -> Message:
+    message: Message = {"jsonrpc": "2.0", "id": request_id, "method": method}
+    if params is not None:
+        message["params"] = params
+    return message
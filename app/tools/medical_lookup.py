@@ -2,66 +2,117 @@ from __future__ import annotations
 
 import asyncio
 import json
-from typing import Any, Dict
-
-import httpx
+from pathlib import Path
+from typing import Any, Dict, Optional
 
+from app.config import Settings, get_settings
+from app.observability.metrics import metrics
 from app.tools.base import BaseTool
+from app.tools.cache import CachePolicy
+from app.tools.http_pool import HTTPClientPool, http_pool
+from app.tools.local_index import KINDS, MedicalIndex
 from app.utils import configure_logging
 
 
 class MedicalLookupTool(BaseTool):
     """Custom tool for medical information lookup via external APIs."""
     
-    def __init__(self):
+    # Reference data changes rarely; failures are retried after a short window
+    cache_policy = CachePolicy(
+        ttl_seconds=3600, max_entries=2048, negative_ttl_seconds=30, stale_seconds=3600
+    )
+    
+    def __init__(
+        self,
+        base_url: str = "https://clinicaltables.nlm.nih.gov/api",
+        http: Optional[HTTPClientPool] = None,
+        index: Optional[MedicalIndex] = None,
+        settings: Optional[Settings] = None,
+    ):
         super().__init__(
             name="medical_lookup",
             description="Look up medical conditions, symptoms, and drug information"
         )
+        self.settings = settings or get_settings()
         self.logger = configure_logging()
-        self.base_url = "https://clinicaltables.nlm.nih.gov/api"
+        self.base_url = base_url
+        self.http = http or http_pool
+        self.index = index or self._open_index()
+        self.remote_fallback = self.settings.medical_lookup_remote_fallback
+    
+    def _open_index(self) -> Optional[MedicalIndex]:
+        path = self.settings.medical_index_path
+        if not path:
+            return None
+        if not Path(path).exists():
+            self.logger.warning(f"Medical index {path} not found; using the remote API")
+            return None
+        return MedicalIndex(path)
+    
+    def cache_key(self, query: str, lookup_type: str = "conditions") -> Optional[str]:
+        return f"{lookup_type}:{' '.join(query.lower().split())}"
     
     async def execute(self, query: str, lookup_type: str = "conditions") -> Dict[str, Any]:
-        """Execute medical lookup."""
+        """Execute medical lookup.
+
+        The local index answers first; the remote API is only queried on an
+        index miss, and only when remote fallback is enabled.
+        """
+        if self.index is not None and lookup_type in KINDS:
+            results = self.index.search(lookup_type, query)
+            metrics.record_cache("medical_index", "hit" if results else "miss")
+            if results or not self.remote_fallback:
+                return {
+                    "success": True,
+                    "results": results,
+                    "query": query,
+                    "type": lookup_type,
+                    "source": "local_index",
+                }
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                if lookup_type == "conditions":
-                    url = f"{self.base_url}/conditions/v3/search"
-                    params = {"terms": query, "maxList": 5}
-                elif lookup_type == "drugs":
-                    url = f"{self.base_url}/rxterms/v3/search"
-                    params = {"terms": query, "maxList": 5}
-                else:
-                    return {"error": "Invalid lookup_type"}
+            if lookup_type == "conditions":
+                url = f"{self.base_url}/conditions/v3/search"
+                params = {"terms": query, "maxList": 5}
+            elif lookup_type == "drugs":
+                url = f"{self.base_url}/rxterms/v3/search"
+                params = {"terms": query, "maxList": 5}
+            else:
+                return {"error": "Invalid lookup_type"}
+            
+            response = await self.http.client.get(url, params=params, timeout=5.0)
+            if response.status_code == 200:
+                data = response.json()
+                # Handle different API response formats
+                results = []
+                if isinstance(data, list) and len(data) > 3:
+                    results = data[3][:5] if data[3] else []
+                elif isinstance(data, dict):
+                    results = data.get("results", [])[:5]
                 
-                response = await client.get(url, params=params)
-                if response.status_code == 200:
-                    data = response.json()
-                    # Handle different API response formats
-                    results = []
-                    if isinstance(data, list) and len(data) > 3:
-                        results = data[3][:5] if data[3] else []
-                    elif isinstance(data, dict):
-                        results = data.get("results", [])[:5]
-                    
-                    return {
-                        "success": True,
-                        "results": results,
-                        "query": query,
-                        "type": lookup_type
-                    }
-                else:
-                    return {"error": f"API returned {response.status_code}"}
+                return {
+                    "success": True,
+                    "results": results,
+                    "query": query,
+                    "type": lookup_type
+                }
+            else:
+                return {"error": f"API returned {response.status_code}"}
         except Exception as e:
             self.logger.error(f"Medical lookup failed: {e}")
-            # Return mock data as fallback
-            return {
-                "success": True,
-                "results": [f"General information about {query}"],
-                "query": query,
-                "type": lookup_type,
-                "fallback": True
-            }
+            return self.fallback(query, lookup_type)
+    
+    def fallback(self, query: str, lookup_type: str = "conditions") -> Dict[str, Any]:
+        """Answer offline: local index matches, else generic mock data."""
+        results = []
+        if self.index is not None and lookup_type in KINDS:
+            results = self.index.search(lookup_type, query)
+        return {
+            "success": True,
+            "results": results or [f"General information about {query}"],
+            "query": query,
+            "type": lookup_type,
+            "fallback": True
+        }
 
 
 class GoogleSearchTool(BaseTool):
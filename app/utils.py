@@ -2,7 +2,20 @@ from __future__ import annotations
 
 import json
 import logging
-from typing import Any, Dict
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# orjson's decode error subclasses ValueError, like json.JSONDecodeError
+_json_loads = orjson.loads if orjson is not None else json.loads
 
 
 def configure_logging(level: str = "INFO") -> logging.Logger:
@@ -23,18 +36,137 @@ def configure_logging(level: str = "INFO") -> logging.Logger:
 def safe_json_loads(payload: str) -> Dict[str, Any]:
     """Attempt to parse JSON even if surrounded by prose."""
 
-    payload = payload.strip()
-    if not payload:
-        return {}
+    return extract_json_object(payload) or {}
+
+
+def extract_json_object(payload: str) -> Optional[Dict[str, Any]]:
+    """Return the JSON object in LLM output, or ``None`` if there is none.
+
+    Handles, cheapest first: a bare object, an object inside a Markdown code
+    fence (closed or not), an object surrounded by prose that itself contains
+    braces (found by balanced-brace scanning), and an object whose tail was
+    truncated mid-string or mid-value (repaired by closing open strings and
+    containers, dropping the incomplete member if needed).
+    """
+
+    text = payload.strip()
+    if not text:
+        return None
+    if text[0] == "{":
+        obj = _loads_object(text)
+        if obj is not None:
+            return obj
+    fence = _FENCE_RE.search(text)
+    if fence is not None:
+        obj = _scan_objects(fence.group(1))
+        if obj is not None:
+            return obj
+    return _scan_objects(text)
+
+
+def parse_model_output(payload: str, model: Type[ModelT]) -> Optional[ModelT]:
+    """Extract the JSON object from LLM output and validate it against ``model``."""
+
+    obj = extract_json_object(payload)
+    if obj is None:
+        return None
+    try:
+        return model.model_validate(obj)
+    except ValidationError:
+        return None
+
+
+_FENCE_RE = re.compile(r"```[\w-]*[ \t]*\n?(.*?)(?:```|\Z)", re.DOTALL)
+# Characters that change scanner state; everything else is skipped in bulk
+_STRUCTURAL_RE = re.compile(r'["\\{}\[\],]')
+# Incomplete members tried when repairing a truncated object, newest first
+_MAX_REPAIR_CUTS = 3
 
-    if payload[0] != "{":
-        first_brace = payload.find("{")
-        last_brace = payload.rfind("}")
-        if first_brace != -1 and last_brace != -1:
-            payload = payload[first_brace : last_brace + 1]
 
+def _loads_object(text: str) -> Optional[Dict[str, Any]]:
     try:
-        return json.loads(payload)
-    except json.JSONDecodeError:
-        return {}
+        obj = _json_loads(text)
+    except ValueError:
+        return None
+    return obj if isinstance(obj, dict) else None
+
+
+def _scan_objects(text: str) -> Optional[Dict[str, Any]]:
+    start = text.find("{")
+    while start != -1:
+        obj, end = _scan_object(text, start)
+        if obj is not None:
+            return obj
+        start = text.find("{", end + 1)
+    return None
+
+
+def _scan_object(text: str, start: int) -> Tuple[Optional[Dict[str, Any]], int]:
+    """Parse the balanced object opening at ``start``; returns it and where it ended."""
+
+    stack: List[str] = []
+    cuts: List[Tuple[int, str]] = []
+    in_string = False
+    escaped_at = -1
+    for match in _STRUCTURAL_RE.finditer(text, start):
+        char, pos = match.group(), match.start()
+        if in_string:
+            if pos == escaped_at:
+                continue
+            if char == "\\":
+                escaped_at = pos + 1
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            if not stack or stack.pop() != char:
+                return None, pos
+            if not stack:
+                return _loads_object(text[start : pos + 1]), pos
+        elif char == ",":
+            cuts.append((pos, "".join(reversed(stack))))
+
+    # Ran out of text with containers still open: the output was truncated
+    closers = "".join(reversed(stack))
+    obj = _loads_object(text[start:] + ('"' if in_string else "") + closers)
+    for cut, cut_closers in reversed(cuts[-_MAX_REPAIR_CUTS:]):
+        if obj is not None:
+            break
+        obj = _loads_object(text[start:cut] + cut_closers)
+    return obj, len(text)
+
+
+class PartialJSONFieldParser:
+    """Pull completed top-level string fields out of a JSON object as it streams in.
+
+    ``feed`` accepts the next chunk of model output and returns the
+    ``(name, value)`` pairs whose closing quote has now arrived. Each field is
+    reported at most once.
+    """
+
+    def __init__(self, fields: Iterable[str]) -> None:
+        self._pending = set(fields)
+        self._buffer = ""
+        self._patterns = {
+            name: re.compile(r'"%s"\s*:\s*"((?:[^"\\]|\\.)*)"' % re.escape(name))
+            for name in self._pending
+        }
 
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        self._buffer += chunk
+        completed = []
+        for name in list(self._pending):
+            match = self._patterns[name].search(self._buffer)
+            if match is None:
+                continue
+            try:
+                value = json.loads(f'"{match.group(1)}"')
+            except json.JSONDecodeError:
+                continue
+            self._pending.discard(name)
+            completed.append((match.start(), name, value))
+        return [(name, value) for _, name, value in sorted(completed)]
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Offline load test of the full ``/triage`` endpoint.
+
+Run with ``python benchmarks/bench_app_load.py`` to drive the app against the
+synthetic ``stub`` backend, or replay real upstream behaviour recorded with
+``LLM_BACKEND=record``::
+
+    python benchmarks/bench_app_load.py --cassette cassettes/triage.jsonl.gz
+
+Requests go through the ASGI app in-process (httpx ``ASGITransport``) and
+are persisted to a throwaway SQLite database. The external medical lookup is
+replaced by an instant local tool so results do not depend on the network.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+SYMPTOMS = [
+    "mild headache after working late",
+    "dry cough for three days",
+    "itchy rash on my forearm",
+    "sore knee after running",
+    "fainting spell this morning",
+    "runny nose and sneezing",
+]
+
+
+def configure(args: argparse.Namespace) -> None:
+    """Set the environment before the app (and its settings) are imported."""
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/load.db"
+    os.environ["LLM_CACHE_ENABLED"] = "false"
+    os.environ["LLM_BACKEND"] = "replay" if args.cassette else "stub"
+    if args.cassette:
+        os.environ["LLM_CASSETTE_PATH"] = args.cassette
+    if args.latency:
+        os.environ["LLM_STUB_LATENCY"] = args.latency
+    os.environ["LLM_STUB_ERROR_RATE"] = str(args.error_rate)
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+async def run(args: argparse.Namespace) -> None:
+    import httpx
+
+    from app.db.db import init_db
+    from app.main import app, triage_agent
+    from app.observability.metrics import metrics
+    from app.tools.base import BaseTool
+
+    class LocalLookup(BaseTool):
+        def __init__(self) -> None:
+            super().__init__(name="medical_lookup", description="Offline stand-in")
+
+        async def execute(self, query: str, lookup_type: str = "conditions") -> dict:
+            return {"success": True, "results": [], "query": query, "type": lookup_type}
+
+    init_db()
+    triage_agent.tool_manager.register_tool(LocalLookup())
+    gate = asyncio.Semaphore(args.concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def one(i: int) -> None:
+            async with gate:
+                started = time.perf_counter()
+                resp = await client.post(
+                    "/triage",
+                    json={"user_id": f"load-{i % 100}", "symptoms": SYMPTOMS[i % len(SYMPTOMS)]},
+                )
+                metrics.observe("bench_triage_seconds", time.perf_counter() - started)
+                metrics.counters[f"bench_status_{resp.status_code}"] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - started
+
+    print(f"backend={os.environ['LLM_BACKEND']} requests={args.requests} concurrency={args.concurrency}")
+    print(f"throughput: {args.requests / elapsed:.1f} req/s")
+    for pct in (50, 95, 99):
+        print(f"p{pct}: {metrics.percentile('bench_triage_seconds', pct) * 1e3:.1f} ms")
+    statuses = {k: v for k, v in metrics.counters.items() if k.startswith("bench_status_")}
+    fallbacks = {k: v for k, v in metrics.counters.items() if k.startswith("llm_fallback_")}
+    print(f"statuses: {statuses}")
+    print(f"fallbacks: {fallbacks}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline /triage load test.")
+    parser.add_argument("--cassette", help="Replay this cassette instead of the stub backend.")
+    parser.add_argument("--latency", help="Latency spec, e.g. lognormal:0.8,0.4 (overrides recorded).")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    configure(args)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
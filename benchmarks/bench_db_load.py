@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""Concurrent throughput of sync vs async database access on the event loop.
+
+Each simulated request does what ``/health-assessment`` and ``/triage`` do
+against the database: read the user's recent history (``MemoryBank``), wait
+on an upstream call, then persist a ``SymptomEvent``. ``sync`` runs the
+queries with the blocking ``Session`` inside the coroutine, as the handlers
+used to; ``async`` goes through ``AsyncDatabase``. Both use the app's SQLite
+tuning (WAL, ``synchronous=NORMAL``). A heartbeat task measures how long the
+event loop is stalled::
+
+    python benchmarks/bench_db_load.py --requests 1000 --concurrency 100
+
+With SQLite the work is CPU-bound in one process: ``async`` adds a thread
+hop per statement and cannot run queries in parallel, so at saturation it
+trails ``sync`` on throughput (and so on p50). What it buys is the loop lag
+column: with ``sync`` every other request on the worker, health checks and
+SSE streams included, waits out each query. The last line prints both sides
+of that trade-off.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlmodel import Session, SQLModel, create_engine, select  # noqa: E402
+
+from app.db.db import AsyncDatabase, async_session_scope, tune_sqlite  # noqa: E402
+from app.db.models import MedicationCheck, SymptomEvent, User  # noqa: E402
+from app.observability.metrics import metrics  # noqa: E402
+
+USERS = 200
+
+
+def event(user_id: str, days_ago: float) -> SymptomEvent:
+    return SymptomEvent(
+        user_id=user_id,
+        symptoms="dry cough and mild fever",
+        category="respiratory",
+        urgency="low",
+        recommended_action="rest and fluids",
+        reasoning="benchmark",
+        red_flags=[],
+        created_at=datetime.utcnow() - timedelta(days=days_ago),
+    )
+
+
+def seed(url: str, rows: int) -> None:
+    engine = create_engine(url)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(User(user_id=f"user-{i}") for i in range(USERS))
+        session.add_all(event(f"user-{i % USERS}", (i % 90) / 2) for i in range(rows))
+        session.commit()
+    engine.dispose()
+
+
+def history_queries(user_id: str):
+    cutoff = datetime.utcnow() - timedelta(days=30)
+    return (
+        select(SymptomEvent)
+        .where(SymptomEvent.user_id == user_id)
+        .where(SymptomEvent.created_at >= cutoff)
+        .order_by(SymptomEvent.created_at.desc()),
+        select(MedicationCheck)
+        .where(MedicationCheck.user_id == user_id)
+        .where(MedicationCheck.created_at >= cutoff)
+        .order_by(MedicationCheck.created_at.desc()),
+    )
+
+
+async def sync_request(engine, user_id: str, upstream: float) -> None:
+    with Session(engine) as session:
+        for query in history_queries(user_id):
+            session.exec(query).all()
+    await asyncio.sleep(upstream)
+    with Session(engine) as session:
+        session.add(event(user_id, 0))
+        session.commit()
+
+
+async def async_request(database: AsyncDatabase, user_id: str, upstream: float) -> None:
+    async with async_session_scope(database) as session:
+        for query in history_queries(user_id):
+            (await session.exec(query)).all()
+    await asyncio.sleep(upstream)
+    async with async_session_scope(database) as session:
+        session.add(event(user_id, 0))
+
+
+async def heartbeat(stop: asyncio.Event, name: str, interval: float = 0.005) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        metrics.observe(name, time.perf_counter() - started - interval)
+
+
+async def run(mode: str, url: str, args: argparse.Namespace) -> Dict[str, float]:
+    if mode == "sync":
+        engine = tune_sqlite(create_engine(url))
+        request = lambda user_id: sync_request(engine, user_id, args.upstream)  # noqa: E731
+    else:
+        database = AsyncDatabase(url, pool_size=args.pool_size)
+        request = lambda user_id: async_request(database, user_id, args.upstream)  # noqa: E731
+
+    gate = asyncio.Semaphore(args.concurrency)
+    stop = asyncio.Event()
+    lag = f"bench_{mode}_loop_lag_seconds"
+    latency = f"bench_{mode}_request_seconds"
+    monitor = asyncio.ensure_future(heartbeat(stop, lag))
+
+    async def one(i: int) -> None:
+        async with gate:
+            started = time.perf_counter()
+            await request(f"user-{i % USERS}")
+            metrics.observe(latency, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await monitor
+    if mode == "sync":
+        engine.dispose()
+    else:
+        await database.dispose()
+
+    stats = {
+        "throughput": args.requests / elapsed,
+        "p50": metrics.percentile(latency, 50),
+        "p99": metrics.percentile(latency, 99),
+        "lag_p99": metrics.percentile(lag, 99),
+        "lag_max": max(metrics.histograms[lag], default=0),
+    }
+    print(
+        f"{mode:>5}: {stats['throughput']:7.1f} req/s"
+        f"  p50 {stats['p50'] * 1e3:6.1f} ms"
+        f"  p99 {stats['p99'] * 1e3:6.1f} ms"
+        f"  loop lag p99 {stats['lag_p99'] * 1e3:6.1f} ms"
+        f"  max {stats['lag_max'] * 1e3:6.1f} ms"
+    )
+    return stats
+
+
+def change(before: float, after: float) -> str:
+    return f"{(after - before) / before:+.0%}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sync vs async database load test.")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--rows", type=int, default=20000, help="Seeded symptom events.")
+    parser.add_argument("--upstream", type=float, default=0.02, help="Simulated upstream wait (s).")
+    parser.add_argument("--mode", choices=("sync", "async", "both"), default="both")
+    parser.add_argument(
+        "--pool-size", type=int, default=None, help="Async pool size (default: DATABASE_POOL_SIZE)."
+    )
+    args = parser.parse_args()
+
+    print(f"requests={args.requests} concurrency={args.concurrency} rows={args.rows}")
+    results = {}
+    for mode in ("sync", "async") if args.mode == "both" else (args.mode,):
+        url = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+        seed(url, args.rows)
+        results[mode] = asyncio.run(run(mode, url, args))
+
+    if len(results) == 2:
+        sync, async_ = results["sync"], results["async"]
+        print(
+            f"async vs sync: throughput {change(sync['throughput'], async_['throughput'])}"
+            f", p50 {change(sync['p50'], async_['p50'])}"
+            f", loop lag p99 {change(sync['lag_p99'], async_['lag_p99'])}"
+            f" ({sync['lag_p99'] * 1e3:.0f} -> {async_['lag_p99'] * 1e3:.0f} ms)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Throughput of the LLM fallback heuristic: precompiled rules vs. prompt scanning.
+
+Run with ``python benchmarks/bench_fallback.py``. The legacy column re-creates
+the old behaviour (lowercase the whole rendered prompt, loop over emergency
+terms, one ``re.search`` per category); the compiled column is what
+``LLMClient`` now runs on the structured fields during an outage.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.prompts import TRIAGE_PROMPT_TEMPLATE  # noqa: E402
+from app.rules.fallback import render_fallback  # noqa: E402
+from app.rules.packs import rule_registry  # noqa: E402
+
+REQUESTS = [
+    ("mild headache and some nausea", "after working late"),
+    ("itchy rash on both arms", None),
+    ("dry cough for three days", "smoker"),
+    ("sore knee after running", "no prior injuries"),
+    ("severe headache and blurred vision", "history of migraines"),
+]
+
+CRITICAL_TERMS = ["chest pain", "trouble breathing", "suicidal", "stroke", "bleeding", "severe headache"]
+
+
+def legacy(prompt: str) -> str:
+    lower_prompt = prompt.lower()
+    category, urgency, action = "general", "moderate", "primary_care"
+    for term in CRITICAL_TERMS:
+        if term in lower_prompt:
+            category, urgency, action = "emergency", "high", "go_to_er"
+            break
+    if "rash" in lower_prompt:
+        category = "dermatological"
+    elif re.search(r"headache|vision|dizzy", lower_prompt):
+        category = "neurological"
+    elif re.search(r"breath|cough|lung", lower_prompt):
+        category = "respiratory"
+    return json.dumps(
+        {
+            "category": category,
+            "urgency": urgency,
+            "recommended_action": action,
+            "red_flags": [],
+            "reasoning": "Fallback.",
+        }
+    )
+
+
+def main() -> None:
+    rules = rule_registry.current.fallback
+    prompts = [
+        TRIAGE_PROMPT_TEMPLATE.format(
+            user_id="bench",
+            symptoms=s,
+            context=c or "None provided",
+            history="None",
+            medical_context="None",
+        )
+        for s, c in REQUESTS
+    ]
+
+    def run_legacy() -> None:
+        for prompt in prompts:
+            legacy(prompt)
+
+    def run_compiled() -> None:
+        for symptoms, context in REQUESTS:
+            render_fallback(*rules.classify(symptoms, context), "Fallback.")
+
+    rounds = 20000
+    for name, fn in (("legacy", run_legacy), ("compiled", run_compiled)):
+        seconds = timeit.timeit(fn, number=rounds)
+        per_second = rounds * len(REQUESTS) / seconds
+        print(f"{name:>9}: {per_second:>12,.0f} requests/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Offline benchmark: LLM latency with and without request hedging.
+
+Run with ``python benchmarks/bench_hedging.py [--latency tail:0.05,1.0,0.02,0.2]``.
+Both runs drive the same stub-model latency distribution through
+``LLMClient.complete``; hedged p99 should drop sharply while the hedge rate
+stays within the configured budget.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.agents.llm_cache import LLMResponseCache  # noqa: E402
+from app.agents.llm_client import LLMClient  # noqa: E402
+from app.agents.stub_model import StubModel, latency_distribution  # noqa: E402
+from app.config import Settings  # noqa: E402
+from app.observability.metrics import metrics  # noqa: E402
+
+
+async def run(args: argparse.Namespace, hedged: bool) -> dict:
+    metrics.histograms.clear()
+    for name in ("llm_hedge_requests", "llm_hedge_sent", "llm_hedge_won"):
+        metrics.counters[name] = 0
+    settings = Settings(
+        gemini_api_key=None,
+        llm_cache_enabled=False,
+        # Leave headroom in the gate so hedges are not queued behind primaries
+        llm_max_concurrency=args.concurrency * 2,
+        llm_hedge_enabled=hedged,
+        llm_hedge_budget=args.budget,
+        llm_breaker_slow_call_seconds=60,
+    )
+    model = StubModel(latency=latency_distribution(args.latency), seed=args.seed)
+    client = LLMClient(settings, model=model, cache=LLMResponseCache())
+    gate = asyncio.Semaphore(args.concurrency)
+
+    async def one(i: int) -> None:
+        async with gate:
+            started = time.perf_counter()
+            await client.complete(f"request {i}")
+            metrics.observe("bench_request_seconds", time.perf_counter() - started)
+
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    await asyncio.gather(*client._draining, return_exceptions=True)
+    return {
+        "p50": metrics.percentile("bench_request_seconds", 50),
+        "p95": metrics.percentile("bench_request_seconds", 95),
+        "p99": metrics.percentile("bench_request_seconds", 99),
+        "hedge_rate": metrics.gauges.get("llm_hedge_rate", 0.0) if hedged else 0.0,
+        "upstream_calls": model.calls,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark hedged LLM requests.")
+    parser.add_argument("--latency", default="tail:0.05,1.0,0.02,0.2", help="Stub latency spec.")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--budget", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'mode':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'hedge %':>8} {'calls':>7}")
+    for hedged in (False, True):
+        stats = asyncio.run(run(args, hedged))
+        print(
+            f"{'hedged' if hedged else 'baseline':>9} {stats['p50'] * 1e3:>8.1f} "
+            f"{stats['p95'] * 1e3:>8.1f} {stats['p99'] * 1e3:>8.1f} "
+            f"{stats['hedge_rate'] * 100:>8.2f} {stats['upstream_calls']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Microbenchmark: compiled red-flag matcher vs. per-phrase substring scans.
+
+Run with ``python benchmarks/bench_red_flags.py``. The automaton's cost should
+stay roughly flat as the rule set grows while the naive scan grows linearly.
+"""
+
+from __future__ import annotations
+
+import random
+import string
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.agents.triage import RedFlagEngine  # noqa: E402
+from app.rules.matcher import PhraseMatcher  # noqa: E402
+
+TEXT = (
+    "I have had a mild headache and some nausea since yesterday evening, "
+    "plus a dry cough and fatigue after working late. No fever so far but "
+    "my back is sore and I feel a bit dizzy when standing up quickly."
+)
+
+
+def synthetic_phrases(count: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    base = list(RedFlagEngine().critical_phrases)
+    while len(base) < count:
+        words = [
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+            for _ in range(rng.randint(1, 4))
+        ]
+        base.append(" ".join(words))
+    return base[:count]
+
+
+def naive(phrases: list[str], text: str) -> list[str]:
+    lowered = text.lower()
+    return [p for p in phrases if p in lowered]
+
+
+def main() -> None:
+    print(f"{'phrases':>8} {'naive us/call':>14} {'automaton us/call':>18}")
+    for count in (35, 350, 3500, 10000):
+        phrases = synthetic_phrases(count)
+        matcher = PhraseMatcher({"critical": phrases})
+        runs = 2000
+        naive_us = timeit.timeit(lambda: naive(phrases, TEXT), number=runs) / runs * 1e6
+        fast_us = timeit.timeit(lambda: matcher.match(TEXT), number=runs) / runs * 1e6
+        print(f"{count:>8} {naive_us:>14.1f} {fast_us:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
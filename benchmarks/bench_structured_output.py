@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Structured-output extraction over the recorded Gemini output corpus.
+
+Run with ``python benchmarks/bench_structured_output.py``. Compares the old
+first-brace/last-brace slice + ``json.loads`` against ``parse_model_output``
+on success rate and per-output cost; the corpus lives in
+``tests/fixtures/gemini_outputs.jsonl``.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.schemas import TriageLLMOutput  # noqa: E402
+from app.utils import orjson, parse_model_output  # noqa: E402
+
+CORPUS = Path(__file__).resolve().parents[1] / "tests" / "fixtures" / "gemini_outputs.jsonl"
+
+
+def legacy(payload: str) -> dict:
+    payload = payload.strip()
+    if not payload:
+        return {}
+    if payload[0] != "{":
+        first_brace = payload.find("{")
+        last_brace = payload.rfind("}")
+        if first_brace != -1 and last_brace != -1:
+            payload = payload[first_brace : last_brace + 1]
+    try:
+        return json.loads(payload)
+    except json.JSONDecodeError:
+        return {}
+
+
+def main() -> None:
+    records = [json.loads(line) for line in CORPUS.read_text().splitlines()]
+    parseable = [r for r in records if r["expected"] is not None]
+    outputs = [r["output"] for r in records]
+
+    legacy_ok = sum(
+        bool(legacy(r["output"])) and isinstance(legacy(r["output"]), dict) for r in parseable
+    )
+    new_ok = sum(
+        parse_model_output(r["output"], TriageLLMOutput) == TriageLLMOutput(**r["expected"])
+        for r in parseable
+    )
+
+    runs = 2000
+    legacy_us = timeit.timeit(lambda: [legacy(o) for o in outputs], number=runs) / runs / len(outputs) * 1e6
+    new_us = timeit.timeit(
+        lambda: [parse_model_output(o, TriageLLMOutput) for o in outputs], number=runs
+    ) / runs / len(outputs) * 1e6
+
+    print(f"corpus: {len(records)} outputs, {len(parseable)} parseable, orjson={'yes' if orjson else 'no'}")
+    print(f"{'parser':>10} {'recovered':>10} {'us/output':>10}")
+    print(f"{'legacy':>10} {legacy_ok:>6}/{len(parseable):<3} {legacy_us:>10.1f}")
+    print(f"{'extractor':>10} {new_ok:>6}/{len(parseable):<3} {new_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import os
+import tempfile
+
+import pytest
+
+# Settings read the environment at import, so this must run before any test
+# imports the app: startup migrations and request handlers would otherwise
+# write to the checked-in medassist.db
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+
+
+@pytest.fixture(autouse=True, scope="session")
+def database_schema():
+    """Migrate the throwaway database, as app startup would."""
+
+    from app.db.db import init_db
+
+    init_db()
+
+
+@pytest.fixture(autouse=True)
+async def close_shared_pools():
+    """Close the app-wide HTTP client and database engine on the test's own loop.
+
+    Each test runs on a fresh event loop, and pooled connections cannot
+    outlive the loop that opened them.
+    """
+
+    yield
+    from app.db.db import async_db
+    from app.tools.http_pool import http_pool
+
+    await http_pool.aclose()
+    await async_db.dispose()
+
+
+@pytest.fixture
+def make_client():
+    """Build an ``LLMClient`` over stub models, with settings overrides.
+
+    ``make_client(model, llm_cache_enabled=False)`` wraps one model;
+    ``make_client(models=[("flash", a), ("pro", b)])`` sets up routing tiers.
+    """
+
+    from app.agents.llm_cache import LLMResponseCache
+    from app.agents.llm_client import LLMClient
+    from app.agents.stub_model import StubModel
+    from app.config import Settings
+
+    def build(model=None, models=None, cache=None, **overrides):
+        settings = Settings(**{"gemini_api_key": None, **overrides})
+        if models is None:
+            model = model or StubModel()
+        return LLMClient(settings, model=model, models=models, cache=cache or LLMResponseCache())
+
+    return build
+
+
+@pytest.fixture
+def no_context(monkeypatch):
+    """Skip the medical lookup tools so triage prompts carry no context."""
+
+    from app.agents.triage import TriageAgent
+
+    async def gather(self, request):
+        return "None"
+
+    monkeypatch.setattr(TriageAgent, "_gather_medical_context", gather)
@@ -0,0 +1,117 @@
+"""Minimal MCP server used by the session tests.
+
+Imported, it exposes ``app``: an ASGI streamable-HTTP endpoint. Run as a
+script, it serves the same methods over newline-delimited stdio.
+"""
+
+import itertools
+import json
+import sys
+
+TOOLS = [
+    {"name": "drug_database", "description": "Query drug database"},
+    {"name": "medical_guidelines", "description": "Clinical practice guidelines"},
+    {"name": "icd_codes", "description": "ICD-10 code lookup"},
+]
+PAGE_SIZE = 2
+
+state = {"tools_list_calls": 0, "posts": 0, "extra_tools": []}
+_sessions = itertools.count(1)
+
+
+def handle(message):
+    """Return ``(reply or None, notifications)`` for one JSON-RPC message."""
+
+    if "id" not in message:
+        return None, []
+    method, params = message["method"], message.get("params") or {}
+    notifications = []
+    if method == "initialize":
+        result = {
+            "protocolVersion": params["protocolVersion"],
+            "capabilities": {"tools": {"listChanged": True}},
+            "serverInfo": {"name": "stub", "version": "1"},
+        }
+    elif method == "tools/list":
+        state["tools_list_calls"] += 1
+        tools = TOOLS + state["extra_tools"]
+        start = int(params.get("cursor") or 0)
+        result = {"tools": tools[start:start + PAGE_SIZE]}
+        if start + PAGE_SIZE < len(tools):
+            result["nextCursor"] = str(start + PAGE_SIZE)
+    elif method == "tools/call" and params["name"] == "register_tool":
+        state["extra_tools"].append({"name": params["arguments"]["name"], "description": "added"})
+        notifications.append({"jsonrpc": "2.0", "method": "notifications/tools/list_changed"})
+        result = {"content": [{"type": "text", "text": "registered"}]}
+    elif method == "tools/call" and params["name"] in {tool["name"] for tool in TOOLS}:
+        text = f"{params['name']}: {json.dumps(params.get('arguments', {}), sort_keys=True)}"
+        result = {"content": [{"type": "text", "text": text}]}
+    else:
+        error = {"code": -32602, "message": f"Unknown tool or method: {params.get('name', method)}"}
+        return {"jsonrpc": "2.0", "id": message["id"], "error": error}, notifications
+    return {"jsonrpc": "2.0", "id": message["id"], "result": result}, notifications
+
+
+def handle_payload(payload):
+    messages = payload if isinstance(payload, list) else [payload]
+    replies, notifications = [], []
+    for message in messages:
+        reply, sent = handle(message)
+        notifications.extend(sent)
+        if reply is not None:
+            replies.append(reply)
+    return replies, notifications
+
+
+async def app(scope, receive, send):
+    body = b""
+    while True:
+        event = await receive()
+        body += event.get("body", b"")
+        if not event.get("more_body"):
+            break
+    headers = dict(scope["headers"])
+    session_id = headers.get(b"mcp-session-id", b"").decode()
+    if scope["method"] == "DELETE":
+        await _respond(send, 200, b"", [])
+        return
+
+    state["posts"] += 1
+    payload = json.loads(body)
+    replies, notifications = handle_payload(payload)
+    extra = [] if session_id else [(b"mcp-session-id", f"s{next(_sessions)}".encode())]
+    if not replies and not notifications:
+        await _respond(send, 202, b"", extra)
+    elif notifications:
+        # Server-initiated messages ride along on an SSE stream
+        events = notifications + [replies if isinstance(payload, list) else replies[0]]
+        body = "".join(f"event: message\ndata: {json.dumps(event)}\n\n" for event in events)
+        await _respond(send, 200, body.encode(), extra + [(b"content-type", b"text/event-stream")])
+    else:
+        reply = replies if isinstance(payload, list) else replies[0]
+        await _respond(
+            send, 200, json.dumps(reply).encode(), extra + [(b"content-type", b"application/json")]
+        )
+
+
+async def _respond(send, status, body, headers):
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+def main():
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        payload = json.loads(line)
+        replies, notifications = handle_payload(payload)
+        for notification in notifications:
+            sys.stdout.write(json.dumps(notification) + "\n")
+        if replies:
+            reply = replies if isinstance(payload, list) else replies[0]
+            sys.stdout.write(json.dumps(reply) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
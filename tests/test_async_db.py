@@ -0,0 +1,107 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import select
+
+from app.db.db import AsyncDatabase, async_database_url, async_session_scope
+from app.db.models import SymptomEvent, User
+from app.memory.memory_bank import MemoryBank
+
+
+@pytest.fixture
+async def database(tmp_path):
+    database = AsyncDatabase(f"sqlite:///{tmp_path / 'async.db'}")
+    await database.create_all()
+    yield database
+    await database.dispose()
+
+
+def symptom(user_id, symptoms, category, days_ago=0):
+    return SymptomEvent(
+        user_id=user_id,
+        symptoms=symptoms,
+        category=category,
+        urgency="low",
+        recommended_action="rest",
+        reasoning="test",
+        red_flags=[],
+        created_at=datetime.utcnow() - timedelta(days=days_ago),
+    )
+
+
+def test_async_database_url():
+    assert async_database_url("sqlite:///./medassist.db") == "sqlite+aiosqlite:///./medassist.db"
+    assert async_database_url("postgresql://u:p@db/medassist") == "postgresql+asyncpg://u:p@db/medassist"
+    assert async_database_url("sqlite+aiosqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+
+
+@pytest.mark.asyncio
+async def test_session_scope_commits_and_rolls_back(database):
+    async with async_session_scope(database) as session:
+        session.add(User(user_id="u1"))
+
+    with pytest.raises(RuntimeError):
+        async with async_session_scope(database) as session:
+            session.add(User(user_id="u2"))
+            raise RuntimeError("abort")
+
+    async with async_session_scope(database) as session:
+        users = (await session.exec(select(User.user_id))).all()
+    assert users == ["u1"]
+
+
+@pytest.mark.asyncio
+async def test_memory_bank_reads_history_without_blocking_the_loop(database):
+    async with async_session_scope(database) as session:
+        session.add(User(user_id="u1"))
+        session.add(symptom("u1", "dry cough at night", "respiratory", days_ago=2))
+        session.add(symptom("u1", "sore knee", "musculoskeletal", days_ago=40))
+    bank = MemoryBank(database=database)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0)
+
+    task = asyncio.ensure_future(ticker())
+    summary, history = await asyncio.gather(
+        bank.get_user_health_summary("u1"), bank.get_contextual_history("u1", "cough again")
+    )
+    task.cancel()
+
+    assert ticks > 1  # the loop kept running while the queries were in flight
+    assert summary["symptom_events"] == 1
+    assert summary["recent_categories"] == ["respiratory"]
+    assert history.startswith("Similar symptoms on") and "respiratory" in history
+
+
+@pytest.mark.asyncio
+async def test_sqlite_connections_use_wal(database):
+    async with database.engine.connect() as connection:
+        journal = (await connection.exec_driver_sql("PRAGMA journal_mode")).scalar()
+        synchronous = (await connection.exec_driver_sql("PRAGMA synchronous")).scalar()
+
+    assert journal == "wal"
+    assert synchronous == 1  # NORMAL
+
+
+def test_disposed_engine_is_recreated_on_next_use(tmp_path):
+    database = AsyncDatabase(f"sqlite:///{tmp_path / 'loops.db'}")
+
+    async def count_users():
+        await database.create_all()
+        async with async_session_scope(database) as session:
+            count = len((await session.exec(select(User))).all())
+        engine = database.engine
+        await database.dispose()
+        return count, engine
+
+    # A script or test running its own loop disposes before the loop ends
+    first, engine = asyncio.run(count_users())
+    second, other = asyncio.run(count_users())
+
+    assert first == second == 0
+    assert engine is not other
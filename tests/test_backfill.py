@@ -0,0 +1,70 @@
+import io
+import json
+
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.db.models import SymptomEvent, User
+from app.rules.backfill import run_backfill
+
+
+def seed(engine):
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(User(user_id="hist-user"))
+        texts = ["chest pain at night", "blue lips and fainting", "mild cough", "fainting spell"]
+        for text in texts:
+            session.add(
+                SymptomEvent(
+                    user_id="hist-user",
+                    symptoms=text,
+                    category="general",
+                    urgency="moderate",
+                    recommended_action="primary_care",
+                    reasoning="seed",
+                )
+            )
+        session.commit()
+
+
+def write_pack(path, version, critical, urgent):
+    path.write_text(json.dumps({"version": version, "critical": critical, "urgent": urgent}))
+
+
+def run(tmp_path, workers):
+    engine = create_engine(f"sqlite:///{tmp_path / 'history.db'}")
+    seed(engine)
+    old_path, new_path = tmp_path / "old.json", tmp_path / "new.json"
+    write_pack(old_path, "v1", {"chest pain": "Cardiac."}, {"fainting": "Syncope."})
+    write_pack(new_path, "v2", {"chest pain": "Cardiac.", "blue lips": "Hypoxia."}, {})
+    report = io.StringIO()
+
+    summary = run_backfill(engine, str(old_path), str(new_path), report, chunk_size=3, workers=workers)
+    return summary, [json.loads(line) for line in report.getvalue().splitlines()]
+
+
+def test_backfill_reports_only_changed_rows(tmp_path):
+    summary, lines = run(tmp_path, workers=0)
+
+    assert lines[0] == {"old_version": "v1", "new_version": "v2"}
+    diffs = lines[1:-1]
+    assert [d["id"] for d in diffs] == [2, 4]
+    assert diffs[0]["critical_added"] == ["blue lips"]
+    assert diffs[0]["urgent_removed"] == ["fainting"]
+    assert diffs[1] == {
+        "id": 4,
+        "user_id": "hist-user",
+        "critical_added": [],
+        "critical_removed": [],
+        "urgent_added": [],
+        "urgent_removed": ["fainting"],
+    }
+    assert summary.rows_scanned == 4
+    assert summary.rows_changed == 2
+    assert lines[-1]["summary"]["last_id"] == 4
+
+
+def test_backfill_process_pool_matches_inline(tmp_path):
+    summary, lines = run(tmp_path, workers=2)
+
+    assert summary.rows_scanned == 4
+    assert [d["id"] for d in lines[1:-1]] == [2, 4]
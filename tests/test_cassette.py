@@ -0,0 +1,97 @@
+import json
+import time
+
+import pytest
+
+from app.agents.cassette import load_cassette, record_models
+from app.agents.llm_cache import LLMResponseCache
+from app.agents.llm_client import LLMClient
+from app.agents.stub_model import DEFAULT_RESPONSE, StubModel, fixed
+from app.config import Settings
+from app.observability.metrics import metrics
+
+
+def echo(prompt):
+    if "boom" in prompt:
+        raise RuntimeError("upstream exploded")
+    return json.dumps({"category": "general", "urgency": "low", "echo": prompt})
+
+
+class EchoModel(StubModel):
+    def _respond(self, prompt):
+        self.calls += 1
+        return super()._respond(echo(prompt))
+
+
+def settings(**overrides):
+    options = dict(gemini_api_key=None, gemini_model="flash", llm_cache_enabled=False, llm_max_attempts=1)
+    options.update(overrides)
+    return Settings(**options)
+
+
+@pytest.fixture
+def cassette(tmp_path):
+    path = tmp_path / "triage.jsonl.gz"
+    upstream = EchoModel(response=lambda prompt: prompt, latency=fixed(0.05))
+    recorder = LLMClient(settings(), models=record_models([("flash", upstream)], path), cache=LLMResponseCache())
+
+    async def record():
+        for prompt in ("mild headache", "dry cough", "boom"):
+            await recorder.complete(prompt)
+
+    return path, record
+
+
+@pytest.mark.asyncio
+async def test_record_then_replay_round_trip(cassette):
+    path, record = cassette
+    await record()
+
+    recorded = load_cassette(path)["flash"]
+    assert [bool(entry.get("e")) for entry in recorded] == [False, False, True]
+    assert all(entry["ms"] >= 50 for entry in recorded)
+
+    replay = LLMClient(settings(llm_backend="replay", llm_cassette_path=str(path)), cache=LLMResponseCache())
+    started = time.perf_counter()
+    text = await replay.complete("dry cough")
+    assert time.perf_counter() - started >= 0.04  # recorded latency is honoured
+    assert json.loads(text)["echo"] == "dry cough"
+
+    failed = json.loads(await replay.complete("boom"))
+    assert failed["reasoning"] == LLMClient.FALLBACK_REASONS["error"]
+
+
+@pytest.mark.asyncio
+async def test_unrecorded_prompts_and_synthetic_latency(cassette):
+    path, record = cassette
+    await record()
+    misses = metrics.counters["llm_replay_miss"]
+
+    replay = LLMClient(
+        settings(llm_backend="replay", llm_cassette_path=str(path), llm_stub_latency="fixed:0"),
+        cache=LLMResponseCache(),
+    )
+    started = time.perf_counter()
+    for i in range(5):
+        await replay.complete(f"never recorded {i}")
+
+    assert time.perf_counter() - started < 0.2
+    assert metrics.counters["llm_replay_miss"] == misses + 5
+
+
+@pytest.mark.asyncio
+async def test_stub_backend_with_error_injection():
+    ok = LLMClient(settings(llm_backend="stub", llm_stub_latency="fixed:0"), cache=LLMResponseCache())
+    assert await ok.complete("anything") == DEFAULT_RESPONSE
+
+    failing = LLMClient(
+        settings(llm_backend="stub", llm_stub_latency="fixed:0", llm_stub_error_rate=1.0),
+        cache=LLMResponseCache(),
+    )
+    result = json.loads(await failing.complete("anything"))
+    assert result["reasoning"] == LLMClient.FALLBACK_REASONS["error"]
+
+
+def test_replay_requires_cassette():
+    with pytest.raises(ValueError):
+        LLMClient(settings(llm_backend="replay"), cache=LLMResponseCache())
@@ -0,0 +1,58 @@
+import asyncio
+import json
+
+import pytest
+
+from app.agents.stub_model import StubModel
+from app.observability.metrics import metrics
+from app.resilience import CircuitBreaker
+
+BREAKER = dict(
+    llm_cache_enabled=False,
+    llm_max_attempts=1,
+    llm_breaker_min_calls=2,
+    llm_breaker_window=4,
+    llm_breaker_open_seconds=0.05,
+)
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_goes_straight_to_fallback_then_recovers(make_client):
+    model = StubModel(response='{"category": "general"}', error_rate=1.0)
+    client = make_client(model, **BREAKER)
+
+    for i in range(2):
+        await client.complete(f"failing prompt {i}")
+    assert client.breaker.state == CircuitBreaker.OPEN
+
+    short_circuited = metrics.counters["llm_fallback_circuit_open"]
+    result = json.loads(await client.complete("while open"))
+    assert model.calls == 2
+    assert "circuit breaker is open" in result["reasoning"]
+    assert metrics.counters["llm_fallback_circuit_open"] == short_circuited + 1
+
+    await asyncio.sleep(0.06)
+    model.error_rate = 0.0
+    assert client.breaker.state == CircuitBreaker.HALF_OPEN
+    assert await client.complete("probe") == '{"category": "general"}'
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_slow_calls_trip_and_failed_probe_reopens():
+    now = [0.0]
+    breaker = CircuitBreaker(
+        "unit", slow_call_seconds=1.0, slow_call_rate_threshold=0.5,
+        min_calls=2, open_seconds=10, clock=lambda: now[0],
+    )
+
+    breaker.record_success(2.0)
+    breaker.record_success(3.0)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+    now[0] = 11.0
+    assert breaker.allow_request()
+    # Only one probe is admitted while half-open
+    assert not breaker.allow_request()
+    breaker.record_failure(0.1)
+    assert breaker.state == CircuitBreaker.OPEN
@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.agents.llm_cache import LLMResponseCache
+from app.agents.llm_client import LLMClient
+from app.agents.stub_model import StubModel, fixed
+from app.agents.triage import TriageAgent
+from app.config import Settings
+from app.deadline import current_deadline, deadline_scope
+from app.schemas import TriageRequest
+from app.tools.base import BaseTool
+from app.tools.manager import ToolManager
+
+
+class SlowLookup(BaseTool):
+    def __init__(self, delay):
+        super().__init__(name="medical_lookup", description="slow stub")
+        self.delay = delay
+
+    async def execute(self, query, lookup_type="conditions"):
+        await asyncio.sleep(self.delay)
+        return {"success": True, "results": ["Migraine"]}
+
+
+class OfflineMCP(BaseTool):
+    def __init__(self):
+        super().__init__(name="mcp_client", description="no server")
+
+    async def execute(self, method, params=None):
+        return {"error": "MCP server unavailable"}
+
+
+def make_agent(tool_delay, llm_delay, **overrides):
+    settings = Settings(gemini_api_key=None, llm_cache_enabled=False, **overrides)
+    tools = ToolManager()
+    tools.register_tool(SlowLookup(tool_delay))
+    tools.register_tool(OfflineMCP())
+    llm = LLMClient(settings, model=StubModel(latency=fixed(llm_delay)), cache=LLMResponseCache())
+    agent = TriageAgent(llm_client=llm, tool_manager=tools, settings=settings)
+    agent.fast_path = None
+    return agent, llm
+
+
+def test_nested_scopes_tighten_and_share_degraded_stages():
+    assert current_deadline() is None
+    with deadline_scope(10) as outer:
+        with deadline_scope(60, reserve=1) as inner:
+            assert inner.expires_at <= outer.expires_at - 1
+            inner.mark_degraded("llm")
+        with deadline_scope() as same:
+            assert same.expires_at == outer.expires_at
+        assert outer.degraded == ["llm"]
+    assert current_deadline() is None
+
+
+@pytest.mark.asyncio
+async def test_slow_stages_are_skipped_within_budget():
+    agent, llm = make_agent(
+        tool_delay=5, llm_delay=5, triage_deadline_seconds=0.6, triage_deadline_reserve_seconds=0.1
+    )
+
+    started = time.perf_counter()
+    response = await agent.run(TriageRequest(user_id="deadline", symptoms="mild headache"))
+
+    assert time.perf_counter() - started < 1.0
+    assert response.degraded == ["tool:medical_lookup", "llm"]
+    assert response.reasoning == LLMClient.FALLBACK_REASONS["deadline"]
+    # The abandoned upstream call was cancelled rather than left running
+    await asyncio.sleep(0.05)
+    assert llm._inflight._calls == {}
+
+
+@pytest.mark.asyncio
+async def test_fast_stages_are_not_degraded():
+    agent, _ = make_agent(tool_delay=0, llm_delay=0.01, triage_deadline_seconds=2)
+
+    response = await agent.run(TriageRequest(user_id="deadline", symptoms="mild headache"))
+
+    assert response.degraded == []
+    assert response.reasoning == "Stub model response."
+
+
+def test_header_tightens_request_deadline(monkeypatch):
+    agent, _ = make_agent(tool_delay=5, llm_delay=5)
+    monkeypatch.setattr(main, "triage_agent", agent)
+
+    with TestClient(main.app) as client:
+        started = time.perf_counter()
+        resp = client.post(
+            "/triage",
+            json={"user_id": "deadline-user", "symptoms": "mild headache"},
+            headers={"X-Request-Deadline-Ms": "400"},
+        )
+
+    assert resp.status_code == 200
+    assert time.perf_counter() - started < 1.5
+    assert "llm" in resp.json()["degraded"]
@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from app.agents.llm_cache import LLMResponseCache
+from app.agents.llm_client import LLMClient
+from app.config import Settings
+from app.rules.fallback import compile_fallback_rules
+from app.rules.packs import RulePackRegistry, load_rule_pack
+
+
+@pytest.mark.parametrize(
+    "fields, expected",
+    [
+        (("mild headache", None), ("neurological", "moderate", "primary_care")),
+        (("Severe Headache since noon", ""), ("neurological", "high", "go_to_er")),
+        (("chest pain", "history of asthma"), ("emergency", "high", "go_to_er")),
+        (("itchy rash and a cough", None), ("dermatological", "moderate", "primary_care")),
+        (("feeling tired", "after a long week"), ("general", "moderate", "primary_care")),
+        (("tired", "short of breath when climbing stairs"), ("respiratory", "moderate", "primary_care")),
+    ],
+)
+def test_default_rules_classify_structured_fields(fields, expected):
+    assert compile_fallback_rules().classify(*fields) == expected
+
+
+def test_pack_can_define_fallback_categories(tmp_path):
+    pack_path = tmp_path / "rules.json"
+    pack_path.write_text(
+        json.dumps(
+            {
+                "version": "v1",
+                "critical": {"chest pain": "Cardiac."},
+                "fallback": {
+                    "emergency": ["overdose"],
+                    "categories": {"gastrointestinal": ["nausea", "stomach"]},
+                },
+            }
+        )
+    )
+    rules = load_rule_pack(pack_path).fallback
+
+    assert rules.categories == ("gastrointestinal",)
+    assert rules.classify("stomach cramps") == ("gastrointestinal", "moderate", "primary_care")
+    assert rules.classify("possible overdose") == ("emergency", "high", "go_to_er")
+
+
+def test_invalid_fallback_section_is_rejected():
+    with pytest.raises(ValueError):
+        compile_fallback_rules({"categories": {"skin": []}})
+    with pytest.raises(ValueError):
+        compile_fallback_rules({"categories": ["rash"]})
+
+
+@pytest.mark.asyncio
+async def test_llm_fallback_ignores_prompt_template(tmp_path):
+    client = LLMClient(Settings(gemini_api_key=None), cache=LLMResponseCache())
+    prompt = "Template mentioning rash, cough and chest pain.\nSymptoms: sore knee"
+
+    legacy = json.loads(await client.complete(prompt))
+    structured = json.loads(await client.complete(prompt, fallback_fields=("sore knee", None)))
+
+    assert legacy["urgency"] == "high"
+    assert (structured["category"], structured["urgency"]) == ("general", "moderate")
+    assert structured["reasoning"] == LLMClient.FALLBACK_REASONS["unavailable"]
+
+
+def test_fallback_follows_rule_pack_reload(tmp_path):
+    pack_path = tmp_path / "rules.json"
+    pack_path.write_text(json.dumps({"version": "v1", "critical": {"chest pain": "Cardiac."}}))
+    registry = RulePackRegistry(pack_path)
+    assert registry.current.fallback.classify("knee pain")[0] == "general"
+
+    pack_path.write_text(
+        json.dumps(
+            {
+                "version": "v2",
+                "critical": {"chest pain": "Cardiac."},
+                "fallback": {"categories": {"musculoskeletal": ["knee", "back"]}},
+            }
+        )
+    )
+    registry.reload()
+
+    assert registry.current.fallback.classify("knee pain")[0] == "musculoskeletal"
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from app.agents.fastpath import FastPathClassifier
+from app.agents.stub_model import StubModel
+from app.agents.triage import TriageAgent
+from app.observability.metrics import metrics
+from app.schemas import TriageRequest
+
+TEXTS = [
+    "mild headache after work", "tension headache mild", "headache from screen time",
+    "itchy rash on arm", "red rash itchy skin", "small rash after hiking",
+    "runny nose and sneezing", "mild cold sneezing", "stuffy nose cold",
+]
+LABELS = (
+    ["neurological|low|self_care"] * 3
+    + ["dermatological|low|self_care"] * 3
+    + ["respiratory|low|self_care"] * 3
+)
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    return FastPathClassifier.train(TEXTS, LABELS)
+
+
+def test_save_and_load_round_trip(classifier, tmp_path):
+    path = tmp_path / "fastpath.npz"
+    classifier.save(path)
+
+    loaded = FastPathClassifier.load(path)
+
+    assert loaded.labels == classifier.labels
+    assert loaded.predict("itchy rash")[0] == "dermatological|low|self_care"
+
+
+@pytest.mark.asyncio
+async def test_confident_low_risk_request_skips_llm(classifier, make_client):
+    model = StubModel('{"category": "general"}')
+    llm = make_client(model, fastpath_confidence_threshold=0.6, fastpath_shadow_rate=0.0)
+    agent = TriageAgent(llm_client=llm, fast_path=classifier, settings=llm.settings)
+    hits = metrics.counters["fastpath_hit"]
+
+    response = await agent.run(TriageRequest(user_id="fp", symptoms="itchy rash"))
+
+    assert model.calls == 0
+    assert (response.category, response.urgency) == ("dermatological", "low")
+    assert metrics.counters["fastpath_hit"] == hits + 1
+
+
+@pytest.mark.asyncio
+async def test_urgent_flags_still_raise_fast_path_minimums(classifier, make_client):
+    llm = make_client(StubModel("{}"), fastpath_confidence_threshold=0.3, fastpath_shadow_rate=0.0)
+    agent = TriageAgent(llm_client=llm, fast_path=classifier, settings=llm.settings)
+
+    response = await agent.run(TriageRequest(user_id="fp", symptoms="mild headache and fainting"))
+
+    assert response.urgency == "moderate"
+    assert response.recommended_action == "primary_care"
+
+
+@pytest.mark.asyncio
+async def test_low_confidence_defers_and_shadow_counts_disagreement(
+    classifier, make_client, no_context
+):
+    model = StubModel(
+        '{"category": "dermatological", "urgency": "moderate", "recommended_action": "primary_care"}'
+    )
+    llm = make_client(model, fastpath_confidence_threshold=0.6, fastpath_shadow_rate=1.0)
+    agent = TriageAgent(llm_client=llm, fast_path=classifier, settings=llm.settings)
+    disagree = metrics.counters["fastpath_shadow_disagree"]
+
+    await agent.run(TriageRequest(user_id="fp", symptoms="broken leg"))
+    assert model.calls == 1
+
+    await agent.run(TriageRequest(user_id="fp", symptoms="itchy rash"))
+    await asyncio.gather(*agent._shadow_tasks)
+    assert model.calls == 2
+    assert metrics.counters["fastpath_shadow_disagree"] == disagree + 1
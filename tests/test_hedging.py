@@ -0,0 +1,91 @@
+import asyncio
+import random
+
+import pytest
+
+from app.agents.hedging import HedgePolicy
+from app.agents.stub_model import StubModel, latency_distribution
+from app.observability.metrics import metrics
+
+
+def scripted(*latencies):
+    """Latency distribution replaying the given values, then staying fast."""
+
+    remaining = list(latencies)
+    return lambda rng: remaining.pop(0) if remaining else 0.005
+
+
+HEDGING = dict(
+    llm_cache_enabled=False,
+    llm_hedge_enabled=True,
+    llm_hedge_budget=1.0,
+    llm_hedge_min_samples=5,
+    llm_hedge_min_delay_seconds=0.01,
+)
+
+
+def test_policy_budget_caps_hedge_share():
+    policy = HedgePolicy(budget_ratio=0.05, max_tokens=1.0)
+    spent = 0
+    for _ in range(1000):
+        policy.deposit()
+        spent += policy.try_spend()
+    assert spent == 50
+
+
+def test_policy_waits_for_samples_then_uses_percentile():
+    policy = HedgePolicy(percentile=95, min_samples=20, min_delay_seconds=0.0)
+    for i in range(19):
+        policy.observe("flash", i / 100)
+    assert policy.delay("flash") is None
+    policy.observe("flash", 1.0)
+    assert policy.delay("flash") == pytest.approx(0.18)
+    assert policy.delay("pro") is None
+
+
+@pytest.mark.asyncio
+async def test_hedge_beats_slow_primary(make_client):
+    model = StubModel(latency=scripted(0.005, 0.005, 0.005, 0.005, 0.005, 2.0))
+    client = make_client(model, **HEDGING)
+    for i in range(5):
+        await client.complete(f"warm {i}")
+    won = metrics.counters["llm_hedge_won"]
+
+    started = asyncio.get_running_loop().time()
+    await client.complete("slow one")
+
+    assert asyncio.get_running_loop().time() - started < 0.5
+    # The cancelled-or-draining primary has not responded yet
+    assert model.calls == 6
+    assert metrics.counters["llm_hedge_won"] == won + 1
+    assert metrics.gauges["llm_hedge_rate"] > 0
+    draining = list(client._draining)
+    for task in draining:
+        task.cancel()
+    await asyncio.gather(*draining, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_without_budget(make_client):
+    model = StubModel(latency=scripted(0.005, 0.005, 0.005, 0.005, 0.005, 0.1))
+    client = make_client(model, **{**HEDGING, "llm_hedge_budget": 0.0})
+    for i in range(5):
+        await client.complete(f"warm {i}")
+    skipped = metrics.counters["llm_hedge_skipped"]
+
+    await client.complete("slow one")
+
+    assert model.calls == 6
+    assert metrics.counters["llm_hedge_skipped"] == skipped + 1
+
+
+def test_latency_distribution_specs():
+    rng = random.Random(1)
+    assert latency_distribution("fixed:0.3")(rng) == 0.3
+    assert 0.1 <= latency_distribution("uniform:0.1,0.2")(rng) <= 0.2
+    tail = latency_distribution("tail:0.1,5,1.0")
+    assert tail(rng) == 5
+    with pytest.raises(ValueError):
+        latency_distribution("pareto:1")
+    with pytest.raises(ValueError):
+        latency_distribution("fixed:1,2")
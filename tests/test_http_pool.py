@@ -0,0 +1,113 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.config import Settings
+from app.observability.metrics import metrics
+from app.tools.http_pool import HTTPClientPool
+from app.tools.mcp_client import MCPClient
+from app.tools.medical_lookup import MedicalLookupTool
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def _send(self, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+        try:
+            if self.path.startswith("/slow"):
+                time.sleep(0.05)
+            self._send([1, ["I10"], None, [["Hypertension"], ["Headache"]]])
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if "id" not in request:  # notification
+            self.send_response(202)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self._send({"jsonrpc": "2.0", "id": request["id"], "result": {"method": request["method"]}})
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    StubHandler.active = StubHandler.peak = 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def make_pool(**overrides):
+    return HTTPClientPool(Settings(**overrides))
+
+
+@pytest.mark.asyncio
+async def test_connections_are_reused_across_tool_calls(server):
+    pool = make_pool()
+    tool = MedicalLookupTool(base_url=server, http=pool)
+    new = metrics.counters["http_pool_connections_new"]
+    reused = metrics.counters["http_pool_connections_reused"]
+
+    for _ in range(5):
+        result = await tool.execute("headache")
+        assert result["success"] and result["results"] == [["Hypertension"], ["Headache"]]
+    await pool.aclose()
+
+    assert metrics.counters["http_pool_connections_new"] - new == 1
+    assert metrics.counters["http_pool_connections_reused"] - reused == 4
+    assert "http_pool_wait_seconds" in metrics.get_summary()["histograms"]
+
+
+@pytest.mark.asyncio
+async def test_per_host_limit_queues_excess_requests(server):
+    pool = make_pool(http_max_connections_per_host=2)
+
+    responses = await asyncio.gather(*(pool.client.get(f"{server}/slow") for _ in range(6)))
+    await pool.aclose()
+
+    assert all(response.status_code == 200 for response in responses)
+    assert StubHandler.peak == 2
+    assert metrics.percentile("http_pool_wait_seconds", 100) >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_tools_share_one_pool(server):
+    pool = make_pool()
+    mcp = MCPClient(server_url=f"{server}/mcp", http=pool)
+    lookup = MedicalLookupTool(base_url=server, http=pool)
+
+    assert (await mcp.execute("resources/list"))["result"] == {"method": "resources/list"}
+    await lookup.execute("cough")
+    client = pool.client
+    await mcp.aclose()
+    await pool.aclose()
+
+    assert client.is_closed
+    assert mcp.http is lookup.http
@@ -0,0 +1,171 @@
+import json
+
+import pytest
+
+from app.agents.llm_cache import LLMResponseCache, cache_key
+from app.agents.stub_model import StubModel, fixed
+from app.agents.triage import TriageAgent
+from app.deadline import current_deadline
+from app.observability.metrics import metrics
+from app.schemas import TriageRequest
+
+TRIAGE_JSON = json.dumps(
+    {
+        "category": "neurological",
+        "urgency": "low",
+        "recommended_action": "self_care",
+        "red_flags": [],
+        "reasoning": "Tension-type headache.",
+    }
+)
+
+
+@pytest.fixture
+def cached_client(make_client):
+    """``cached_client(tmp_path=None)`` returns a client over a small cache and its model."""
+
+    def build(tmp_path=None):
+        cache = LLMResponseCache(
+            max_entries=2,
+            ttl_seconds=60,
+            sqlite_path=str(tmp_path / "llm_cache.db") if tmp_path else None,
+        )
+        model = StubModel(response=TRIAGE_JSON)
+        return make_client(model, cache=cache), model
+
+    return build
+
+
+@pytest.mark.asyncio
+async def test_repeat_prompt_is_served_from_cache(cached_client):
+    client, model = cached_client()
+    hits_before = metrics.counters["llm_cache_hit_memory"]
+
+    first = await client.complete("symptoms:  mild headache")
+    second = await client.complete("symptoms: mild headache ")
+
+    assert first == second == TRIAGE_JSON
+    assert model.calls == 1
+    assert metrics.counters["llm_cache_hit_memory"] == hits_before + 1
+
+
+@pytest.mark.asyncio
+async def test_bypass_flag_skips_cache(cached_client):
+    client, model = cached_client()
+
+    await client.complete("mild headache")
+    await client.complete("mild headache", bypass_cache=True)
+
+    assert model.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_new_client(cached_client, tmp_path):
+    client, _ = cached_client(tmp_path)
+    await client.complete("persistent cough")
+
+    restarted, model = cached_client(tmp_path)
+    assert await restarted.complete("persistent cough") == TRIAGE_JSON
+    assert model.calls == 0
+
+
+def test_lru_evicts_oldest_entry():
+    cache = LLMResponseCache(max_entries=2, ttl_seconds=60)
+    evictions_before = metrics.counters["llm_cache_eviction"]
+
+    for name in ("a", "b", "c"):
+        cache.set(name, name)
+
+    assert cache.get("a") is None
+    assert cache.get("c") == "c"
+    assert metrics.counters["llm_cache_eviction"] == evictions_before + 1
+
+
+def test_key_depends_on_model_and_config():
+    base = cache_key("prompt", "gemini-2.5-flash", {"temperature": 0.1})
+
+    assert base != cache_key("prompt", "gemini-2.5-pro", {"temperature": 0.1})
+    assert base != cache_key("prompt", "gemini-2.5-flash", {"temperature": 0.7})
+
+
+def test_inputs_key_ignores_case_spacing_and_order():
+    key = cache_key(
+        {"symptoms": "Mild  headache", "medications": ["ibuprofen", "aspirin"]}, "flash", {}
+    )
+
+    assert key == cache_key(
+        {"symptoms": "mild headache ", "medications": ["Aspirin", "ibuprofen"]}, "flash", {}
+    )
+    assert key != cache_key({"symptoms": "mild headache", "medications": []}, "flash", {})
+
+
+@pytest.fixture
+def make_agent(make_client, no_context):
+    def build():
+        model = StubModel(response=TRIAGE_JSON, latency=fixed(0.05))
+        llm = make_client(model, cache=LLMResponseCache(max_entries=8, ttl_seconds=60))
+        agent = TriageAgent(llm_client=llm, fast_path=None, settings=llm.settings)
+        agent.fast_path = None
+        return agent, model
+
+    return build
+
+
+@pytest.mark.asyncio
+async def test_same_complaint_from_different_users_shares_one_entry(make_agent):
+    agent, model = make_agent()
+
+    def request(user_id):
+        return TriageRequest(user_id=user_id, symptoms="mild headache after working late")
+
+    first = await agent.run(request("u1"))
+    second = await agent.run(request("u2"))
+
+    assert model.calls == 1
+    assert first.category == second.category == "neurological"
+
+
+@pytest.mark.asyncio
+async def test_answers_shaped_by_user_history_are_not_shared(make_agent):
+    agent, model = make_agent()
+
+    for user_id in ("u1", "u2", "u1"):
+        await agent.run(
+            TriageRequest(
+                user_id=user_id,
+                symptoms="mild headache after working late",
+                history=f"Profile: {user_id} has frequent migraines",
+            )
+        )
+
+    assert model.calls == 3
+    assert len(agent.llm_client.cache.memory) == 0
+
+
+@pytest.mark.asyncio
+async def test_answer_without_full_context_is_not_stored(make_agent):
+    agent, model = make_agent()
+
+    async def lookup_timed_out(request):
+        current_deadline().mark_degraded("tool:medical_lookup")
+        return "None"
+
+    agent._gather_medical_context = lookup_timed_out
+    request = TriageRequest(user_id="u1", symptoms="mild headache after working late")
+    await agent.run(request)
+    await agent.run(request)
+
+    assert model.calls == 2
+    assert len(agent.llm_client.cache.memory) == 0
+
+
+def test_rule_pack_version_is_part_of_the_key(make_agent):
+    agent, _ = make_agent()
+    request = TriageRequest(user_id="u1", symptoms="mild headache")
+
+    keys = {
+        cache_key(agent._cache_options(request, version)["cache_inputs"], "flash", {})
+        for version in ("2024.12.3", "2024.12.4")
+    }
+
+    assert len(keys) == 2
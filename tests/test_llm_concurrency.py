@@ -0,0 +1,53 @@
+import asyncio
+import json
+
+import pytest
+
+from app.agents.stub_model import StubModel, fixed
+from app.observability.metrics import metrics
+
+
+def echo(prompt):
+    return json.dumps({"echo": prompt})
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded_by_semaphore(make_client):
+    model = StubModel(response=echo, latency=fixed(0.02))
+    client = make_client(model, llm_cache_enabled=False, llm_max_concurrency=2)
+
+    results = await asyncio.gather(*(client.complete(f"prompt {i}") for i in range(6)))
+
+    assert len(set(results)) == 6
+    assert model.peak == 2
+    assert metrics.histograms["llm_queue_wait_seconds"]
+    assert metrics.gauges["llm_in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_retries_use_async_backoff_without_blocking_loop(make_client):
+    def flaky(prompt):
+        if model.calls <= 2:
+            raise RuntimeError("transient upstream error")
+        return echo(prompt)
+
+    model = StubModel(response=flaky, latency=fixed(0.02))
+    client = make_client(
+        model, llm_cache_enabled=False, llm_retry_min_seconds=0.05, llm_retry_max_seconds=0.05
+    )
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.005)
+            ticks += 1
+
+    background = asyncio.ensure_future(ticker())
+    result = await client.complete("retry me")
+    background.cancel()
+
+    assert result == '{"echo": "retry me"}'
+    assert model.calls == 3
+    # The loop kept running other work while the client was backing off
+    assert ticks >= 10
@@ -0,0 +1,115 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import Settings
+from app.tools.local_index import MedicalIndex, build_index, main
+from app.tools.medical_lookup import MedicalLookupTool
+
+CONDITIONS_CSV = """primary_name,consumer_name
+Hypertension,High blood pressure
+Migraine,Migraine headache
+Tension headache,Tension headache
+Asthma,Asthma
+Acute bronchitis,Chest cold
+"""
+
+RXTERMS_TXT = """RXCUI|GENERIC_RXCUI|TTY|FULL_NAME|DISPLAY_NAME
+1|1|SCD|ibuprofen 200 MG Oral Tablet|Ibuprofen (Oral Pill)
+2|2|SCD|ibuprofen 400 MG Oral Tablet|Ibuprofen (Oral Pill)
+3|3|SCD|lisinopril 10 MG Oral Tablet|Lisinopril (Oral Pill)
+"""
+
+
+class RemoteStub:
+    """Stands in for the shared HTTP pool and counts remote calls."""
+
+    def __init__(self):
+        self.calls = 0
+        self.client = SimpleNamespace(get=self.get)
+
+    async def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        return SimpleNamespace(status_code=200, json=lambda: [1, ["X"], None, [["Remote result"]]])
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    path = tmp_path / "medical_index.db"
+    (tmp_path / "conditions.csv").write_text(CONDITIONS_CSV)
+    (tmp_path / "RxTerms.txt").write_text(RXTERMS_TXT)
+    main([str(tmp_path / "conditions.csv"), "--kind", "conditions", "--index", str(path)])
+    main([str(tmp_path / "RxTerms.txt"), "--kind", "drugs", "--index", str(path)])
+    return path
+
+
+def test_import_cli_indexes_both_datasets(index_path):
+    index = MedicalIndex(index_path)
+
+    assert index.count("conditions") == 5
+    assert index.count("drugs") == 2  # RxTerms rows deduplicated by display name
+    assert index.search("conditions", "hyperten") == [["Hypertension"]]
+    assert index.search("drugs", "ibu") == [["Ibuprofen (Oral Pill)"]]
+
+
+def test_free_text_query_ranks_by_meaningful_words(index_path):
+    index = MedicalIndex(index_path)
+
+    results = index.search("conditions", "I have a bad headache since yesterday")
+    assert results == [["Tension headache"]]
+
+    started = time.perf_counter()
+    for _ in range(200):
+        index.search("conditions", "migr")
+    assert (time.perf_counter() - started) / 200 < 0.001
+
+
+def test_has_name_needs_a_whole_leading_word(index_path):
+    index = MedicalIndex(index_path)
+
+    assert index.has_name("drugs", "ibuprofen")
+    assert not index.has_name("drugs", "ibu")
+    assert not index.has_name("drugs", "oral")  # in the name, but not the drug itself
+    assert not index.has_name("drugs", "feeling")
+
+
+def test_reimport_replaces_only_that_kind(index_path):
+    build_index(index_path, "conditions", ["Gout"])
+    index = MedicalIndex(index_path)
+
+    assert index.count("conditions") == 1
+    assert index.count("drugs") == 2
+
+
+@pytest.mark.asyncio
+async def test_tool_answers_locally_and_falls_back_on_miss(index_path):
+    remote = RemoteStub()
+    tool = MedicalLookupTool(http=remote, settings=Settings(medical_index_path=str(index_path)))
+
+    hit = await tool.execute("lisinopril", lookup_type="drugs")
+    assert hit["source"] == "local_index"
+    assert hit["results"] == [["Lisinopril (Oral Pill)"]]
+    assert remote.calls == 0
+
+    miss = await tool.execute("zzzz", lookup_type="conditions")
+    assert miss["results"] == [["Remote result"]]
+    assert remote.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_remote_fallback_can_be_disabled(index_path):
+    remote = RemoteStub()
+    settings = Settings(medical_index_path=str(index_path), medical_lookup_remote_fallback=False)
+    tool = MedicalLookupTool(http=remote, settings=settings)
+
+    result = await tool.execute("zzzz")
+
+    assert result == {
+        "success": True,
+        "results": [],
+        "query": "zzzz",
+        "type": "conditions",
+        "source": "local_index",
+    }
+    assert remote.calls == 0
@@ -0,0 +1,123 @@
+import asyncio
+import importlib.util
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.config import Settings
+from app.observability.metrics import metrics
+from app.tools.mcp_client import MCPClient
+from app.tools.mcp_session import MCPError, MCPSession, StdioTransport, StreamableHTTPTransport
+
+STUB_PATH = Path(__file__).parent / "fixtures" / "mcp_stub_server.py"
+
+
+@pytest.fixture
+def stub():
+    spec = importlib.util.spec_from_file_location("mcp_stub_server", STUB_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)  # fresh state per test
+    return module
+
+
+@pytest.fixture
+async def http_session(stub):
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=stub.app))
+    transport = StreamableHTTPTransport("http://stub/mcp", SimpleNamespace(client=client))
+    session = await MCPSession(transport, request_timeout=2).start()
+    yield session
+    await session.close()
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_handshake_and_concurrent_calls_share_one_post(stub, http_session):
+    assert http_session.server_info["name"] == "stub"
+    assert http_session.transport.session_id == "s1"
+    posts, batches = stub.state["posts"], metrics.counters["mcp_batches_sent"]
+
+    results = await asyncio.gather(
+        *(http_session.call_tool("drug_database", {"query": f"drug{i}"}) for i in range(5))
+    )
+
+    assert [result["content"][0]["text"] for result in results] == [
+        f'drug_database: {{"query": "drug{i}"}}' for i in range(5)
+    ]
+    assert stub.state["posts"] - posts == 1
+    assert metrics.counters["mcp_batches_sent"] - batches == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_returns_per_call_errors(http_session):
+    ok, failed = await http_session.batch(
+        [("tools/call", {"name": "icd_codes", "arguments": {}}), ("tools/call", {"name": "nope"})]
+    )
+
+    assert ok["content"][0]["text"] == "icd_codes: {}"
+    assert isinstance(failed, MCPError) and failed.code == -32602
+    with pytest.raises(MCPError):
+        await http_session.call_tool("nope")
+
+
+@pytest.mark.asyncio
+async def test_tool_list_is_paged_cached_and_invalidated(stub, http_session):
+    tools = await http_session.list_tools()
+    assert [tool["name"] for tool in tools] == ["drug_database", "medical_guidelines", "icd_codes"]
+    await http_session.list_tools()
+    assert stub.state["tools_list_calls"] == 2  # two pages, then served from cache
+
+    await http_session.call_tool("register_tool", {"name": "labs"})  # emits list_changed over SSE
+
+    assert [tool["name"] for tool in await http_session.list_tools()][-1] == "labs"
+    assert stub.state["tools_list_calls"] == 4
+
+
+@pytest.mark.asyncio
+async def test_tool_list_expires_without_a_notification(stub, http_session):
+    http_session.tools_ttl = 0.05
+    await http_session.list_tools()
+    # Changed on the server with no notification on any POST reply
+    stub.state["extra_tools"].append({"name": "labs", "description": "added"})
+    assert "labs" not in [tool["name"] for tool in await http_session.list_tools()]
+
+    await asyncio.sleep(0.06)
+
+    assert [tool["name"] for tool in await http_session.list_tools()][-1] == "labs"
+
+
+@pytest.mark.asyncio
+async def test_stdio_transport_multiplexes_requests():
+    session = await MCPSession(StdioTransport([sys.executable, str(STUB_PATH)]), request_timeout=5).start()
+    try:
+        results = await asyncio.gather(
+            session.call_tool("medical_guidelines", {"topic": "fever"}),
+            session.list_tools(),
+            session.call_tool("nope"),
+            return_exceptions=True,
+        )
+    finally:
+        await session.close()
+
+    assert results[0]["content"][0]["text"] == 'medical_guidelines: {"topic": "fever"}'
+    assert len(results[1]) == 3
+    assert isinstance(results[2], MCPError)
+    assert session.closed
+
+
+@pytest.mark.asyncio
+async def test_client_falls_back_and_backs_off_when_server_is_down():
+    refused = SimpleNamespace(
+        client=httpx.AsyncClient(transport=httpx.AsyncHTTPTransport(retries=0))
+    )
+    settings = Settings(mcp_server_url="http://127.0.0.1:9/mcp", mcp_reconnect_seconds=60)
+    client = MCPClient(http=refused, settings=settings)
+
+    first = await client.execute("tools/call", {"name": "medical_guidelines"})
+    second = await client.execute("tools/list")
+
+    assert first["fallback"] and second["fallback"]
+    assert client._retry_at > 0
+    await refused.client.aclose()
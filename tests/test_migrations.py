@@ -0,0 +1,149 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import inspect
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.db.migrations import MIGRATIONS, current_version, main, migrate
+from app.db.models import MedicationCheck, ReminderEvent, SymptomEvent, User
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    """A database with data, created before migrations existed."""
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    migrate(engine, target=1)
+    with Session(engine) as session:
+        session.add(User(user_id="u1"))
+        session.add(
+            SymptomEvent(
+                user_id="u1",
+                symptoms="dry cough",
+                category="respiratory",
+                urgency="low",
+                recommended_action="self_care",
+                reasoning="test",
+                red_flags=[],
+            )
+        )
+        session.add(
+            MedicationCheck(
+                user_id="u1", medications=["ibuprofen"], risk_level="low", conflicts=[], guidance="ok"
+            )
+        )
+        session.add(ReminderEvent(user_id="u1", status="sent", message="Take ibuprofen"))
+        session.commit()
+    # Unmanaged, as every database was before migrations
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE schema_migrations")
+    return engine
+
+
+def index_names(engine, table):
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+def row_count(engine, table):
+    with engine.connect() as connection:
+        return connection.exec_driver_sql(f"SELECT count(*) FROM {table}").scalar()
+
+
+def query_plan(engine, statement):
+    compiled = statement.compile(engine, compile_kwargs={"literal_binds": True})
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").all()
+    return " | ".join(row[-1] for row in rows)
+
+
+def test_migrates_existing_database_online(legacy_engine):
+    tables = ("symptomevent", "medicationcheck", "reminderevent")
+    counts_before = {table: row_count(legacy_engine, table) for table in tables}
+    assert current_version(legacy_engine) == 0
+    assert "ix_symptomevent_user_id_created_at" not in index_names(legacy_engine, "symptomevent")
+
+    # A reader holding a connection open does not stop the migration
+    reader = sqlite3.connect(legacy_engine.url.database)
+    reader.execute("SELECT count(*) FROM symptomevent").fetchone()
+    assert migrate(legacy_engine) == [item.version for item in MIGRATIONS]
+    reader.close()
+
+    assert migrate(legacy_engine) == []
+    assert current_version(legacy_engine) == MIGRATIONS[-1].version
+    assert "ix_symptomevent_user_id_created_at" in index_names(legacy_engine, "symptomevent")
+    assert "ix_medicationcheck_user_id_created_at" in index_names(legacy_engine, "medicationcheck")
+    assert {
+        "ix_reminderevent_user_id_created_at",
+        "ix_reminderevent_user_id_reminder_type_created_at",
+    } <= index_names(legacy_engine, "reminderevent")
+    assert {table: row_count(legacy_engine, table) for table in tables} == counts_before
+
+
+def test_fresh_database_and_target(tmp_path, monkeypatch, capsys):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+
+    assert migrate(engine, target=1) == [1]
+    # The baseline is frozen: it does not pick up indexes added to the models since
+    assert "ix_symptomevent_user_id_created_at" not in index_names(engine, "symptomevent")
+    assert migrate(engine) == [2]
+    assert current_version(engine) == 2
+
+    monkeypatch.setattr("app.db.db.engine", engine)
+    main(["--status"])
+    assert capsys.readouterr().out.strip() == "current version: 2"
+
+
+def test_migrations_build_the_schema_the_models_describe(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    migrate(engine)
+    inspector = inspect(engine)
+
+    for table in SQLModel.metadata.sorted_tables:
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        assert columns == set(table.columns.keys()), table.name
+        assert index_names(engine, table.name) == {index.name for index in table.indexes}
+
+
+def test_hot_queries_use_composite_indexes(legacy_engine):
+    migrate(legacy_engine)
+    cutoff = datetime(2024, 1, 1)
+
+    plans = {
+        "ix_symptomevent_user_id_created_at": [
+            # /users/{id}/events and MemoryBank.get_contextual_history
+            select(SymptomEvent)
+            .where(SymptomEvent.user_id == "u1")
+            .order_by(SymptomEvent.created_at.desc())
+            .limit(10),
+            # MemoryBank.get_user_health_summary
+            select(SymptomEvent)
+            .where(SymptomEvent.user_id == "u1")
+            .where(SymptomEvent.created_at >= cutoff)
+            .order_by(SymptomEvent.created_at.desc()),
+        ],
+        "ix_medicationcheck_user_id_created_at": [
+            select(MedicationCheck)
+            .where(MedicationCheck.user_id == "u1")
+            .where(MedicationCheck.created_at >= cutoff)
+            .order_by(MedicationCheck.created_at.desc()),
+        ],
+        "ix_reminderevent_user_id_created_at": [
+            select(ReminderEvent)
+            .where(ReminderEvent.user_id == "u1")
+            .order_by(ReminderEvent.created_at.desc()),
+        ],
+        "ix_reminderevent_user_id_reminder_type_created_at": [
+            # ReminderLoopAgent._recent_reminder_exists
+            select(ReminderEvent)
+            .where(ReminderEvent.user_id == "u1")
+            .where(ReminderEvent.reminder_type == "medication_followup")
+            .where(ReminderEvent.created_at >= datetime.utcnow() - timedelta(days=1)),
+        ],
+    }
+
+    for index, statements in plans.items():
+        for statement in statements:
+            plan = query_plan(legacy_engine, statement)
+            assert f"USING INDEX {index}" in plan, plan
+            assert "TEMP B-TREE" not in plan, plan  # no sort step
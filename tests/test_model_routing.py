@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from app.agents.stub_model import StubModel
+from app.agents.triage import TriageAgent
+from app.observability.metrics import metrics
+from app.schemas import TriageRequest
+
+
+def answer(urgency="low", action="self_care", confidence=0.9, category="neurological"):
+    return json.dumps(
+        {
+            "category": category,
+            "urgency": urgency,
+            "recommended_action": action,
+            "red_flags": [],
+            "reasoning": "stub",
+            "confidence": confidence,
+        }
+    )
+
+
+@pytest.fixture
+def make_agent(make_client, no_context):
+    def build(fast_output, large_output):
+        fast, large = StubModel(fast_output), StubModel(large_output)
+        llm = make_client(
+            models=[("flash-lite", fast), ("flash", large)],
+            llm_cache_enabled=False,
+            triage_min_confidence=0.6,
+        )
+        agent = TriageAgent(llm_client=llm, fast_path=None, settings=llm.settings)
+        agent.fast_path = None
+        return agent, fast, large
+
+    return build
+
+
+@pytest.mark.asyncio
+async def test_confident_fast_model_answers_alone(make_agent):
+    agent, fast, large = make_agent(answer(), answer(category="general"))
+
+    response = await agent.run(TriageRequest(user_id="route", symptoms="mild headache"))
+
+    assert response.category == "neurological"
+    assert (fast.calls, large.calls) == (1, 0)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "fast_output, symptoms, reason",
+    [
+        (answer(confidence=0.3), "mild headache", "low_confidence"),
+        ("I think it is a headache", "mild headache", "unparsable"),
+        (answer(), "headache and fainting", "urgent_flag_conflict"),
+    ],
+)
+async def test_escalates_to_larger_model(make_agent, fast_output, symptoms, reason):
+    agent, fast, large = make_agent(fast_output, answer("moderate", "primary_care", 0.95, "general"))
+    escalations = metrics.counters[f"llm_escalation_{reason}"]
+
+    response = await agent.run(TriageRequest(user_id="route", symptoms=symptoms))
+
+    assert (fast.calls, large.calls) == (1, 1)
+    assert response.category == "general"
+    assert metrics.counters[f"llm_escalation_{reason}"] == escalations + 1
+    assert "llm_model_flash_seconds" in metrics.histograms
+
+
+@pytest.mark.asyncio
+async def test_last_tier_output_is_kept_and_guardrails_still_apply(make_agent):
+    agent, _, large = make_agent(answer(confidence=0.1), answer(confidence=0.1))
+
+    response = await agent.run(TriageRequest(user_id="route", symptoms="headache and fainting"))
+
+    assert large.calls == 1
+    assert (response.urgency, response.recommended_action) == ("moderate", "primary_care")
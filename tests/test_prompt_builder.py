@@ -0,0 +1,51 @@
+from app.agents.prompt_builder import TriagePromptBuilder
+from app.agents.tokens import estimate_tokens
+from app.memory.context_compaction import ContextCompactor
+
+
+def test_small_prompt_is_untouched():
+    builder = TriagePromptBuilder(max_tokens=1024)
+    prompt = builder.build("u1", "mild headache", context="slept badly", history="No previous health history available.")
+
+    assert prompt.trimmed == ()
+    assert "symptoms: mild headache" in prompt.text
+    assert "health_history: No previous health history available." in prompt.text
+    assert "medical_context: None available" in prompt.text
+
+
+def test_budget_trims_lowest_priority_sections_first():
+    builder = TriagePromptBuilder(max_tokens=400, section_min_tokens=16)
+    symptoms = "Sharp pain in the lower right abdomen since this morning, worse when walking."
+    context = "Recent travel abroad."
+    history = "\n".join(f"Similar symptoms on 2024-01-{day:02d}: gastrointestinal (moderate urgency)" for day in range(1, 30))
+    medical = "Related conditions: " + ", ".join(f"condition {i}" for i in range(200))
+
+    prompt = builder.build("u1", symptoms, context=context, history=history, medical_context=medical)
+
+    assert prompt.tokens <= 400
+    assert symptoms in prompt.text  # highest priority survives intact
+    assert set(prompt.trimmed) == {"history", "medical_context"}
+    assert "Similar symptoms on 2024-01-01" in prompt.text  # most relevant entries kept whole
+    assert "more entries omitted]" in prompt.text
+    assert prompt.text.endswith("…")
+
+
+def test_allocation_guarantees_each_section_a_floor():
+    builder = TriagePromptBuilder(max_tokens=1024, section_min_tokens=10)
+    sizes = {"symptoms": 500, "context": 500, "history": 500, "medical_context": 500}
+
+    allocation = builder.allocate(sizes, 100)
+
+    assert sum(allocation.values()) == 100
+    assert allocation["medical_context"] == 10
+    assert allocation["symptoms"] == 70
+
+
+def test_fit_text_cuts_at_sentence_boundary():
+    compactor = ContextCompactor()
+    text = "Started yesterday. Getting worse overnight. " + "Extra detail " * 50
+
+    fitted = compactor.fit_text(text, 16)
+
+    assert estimate_tokens(fitted) <= 16
+    assert fitted == "Started yesterday. Getting worse overnight. …"
@@ -0,0 +1,37 @@
+from app.agents.triage import RedFlagEngine
+from app.rules.matcher import PhraseMatcher
+
+
+def test_detect_matches_substring_scan_shape():
+    engine = RedFlagEngine()
+
+    flags = engine.detect("Sudden CHEST PAIN, fainting and severe back pain since noon")
+
+    assert flags == {"critical": ["chest pain"], "urgent": ["fainting", "severe back pain"]}
+
+
+def test_overlapping_phrases_across_tiers():
+    engine = RedFlagEngine()
+
+    flags = engine.detect("severe shortness of breath at rest")
+
+    assert flags["critical"] == ["shortness of breath at rest"]
+    assert flags["urgent"] == ["severe shortness of breath"]
+
+
+def test_word_boundaries_are_respected():
+    matcher = PhraseMatcher({"critical": ["stroke", "jaw pain"]})
+
+    assert matcher.match("heatstroke warning")["critical"] == []
+    assert matcher.match("left jaw pain.")["critical"] == ["jaw pain"]
+    assert matcher.match("stroke")["critical"] == ["stroke"]
+
+
+def test_inflected_critical_phrases_still_escalate():
+    engine = RedFlagEngine()
+
+    assert engine.detect("I have chest pains")["critical"] == ["chest pain"]
+    assert engine.detect("having seizures since morning")["critical"] == ["seizure"]
+    assert engine.detect("multiple seizures")["critical"] == ["seizure"]
+    assert engine.detect("severe headaches daily")["critical"] == ["severe headache"]
+    assert engine.detect("I think it was an anaphylactic reaction")["critical"] == ["anaphylactic"]
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from app.agents.triage import RedFlagEngine, TriageAgent
+from app.rules.packs import RulePackRegistry, load_rule_pack
+from app.schemas import TriageRequest
+
+
+def write_pack(path, version, critical, urgent=None):
+    path.write_text(json.dumps({"version": version, "critical": critical, "urgent": urgent or {}}))
+
+
+def test_registry_swaps_pack_on_reload(tmp_path):
+    pack_path = tmp_path / "rules.json"
+    write_pack(pack_path, "v1", {"chest pain": "Cardiac."})
+    registry = RulePackRegistry(pack_path)
+    engine = RedFlagEngine(registry)
+    snapshot = engine.rules
+
+    write_pack(pack_path, "v2", {"chest pain": "Cardiac.", "blue lips": "Hypoxia."})
+    registry.reload()
+
+    assert engine.rules.version == "v2"
+    assert engine.detect("blue lips")["critical"] == ["blue lips"]
+    # A snapshot taken before the swap keeps its own compiled matcher
+    assert snapshot.version == "v1"
+    assert snapshot.detect("blue lips")["critical"] == []
+
+
+def test_invalid_reload_keeps_last_good_pack(tmp_path):
+    pack_path = tmp_path / "rules.json"
+    write_pack(pack_path, "v1", {"chest pain": "Cardiac."})
+    registry = RulePackRegistry(pack_path)
+
+    pack_path.write_text(json.dumps({"critical": {}}))
+    with pytest.raises(ValueError):
+        registry.reload()
+
+    assert registry.current.version == "v1"
+
+
+def test_yaml_rule_pack(tmp_path):
+    pytest.importorskip("yaml")
+    pack_path = tmp_path / "rules.yaml"
+    pack_path.write_text("version: y1\ncritical:\n  stroke: Stroke risk.\nurgent:\n  fainting: Syncope.\n")
+
+    pack = load_rule_pack(pack_path)
+
+    assert pack.version == "y1"
+    assert pack.detect("fainting after a stroke") == {"critical": ["stroke"], "urgent": ["fainting"]}
+
+
+@pytest.mark.asyncio
+async def test_triage_response_reports_pack_version(tmp_path):
+    pack_path = tmp_path / "rules.json"
+    write_pack(pack_path, "pack-7", {"chest pain": "Cardiac."})
+    agent = TriageAgent(red_flag_engine=RedFlagEngine(RulePackRegistry(pack_path)))
+
+    response = await agent.run(TriageRequest(user_id="rules-user", symptoms="chest pain"))
+
+    assert response.rule_pack_version == "pack-7"
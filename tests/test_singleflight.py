@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from app.agents.singleflight import SingleFlight
+from app.agents.stub_model import StubModel, fixed
+from app.observability.metrics import metrics
+
+
+def slow_model():
+    return StubModel(response='{"category": "general"}', latency=fixed(0.05))
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_prompts_share_one_call(make_client):
+    model = slow_model()
+    client = make_client(model)
+    saved_before = metrics.counters["llm_singleflight_coalesced"]
+
+    results = await asyncio.gather(*(client.complete("mild headache") for _ in range(5)))
+
+    assert model.calls == 1
+    assert set(results) == {'{"category": "general"}'}
+    assert metrics.counters["llm_singleflight_coalesced"] == saved_before + 4
+
+
+@pytest.mark.asyncio
+async def test_prompts_differing_only_in_user_share_one_call(make_client):
+    model = slow_model()
+    client = make_client(model)
+
+    await asyncio.gather(
+        *(
+            client.complete(
+                f"user_id: u{i}\nsymptoms: mild headache",
+                bypass_cache=True,
+                cache_inputs={"symptoms": "mild headache"},
+            )
+            for i in range(3)
+        )
+    )
+    assert model.calls == 1
+
+    # Without shared inputs, per-user prompts are never coalesced
+    await asyncio.gather(
+        *(
+            client.complete(f"user_id: u{i}\nhistory: migraines\nsymptoms: mild headache", bypass_cache=True)
+            for i in range(3)
+        )
+    )
+    assert model.calls == 4
+
+
+@pytest.mark.asyncio
+async def test_waiters_receive_leader_exception():
+    flight = SingleFlight("test")
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    results = await asyncio.gather(
+        flight.do("k", boom), flight.do("k", boom), return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_call():
+    flight = SingleFlight("test")
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return "done"
+
+    first = asyncio.ensure_future(flight.do("k", work))
+    second = asyncio.ensure_future(flight.do("k", work))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "done"
+    assert first.cancelled()
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_caller_arriving_as_last_waiter_leaves_starts_a_new_call():
+    flight = SingleFlight("test")
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return "done"
+
+    first = asyncio.ensure_future(flight.do("k", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    # Runs right after the only waiter leaves, before the abandoned call unwinds
+    second = asyncio.ensure_future(flight.do("k", work))
+
+    assert await second == "done"
+    assert first.cancelled()
+    assert calls == 2
@@ -0,0 +1,57 @@
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from app.schemas import TriageLLMOutput
+from app.utils import extract_json_object, parse_model_output, safe_json_loads
+
+CORPUS = [
+    json.loads(line)
+    for line in (Path(__file__).parent / "fixtures" / "gemini_outputs.jsonl").read_text().splitlines()
+]
+COMPLETE = [r for r in CORPUS if r["expected"] and not r["name"].startswith(("truncated", "unclosed"))]
+PROSE = ["Sure!", "Here you go {as JSON}:", "} stray brace", "Note: {x} and [y]", "```", "ok."]
+
+
+@pytest.mark.parametrize("record", CORPUS, ids=[r["name"] for r in CORPUS])
+def test_recorded_outputs(record):
+    result = parse_model_output(record["output"], TriageLLMOutput)
+    if record["expected"] is None:
+        assert result is None
+    else:
+        assert result == TriageLLMOutput(**record["expected"])
+
+
+def test_safe_json_loads_keeps_dict_contract():
+    assert safe_json_loads('noise {"a": 1} noise {b}') == {"a": 1}
+    assert safe_json_loads("nothing here") == {}
+
+
+def test_fuzz_surrounding_prose_does_not_change_result():
+    rng = random.Random(1234)
+    for _ in range(500):
+        record = rng.choice(COMPLETE)
+        prefix = " ".join(rng.sample(PROSE, rng.randint(0, 2)))
+        suffix = " ".join(rng.sample(PROSE, rng.randint(0, 2)))
+        if "```" in prefix + suffix:
+            continue  # a stray fence legitimately changes what is fenced
+        wrapped = f"{prefix}\n{record['output']}\n{suffix}"
+        assert parse_model_output(wrapped, TriageLLMOutput) == TriageLLMOutput(**record["expected"])
+
+
+def test_fuzz_truncation_and_corruption_never_raise():
+    rng = random.Random(4321)
+    for record in CORPUS:
+        output = record["output"]
+        for cut in range(len(output) + 1):
+            result = parse_model_output(output[:cut], TriageLLMOutput)
+            assert result is None or result.urgency in {"low", "moderate", "high"}
+        for _ in range(50):
+            chars = list(output)
+            for _ in range(rng.randint(1, 4)):
+                chars.insert(rng.randint(0, len(chars)), rng.choice('{}[]",:\\`'))
+            corrupted = "".join(chars)
+            obj = extract_json_object(corrupted)
+            assert obj is None or isinstance(obj, dict)
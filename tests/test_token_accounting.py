@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.agents.stub_model import DEFAULT_RESPONSE, StubModel
+from app.agents.tokens import calibrate, estimate_tokens, truncate_to_tokens
+from app.observability.metrics import metrics
+from app.observability.tracing import current_span, trace_operation
+
+
+class MeteredModel(StubModel):
+    """Stub that reports usage the way the Gemini SDK does."""
+
+    def _respond(self, prompt):
+        response = super()._respond(prompt)
+        response.usage_metadata = SimpleNamespace(prompt_token_count=321, candidates_token_count=45)
+        return response
+
+
+UNCACHED = dict(llm_cache_enabled=False, llm_max_attempts=1)
+
+
+def test_estimate_tokens_counts_word_pieces_and_punctuation():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("chest pain, fever") == 6
+    assert estimate_tokens("hypertension") == 3
+
+
+def test_calibrated_scale_fits_real_counts():
+    # Raw estimates 6 + 3 + 6 against 18 real tokens
+    samples = [("chest pain, fever", 8), ("hypertension", 4), ("dry cough at night", 6)]
+
+    scale, before, after = calibrate(samples)
+
+    assert scale == pytest.approx(18 / 15)
+    assert after < before
+    assert estimate_tokens("hypertension", scale=2.0) == 6
+    assert truncate_to_tokens("chest pain, fever", 4, scale=2.0) == "chest"
+
+
+@pytest.mark.asyncio
+async def test_usage_metadata_feeds_metrics_and_span(make_client):
+    client = make_client(MeteredModel(), **UNCACHED)
+    before = metrics.counters["llm_input_tokens_total"]
+    estimated = metrics.counters["llm_tokens_estimated"]
+
+    with trace_operation("usage") as span:
+        assert current_span() is span
+        await client.complete("first prompt")
+        await client.complete("second, longer prompt")
+
+    assert current_span() is None
+    assert span.tags["llm_calls"] == 2
+    assert span.tags["llm_input_tokens"] == 642
+    assert span.tags["llm_output_tokens"] == 90
+    assert span.tags["llm_prompt_chars"] == len("first prompt") + len("second, longer prompt")
+    assert span.tags["llm_latency_ms"] >= 0
+    assert "llm_tokens_estimated" not in span.tags
+    assert metrics.counters["llm_input_tokens_total"] - before == 642
+    assert metrics.counters["llm_tokens_estimated"] == estimated
+    assert metrics.percentile("llm_input_tokens", 100) >= 321
+
+
+@pytest.mark.asyncio
+async def test_missing_usage_falls_back_to_estimate(make_client):
+    client = make_client(StubModel(), **UNCACHED)
+    prompt = "Patient reports a persistent dry cough."
+
+    with trace_operation("estimate") as span:
+        await client.complete(prompt)
+
+    assert span.tags["llm_input_tokens"] == estimate_tokens(prompt)
+    assert span.tags["llm_output_tokens"] == estimate_tokens(DEFAULT_RESPONSE)
+    assert span.tags["llm_tokens_estimated"] is True
+
+
+@pytest.mark.asyncio
+async def test_stream_reports_usage_of_final_chunk(make_client):
+    client = make_client(MeteredModel(), **UNCACHED)
+
+    with trace_operation("stream") as span:
+        chunks = [chunk async for chunk in client.stream("streamed prompt")]
+
+    assert "".join(chunks) == DEFAULT_RESPONSE
+    assert span.tags["llm_calls"] == 1
+    assert span.tags["llm_input_tokens"] == 321
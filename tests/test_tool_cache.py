@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from app.observability.metrics import metrics
+from app.tools.base import BaseTool
+from app.tools.cache import CachePolicy
+from app.tools.manager import ToolManager
+
+
+class CountingTool(BaseTool):
+    cache_policy = CachePolicy(ttl_seconds=0.05, max_entries=2, negative_ttl_seconds=0.05, stale_seconds=10)
+
+    def __init__(self, name="counting"):
+        super().__init__(name=name, description="Counts its calls")
+        self.calls = 0
+        self.fail = False
+
+    def cache_key(self, query):
+        return query.strip().lower()
+
+    async def execute(self, query):
+        self.calls += 1
+        await asyncio.sleep(0)
+        if self.fail:
+            return {"error": "upstream down"}
+        return {"success": True, "results": [f"{query}#{self.calls}"]}
+
+
+class UncachedTool(CountingTool):
+    cache_policy = None
+
+
+def manager_with(tool):
+    tools = ToolManager()
+    tools.register_tool(tool)
+    return tools
+
+
+@pytest.mark.asyncio
+async def test_fresh_hits_use_tool_cache_key():
+    tool = CountingTool()
+    tools = manager_with(tool)
+
+    first = await tools.execute_tool("counting", query="Headache")
+    second = await tools.execute_tool("counting", query="  headache ")
+
+    assert first == second == {"success": True, "results": ["Headache#1"]}
+    assert tool.calls == 1
+    assert metrics.gauges["tool_counting_cache_hit_rate"] > 0
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_while_refreshing():
+    tool = CountingTool()
+    tools = manager_with(tool)
+    await tools.execute_tool("counting", query="cough")
+    await asyncio.sleep(0.06)  # past the TTL, inside the stale window
+
+    stale = await asyncio.gather(*(tools.execute_tool("counting", query="cough") for _ in range(3)))
+    assert all(result["results"] == ["cough#1"] for result in stale)
+    await asyncio.sleep(0.01)
+
+    assert tool.calls == 2  # one background refresh for all three callers
+    assert (await tools.execute_tool("counting", query="cough"))["results"] == ["cough#2"]
+
+
+@pytest.mark.asyncio
+async def test_errors_are_cached_briefly():
+    tool = CountingTool()
+    tool.fail = True
+    tools = manager_with(tool)
+
+    for _ in range(3):
+        assert (await tools.execute_tool("counting", query="rash"))["error"] == "upstream down"
+    assert tool.calls == 1
+
+    tool.fail = False
+    await asyncio.sleep(0.06)
+    assert (await tools.execute_tool("counting", query="rash"))["success"]
+    assert tool.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_lru_bound_and_uncacheable_tools():
+    tool = CountingTool()
+    tools = manager_with(tool)
+    for query in ("a", "b", "c"):
+        await tools.execute_tool("counting", query=query)
+    assert len(tools.caches["counting"]) == 2
+
+    uncached = UncachedTool(name="uncached")
+    tools.register_tool(uncached)
+    await tools.execute_tool("uncached", query="a")
+    await tools.execute_tool("uncached", query="a")
+    assert uncached.calls == 2
+    assert "uncached" not in tools.caches
@@ -0,0 +1,141 @@
+import asyncio
+import time
+
+import pytest
+
+from app.agents.triage import TriageAgent, mentioned_medications
+from app.config import Settings
+from app.deadline import deadline_scope
+from app.observability.tracing import trace_operation
+from app.schemas import TriageRequest
+from app.tools.base import BaseTool
+from app.tools.manager import ToolCall, ToolManager
+
+
+class DelayedTool(BaseTool):
+    def __init__(self, name, delays):
+        super().__init__(name=name, description="sleeps per query")
+        self.delays = delays
+        self.cancelled = []
+        self.calls = []
+
+    async def execute(self, query, lookup_type="conditions"):
+        self.calls.append((lookup_type, query))
+        try:
+            await asyncio.sleep(self.delays.get(query, 0.0))
+        except asyncio.CancelledError:
+            self.cancelled.append(query)
+            raise
+        return {"success": True, "results": [f"{lookup_type}:{query}"]}
+
+
+class GuidelineTool(BaseTool):
+    def __init__(self):
+        super().__init__(name="mcp_client", description="guideline stub")
+
+    async def execute(self, method, params=None):
+        await asyncio.sleep(0.1)
+        return {"result": {"content": [{"type": "text", "text": "Hydrate and rest."}]}}
+
+
+def manager(*tools):
+    manager = ToolManager()
+    for tool in tools:
+        manager.register_tool(tool)
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_calls_run_concurrently_and_stragglers_are_cancelled():
+    tool = DelayedTool("lookup", {"a": 0.1, "b": 0.1, "slow": 5})
+    tools = manager(tool)
+    calls = [ToolCall("lookup", {"query": q}, key=q) for q in ("a", "b", "slow")]
+
+    with trace_operation("fanout") as span, deadline_scope(1) as deadline:
+        started = time.perf_counter()
+        results = await tools.execute_many(calls, timeout=0.3)
+        elapsed = time.perf_counter() - started
+
+    assert 0.25 < elapsed < 0.5  # not 0.2 + 5: concurrent, cut at the shared deadline
+    assert results["a"]["results"] == ["conditions:a"]
+    assert results["slow"]["deadline_exceeded"]
+    await asyncio.sleep(0)
+    assert tool.cancelled == ["slow"]
+    assert deadline.degraded == ["tool:lookup"]
+    assert span.tags["tool_a_ms"] >= 100
+    assert "tool_slow_ms" not in span.tags
+
+
+@pytest.mark.asyncio
+async def test_per_call_timeout_only_affects_that_call():
+    tool = DelayedTool("lookup", {"fast": 0.0, "slow": 0.3})
+    tools = manager(tool)
+
+    results = await tools.execute_many(
+        [
+            ToolCall("lookup", {"query": "fast"}, key="fast"),
+            ToolCall("lookup", {"query": "slow"}, key="slow", timeout=0.05),
+        ]
+    )
+
+    assert results["fast"]["success"]
+    assert results["slow"]["deadline_exceeded"]
+
+
+@pytest.mark.asyncio
+async def test_duplicate_keys_are_rejected():
+    with pytest.raises(ValueError):
+        await manager().execute_many([ToolCall("lookup"), ToolCall("lookup")])
+
+
+def test_mentioned_medications():
+    text = "Headache since I started Sumatriptan, also taking my ibuprofen and aspirin daily"
+    assert mentioned_medications(text, is_drug={"sumatriptan"}.__contains__) == [
+        "sumatriptan",
+        "ibuprofen",
+        "aspirin",
+    ]
+    assert mentioned_medications(text) == ["ibuprofen", "aspirin"]  # unknown names are skipped
+    assert mentioned_medications("no medicines") == []
+    # Known names only count as whole words
+    assert mentioned_medications("babyaspirin-free diet, nonwarfarinized line") == []
+    assert mentioned_medications("one aspirin, then warfarin.") == ["aspirin", "warfarin"]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "I started feeling dizzy",
+        "taking care of my mother all week",
+        "pain when using the bathroom",
+        "started vomiting last night",
+    ],
+)
+def test_verbs_of_use_without_a_drug_name(text):
+    assert mentioned_medications(text, is_drug={"sumatriptan"}.__contains__) == []
+
+
+@pytest.mark.asyncio
+async def test_triage_gathers_context_in_time_of_slowest_lookup():
+    lookup = DelayedTool("medical_lookup", {"ibuprofen": 0.1, "warfarin": 0.1})
+    lookup.delays["Stomach pain after taking ibuprofen"] = 0.1
+    agent = TriageAgent(tool_manager=manager(lookup, GuidelineTool()), settings=Settings())
+
+    started = time.perf_counter()
+    context = await agent._gather_medical_context(
+        TriageRequest(
+            user_id="u1", symptoms="Stomach pain after taking ibuprofen", medications=["warfarin"]
+        )
+    )
+
+    assert time.perf_counter() - started < 0.25
+    assert sorted(lookup.calls) == [
+        ("conditions", "Stomach pain after taking ibuprofen"),
+        ("drugs", "ibuprofen"),
+        ("drugs", "warfarin"),
+    ]
+    assert context.splitlines() == [
+        "Related conditions: conditions:Stomach pain after taking ibuprofen",
+        "Medications: warfarin (drugs:warfarin); ibuprofen (drugs:ibuprofen)",
+        "Guidelines: Hydrate and rest.",
+    ]
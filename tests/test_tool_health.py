@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+import pytest
+
+from app.config import Settings
+from app.observability.metrics import metrics
+from app.tools.base import BaseTool
+from app.tools.manager import ToolManager
+from app.tools.mcp_client import MCPClient
+
+
+class UpstreamTool(BaseTool):
+    def __init__(self, name="upstream"):
+        super().__init__(name=name, description="Calls a flaky dependency")
+        self.calls = 0
+        self.fail = True
+        self.delay = 0.0
+
+    async def execute(self, query):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("upstream down")
+        return {"success": True, "results": [query]}
+
+
+def manager_with(tool, **overrides):
+    settings = Settings(
+        tool_cache_enabled=False,
+        tool_breaker_min_calls=3,
+        tool_breaker_window=4,
+        tool_breaker_open_seconds=0.05,
+        tool_breaker_slow_call_seconds=0.05,
+        **overrides,
+    )
+    tools = ToolManager(settings=settings)
+    tools.register_tool(tool)
+    return tools
+
+
+@pytest.mark.asyncio
+async def test_failing_tool_trips_and_gets_immediate_fallback():
+    tool = UpstreamTool()
+    tool.delay = 0.02
+    tools = manager_with(tool)
+
+    for _ in range(3):
+        assert "error" in await tools.execute_tool("upstream", query="cough")
+    started = time.perf_counter()
+    result = await tools.execute_tool("upstream", query="cough")
+
+    assert time.perf_counter() - started < 0.01
+    assert result == {"error": "Tool 'upstream' is unavailable", "fallback": True, "circuit_open": True}
+    assert tool.calls == 3
+    health = tools.health()["upstream"]
+    assert health["state"] == "open" and not health["healthy"]
+    assert health["success_rate"] == 0.0
+    assert metrics.gauges["tool_upstream_circuit_state"] == "open"
+
+
+@pytest.mark.asyncio
+async def test_probe_after_open_window_closes_recovered_tool():
+    tool = UpstreamTool()
+    tools = manager_with(tool)
+    for _ in range(3):
+        await tools.execute_tool("upstream", query="cough")
+
+    tool.fail = False
+    await asyncio.sleep(0.06)
+    assert tools.health()["upstream"]["state"] == "half_open"
+    assert (await tools.execute_tool("upstream", query="cough"))["success"]
+
+    assert tools.health()["upstream"]["state"] == "closed"
+    assert tool.calls == 4
+
+
+@pytest.mark.asyncio
+async def test_consistently_slow_tool_is_tripped():
+    tool = UpstreamTool()
+    tool.fail = False
+    tool.delay = 0.06
+    tools = manager_with(tool)
+
+    for _ in range(3):
+        assert (await tools.execute_tool("upstream", query="rash"))["success"]
+
+    assert (await tools.execute_tool("upstream", query="rash"))["circuit_open"]
+    listed = {entry["name"]: entry for entry in tools.list_tools()}
+    assert listed["upstream"]["health"]["slow_call_rate"] == 1.0
+
+
+@pytest.mark.asyncio
+async def test_tripped_mcp_client_serves_mock_response():
+    mcp = MCPClient(settings=Settings(mcp_server_url="http://127.0.0.1:9/mcp"))
+    tools = manager_with(mcp)
+    tools.breakers["mcp_client"]._transition("open")
+
+    result = await tools.execute_tool("mcp_client", method="tools/call", params={"name": "medical_guidelines"})
+
+    assert result["fallback"] and result["circuit_open"]
+    assert result["result"]["content"][0]["text"] == "Mock response from medical_guidelines tool"
+    assert mcp._session is None  # never connected
@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.agents.stub_model import StubModel
+from app.agents.triage import TriageAgent
+from app.main import app
+from app.schemas import TriageRequest
+from app.utils import PartialJSONFieldParser
+
+STREAMED_OUTPUT = (
+    '```json\n{"category": "neurological", "urgency": "low", "recommended_action": "self_care", '
+    '"red_flags": [], "reasoning": "Likely tension headache."}\n```'
+)
+
+
+def streaming_model():
+    return StubModel(response=STREAMED_OUTPUT, chunk_size=30)
+
+
+def parse_sse(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        name, data = block.split("\n")
+        events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_partial_parser_emits_fields_once_complete():
+    parser = PartialJSONFieldParser(("category", "urgency"))
+
+    assert parser.feed('{"category": "resp') == []
+    assert parser.feed('iratory", "urg') == [("category", "respiratory")]
+    assert parser.feed('ency": "high"}') == [("urgency", "high")]
+    assert parser.feed("") == []
+
+
+@pytest.mark.asyncio
+async def test_run_stream_yields_verdict_fields_and_result(make_client, no_context):
+    agent = TriageAgent(llm_client=make_client(streaming_model()))
+
+    events = [e async for e in agent.run_stream(TriageRequest(user_id="s", symptoms="headache"))]
+
+    assert events[0][0] == "red_flags"
+    assert [d for e, d in events if e == "field"] == [
+        {"name": "category", "value": "neurological"},
+        {"name": "urgency", "value": "low"},
+        {"name": "recommended_action", "value": "self_care"},
+    ]
+    assert events[-1] == ("result", {**events[-1][1], "category": "neurological", "urgency": "low"})
+
+
+@pytest.mark.asyncio
+async def test_streamed_fields_respect_urgent_floors(make_client, no_context):
+    agent = TriageAgent(llm_client=make_client(streaming_model()))
+    request = TriageRequest(user_id="s", symptoms="headache and fainting twice today")
+
+    events = [e async for e in agent.run_stream(request)]
+
+    fields = {d["name"]: d["value"] for e, d in events if e == "field"}
+    assert fields["urgency"] == events[-1][1]["urgency"] == "moderate"
+    assert fields["recommended_action"] == events[-1][1]["recommended_action"] == "primary_care"
+
+
+@pytest.mark.asyncio
+async def test_slow_reader_does_not_hold_an_upstream_slot(make_client):
+    llm = make_client(streaming_model())
+    stream = llm.stream("headache")
+
+    first = await stream.__anext__()
+    await asyncio.sleep(0.01)  # the caller dawdles; upstream has finished meanwhile
+
+    assert llm._in_flight == 0
+    assert first + "".join([chunk async for chunk in stream]) == STREAMED_OUTPUT
+
+
+def test_stream_endpoint_persists_event_once():
+    with TestClient(app) as client:
+        before = client.get("/users/stream-user/events")
+        count = len(before.json()) if before.status_code == 200 else 0
+
+        resp = client.post(
+            "/triage/stream",
+            json={"user_id": "stream-user", "symptoms": "crushing chest pain"},
+        )
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        events = parse_sse(resp.text)
+        assert events[0][0] == "red_flags"
+        assert events[0][1]["critical"] == ["chest pain"]
+        assert events[-1][0] == "result"
+        assert events[-1][1]["recommended_action"] == "go_to_er"
+
+        after = client.get("/users/stream-user/events")
+        assert len(after.json()) == count + 1